@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Micro-benchmark for the ``.dockerignore``/``.torchxignore`` matching done by
+``torchx.workspace.api.walk_workspace``. Compares the compiled
+``_IgnorePatterns`` matchers against the previous implementation (which ran
+``fnmatch`` against every pattern for every path) on 100k generated paths.
+
+Run it with ``python scripts/benchmark_ignore.py``.
+"""
+
+import argparse
+import fnmatch
+import posixpath
+import random
+import time
+from typing import Callable, Iterable, List, Tuple
+
+from torchx.workspace.api import _IgnorePatterns
+
+
+def _fnmatch_ignore(s: str, patterns: Iterable[str]) -> Tuple[int, bool]:
+    last_matching_pattern = -1
+    match = False
+    if s in (".", "Dockerfile.torchx"):
+        return last_matching_pattern, match
+    s = posixpath.normpath(s)
+    for i, pattern in enumerate(patterns):
+        if pattern.startswith("!") and fnmatch.fnmatch(s, pattern[1:]):
+            match = False
+            last_matching_pattern = i
+        elif fnmatch.fnmatch(s, pattern):
+            match = True
+            last_matching_pattern = i
+    return last_matching_pattern, match
+
+
+def _paths(num_paths: int) -> List[str]:
+    rand = random.Random(0)
+    top = [f"project{i}" for i in range(20)]
+    paths = []
+    for i in range(num_paths):
+        depth = rand.randint(1, 4)
+        dirs = [rand.choice(top)] + [f"d{rand.randint(0, 9)}" for _ in range(depth)]
+        ext = rand.choice(["py", "txt", "so", "pyc", "json"])
+        paths.append(posixpath.join(*dirs, f"file{i}.{ext}"))
+    return paths
+
+
+def _patterns(num_patterns: int) -> List[str]:
+    rand = random.Random(1)
+    patterns = ["**/*.pyc", "**/__pycache__", "*.so", "!keep.so"]
+    while len(patterns) < num_patterns:
+        project = f"project{rand.randint(0, 19)}"
+        kind = rand.random()
+        if kind < 0.6:
+            patterns.append(f"{project}/d{rand.randint(0, 9)}/d{rand.randint(0, 9)}")
+        elif kind < 0.8:
+            patterns.append(f"{project}/**/*.json")
+        else:
+            patterns.append(f"!{project}/d{rand.randint(0, 9)}")
+    return patterns
+
+
+def _bench(
+    name: str, paths: List[str], ignore: Callable[[str], Tuple[int, bool]]
+) -> int:
+    start = time.perf_counter()
+    ignored = sum(ignore(path)[1] for path in paths)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:>10}: {ignored:>7} ignored in {elapsed:7.3f}s"
+        f" ({len(paths) / elapsed:10.0f} paths/s)"
+    )
+    return ignored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num_paths", type=int, default=100000)
+    parser.add_argument("--num_patterns", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    paths = _paths(args.num_paths)
+    for num_patterns in args.num_patterns:
+        patterns = _patterns(num_patterns)
+        compiled = _IgnorePatterns(patterns)
+        print(f"== {len(paths)} paths, {num_patterns} patterns ==")
+        previous = _bench(
+            "previous", paths, lambda path: _fnmatch_ignore(path, patterns)
+        )
+        # walk_workspace matches the contents of a dir with the dir's matcher
+        current = _bench(
+            "current",
+            paths,
+            lambda path: compiled.matcher(posixpath.dirname(path))(path),
+        )
+        assert previous == current, "matchers disagree"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Micro-benchmark for the line splitting used by the schedulers' ``log_iter``.
+Compares ``torchx.schedulers.api.split_lines_iterator`` against the previous
+implementation (which re-sliced the remaining string after every newline)
+over multi-MB log files read in 64KB chunks.
+
+Run it with ``python scripts/benchmark_split_lines.py``.
+"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+from typing import Callable, Iterable, Iterator, List
+
+from torchx.schedulers.api import split_lines_iterator
+
+BUFSIZE = 64000
+
+
+def _quadratic_split_lines(text: str) -> List[str]:
+    lines = []
+    while len(text) > 0:
+        idx = text.find("\n")
+        if idx >= 0:
+            lines.append(text[: idx + 1])
+            text = text[idx + 1 :]
+        else:
+            lines.append(text)
+            break
+    return lines
+
+
+def _quadratic_split_lines_iterator(chunks: Iterable[str]) -> Iterator[str]:
+    for chunk in chunks:
+        yield from _quadratic_split_lines(chunk)
+
+
+def _write_log(path: str, size_mb: int, line_len: int) -> None:
+    rand = random.Random(0)
+    with open(path, "wt") as f:
+        written = 0
+        while written < size_mb * 1024 * 1024:
+            n = rand.randint(1, 2 * line_len)
+            line = "".join(rand.choices(string.ascii_letters, k=n)) + "\n"
+            f.write(line)
+            written += len(line)
+
+
+def _chunks(path: str) -> Iterator[str]:
+    with open(path, "rt", newline="\n") as f:
+        while True:
+            chunk = f.read(BUFSIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _bench(
+    name: str, path: str, splitter: Callable[[Iterable[str]], Iterable[str]]
+) -> None:
+    start = time.perf_counter()
+    num_lines = sum(1 for _ in splitter(_chunks(path)))
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(
+        f"{name:>10}: {num_lines:>9} lines in {elapsed:7.3f}s ({size_mb / elapsed:8.1f} MB/s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size_mb", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument(
+        "--line_len", type=int, default=16, help="average log line length"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size_mb in args.size_mb:
+            path = os.path.join(tmpdir, f"{size_mb}MB.log")
+            _write_log(path, size_mb, args.line_len)
+            print(f"== {size_mb}MB log, ~{args.line_len} chars per line ==")
+            _bench("previous", path, _quadratic_split_lines_iterator)
+            _bench("current", path, split_lines_iterator)
+
+
+if __name__ == "__main__":
+    main()
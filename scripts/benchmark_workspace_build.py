@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Benchmark for the ``DockerWorkspaceMixin`` build cache. Builds a generated
+workspace (10k files by default) three times:
+
+* cold: empty build cache, the whole workspace is hashed and sent to docker
+* warm: nothing changed, the image is reused without a build
+* incremental: a few files changed, only those are sent to docker
+
+By default the docker daemon is replaced by a stub that reads the build
+context and returns a fake image (so that the numbers only measure the
+client side), use ``--docker`` to build against the local docker daemon.
+
+Run it with ``python scripts/benchmark_workspace_build.py``.
+"""
+
+import argparse
+import os
+import random
+import tarfile
+import tempfile
+import time
+from typing import Dict, IO, List, Mapping, Optional, Tuple
+from unittest.mock import MagicMock
+
+from torchx.specs import Role
+from torchx.workspace.docker_workspace import DockerWorkspaceMixin
+
+
+class _StubImages:
+    """
+    Stands in for ``DockerClient.images``: reads the whole build context and
+    records the built images by their workspace hash label.
+    """
+
+    def __init__(self) -> None:
+        self.images: Dict[str, MagicMock] = {}
+        self.context_files: int = 0
+
+    def pull(self, image: str) -> None:
+        pass
+
+    def get(self, image: str) -> MagicMock:
+        return MagicMock(id="sha256:base" if image == "busybox" else image)
+
+    def list(self, filters: Mapping[str, str]) -> List[MagicMock]:
+        _, _, build_hash = filters["label"].partition("=")
+        image = self.images.get(build_hash)
+        return [image] if image else []
+
+    def build(
+        self, fileobj: IO[bytes], labels: Mapping[str, str], **kwargs: object
+    ) -> Tuple[MagicMock, List[object]]:
+        with tarfile.open(fileobj=fileobj, mode="r|") as tf:
+            self.context_files = 0
+            for member in tf:
+                f = tf.extractfile(member)
+                if f:
+                    f.read()
+                self.context_files += 1
+        image = MagicMock(id=f"sha256:{len(self.images)}")
+        self.images[labels[DockerWorkspaceMixin.LABEL_WORKSPACE_HASH]] = image
+        return image, []
+
+
+def _write_workspace(path: str, num_files: int, file_size: int) -> List[str]:
+    rand = random.Random(0)
+    files = []
+    for i in range(num_files):
+        file = os.path.join(path, f"dir{i % 100}", f"sub{i % 7}", f"file{i}.py")
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        with open(file, "wb") as f:
+            f.write(rand.randbytes(file_size))
+        files.append(file)
+    return files
+
+
+def _bench(
+    name: str,
+    workspace: DockerWorkspaceMixin,
+    path: str,
+    stub: Optional[_StubImages],
+) -> None:
+    role = Role(name="bench", image="busybox")
+    start = time.perf_counter()
+    workspace.build_workspace_and_update_role(role, path, {})
+    elapsed = time.perf_counter() - start
+    sent = f" ({stub.context_files} files sent)" if stub else ""
+    print(f"{name:>12}: {elapsed:7.3f}s -> {role.image[:19]}{sent}")
+    if stub:
+        stub.context_files = 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num_files", type=int, default=10000)
+    parser.add_argument("--file_size", type=int, default=4096)
+    parser.add_argument(
+        "--num_changed", type=int, default=10, help="files changed between builds"
+    )
+    parser.add_argument(
+        "--docker", action="store_true", help="build with the local docker daemon"
+    )
+    args = parser.parse_args()
+
+    stub = None
+    if args.docker:
+        import docker
+
+        client = docker.from_env()
+    else:
+        stub = _StubImages()
+        client = MagicMock()
+        client.images = stub
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "workspace")
+        files = _write_workspace(path, args.num_files, args.file_size)
+        workspace = DockerWorkspaceMixin(
+            docker_client=client,
+            workspace_cache_path=os.path.join(tmpdir, "cache.json"),
+        )
+        print(f"== {args.num_files} files of {args.file_size} bytes ==")
+        _bench("cold", workspace, path, stub)
+        _bench("warm", workspace, path, stub)
+        for file in random.Random(1).sample(files, args.num_changed):
+            with open(file, "ab") as f:
+                f.write(b"# changed\n")
+        _bench("incremental", workspace, path, stub)
+        _bench("warm", workspace, path, stub)
+
+
+if __name__ == "__main__":
+    main()
@@ -88,7 +88,7 @@ if __name__ == "__main__":
             ],
             "kfp": ["kfp==1.6.2"],
             "kubernetes": ["kubernetes>=11"],
-            "ray": ["ray>=1.12.1"],
+            "ray": ["ray>=2.0.0"],
             "dev": dev_reqs,
         },
         # PyPI package information.
@@ -252,7 +252,7 @@ class CmdRun(SubCommand):
 
         log_thread = self._start_log_thread(runner, app_handle) if log else None
 
-        status = runner.wait(app_handle, wait_interval=1)
+        status = runner.wait(app_handle)
         if not status:
             raise RuntimeError(f"unknown status, wait returned {status}")
 
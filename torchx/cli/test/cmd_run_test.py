@@ -19,11 +19,29 @@ from typing import Generator
 from unittest.mock import MagicMock, patch
 
 from torchx.cli.cmd_run import _parse_component_name_and_args, CmdBuiltins, CmdRun
+from torchx.schedulers.local_app_store import ENV_TORCHX_LOCAL_APP_STORE
 from torchx.schedulers.local_scheduler import SignalException
 
 from torchx.specs import AppDryRunInfo
 
 
+_app_store_dir: str = ""
+
+
+def setUpModule() -> None:
+    # keep the apps launched by the tests out of the user's app store
+    global _app_store_dir
+    _app_store_dir = tempfile.mkdtemp(prefix="local_app_store_")
+    os.environ[ENV_TORCHX_LOCAL_APP_STORE] = os.path.join(
+        _app_store_dir, "local_apps.db"
+    )
+
+
+def tearDownModule() -> None:
+    os.environ.pop(ENV_TORCHX_LOCAL_APP_STORE, None)
+    shutil.rmtree(_app_store_dir, ignore_errors=True)
+
+
 @contextmanager
 def cwd(path: str) -> Generator[None, None, None]:
     orig_cwd = os.getcwd()
@@ -7,12 +7,32 @@
 
 import argparse
 import os
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from torchx.cli.cmd_base import SubCommand
 from torchx.cli.main import get_sub_cmds, main
+from torchx.schedulers.local_app_store import ENV_TORCHX_LOCAL_APP_STORE
+
+
+_app_store_dir: str = ""
+
+
+def setUpModule() -> None:
+    # keep the apps launched by the tests out of the user's app store
+    global _app_store_dir
+    _app_store_dir = tempfile.mkdtemp(prefix="local_app_store_")
+    os.environ[ENV_TORCHX_LOCAL_APP_STORE] = os.path.join(
+        _app_store_dir, "local_apps.db"
+    )
+
+
+def tearDownModule() -> None:
+    os.environ.pop(ENV_TORCHX_LOCAL_APP_STORE, None)
+    shutil.rmtree(_app_store_dir, ignore_errors=True)
 
 
 _root: Path = Path(__file__).parent
@@ -101,10 +101,12 @@ class ComponentTestCase(unittest.TestCase):
         """
 
         app_def = component(**args)
-        if scheduler_params:
-            runner = get_runner(name=None, component_defaults=None, **scheduler_params)
-        else:
-            runner = get_runner(name=None, component_defaults=None)
+        # keep the apps run by the test out of the user's local app store
+        scheduler_params = {
+            "app_store_path": os.path.join(self.test_dir, "local_apps.db"),
+            **(scheduler_params or {}),
+        }
+        runner = get_runner(name=None, component_defaults=None, **scheduler_params)
 
         app_handle = runner.run(app_def, scheduler)
 
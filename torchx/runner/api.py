@@ -8,7 +8,6 @@
 import json
 import logging
 import os
-import time
 import warnings
 from datetime import datetime
 from types import TracebackType
@@ -16,13 +15,19 @@ from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Type
 
 from torchx.runner.events import log_event
 from torchx.schedulers import get_scheduler_factories, SchedulerFactory
-from torchx.schedulers.api import ListAppResponse, Scheduler, Stream
+from torchx.schedulers.api import (
+    DescribeAppResponse,
+    ListAppResponse,
+    Scheduler,
+    Stream,
+)
 from torchx.specs import (
     AppDef,
     AppDryRunInfo,
     AppHandle,
     AppStatus,
     CfgVal,
+    is_terminal,
     macros,
     make_app_handle,
     materialize_appdef,
@@ -428,36 +433,53 @@ class Runner:
                 # effectively removes this app from the list() API
                 self._apps.pop(app_handle, None)
                 return None
+            return self._to_app_status(desc)
 
-            app_status = AppStatus(
-                desc.state,
-                desc.num_restarts,
-                msg=desc.msg,
-                structured_error_msg=desc.structured_error_msg,
-                roles=desc.roles_statuses,
-            )
-            if app_status:
-                app_status.ui_url = desc.ui_url
-            return app_status
+    def status_many(
+        self, app_handles: List[AppHandle]
+    ) -> Dict[AppHandle, Optional[AppStatus]]:
+        """
+        Same as ``status()`` but for many apps at once. The apps are grouped
+        by scheduler and each scheduler is queried once via
+        ``Scheduler.describe_many()``.
+
+        Returns:
+            A dict keyed by app handle with the status of each application,
+            or ``None`` if the app does not exist anymore
+        """
+        app_ids: Dict[str, Dict[AppHandle, str]] = {}
+        for app_handle in app_handles:
+            scheduler_backend, _, app_id = parse_app_handle(app_handle)
+            app_ids.setdefault(scheduler_backend, {})[app_handle] = app_id
+
+        statuses: Dict[AppHandle, Optional[AppStatus]] = {}
+        for scheduler_backend, handles in app_ids.items():
+            scheduler = self._scheduler(scheduler_backend)
+            with log_event("status_many", scheduler_backend):
+                descs = scheduler.describe_many(list(set(handles.values())))
+            for app_handle, app_id in handles.items():
+                desc = descs.get(app_id)
+                if not desc:
+                    self._apps.pop(app_handle, None)
+                    statuses[app_handle] = None
+                else:
+                    statuses[app_handle] = self._to_app_status(desc)
+        return {app_handle: statuses[app_handle] for app_handle in app_handles}
 
     def wait(
         self, app_handle: AppHandle, wait_interval: float = 10
     ) -> Optional[AppStatus]:
         """
         Block waits (indefinitely) for the application to complete.
-        Possible implementation:
-
-        ::
-
-         while(True):
-             app_status = status(app)
-             if app_status.is_terminal():
-                 return
-             sleep(10)
+        Blocks on ``Scheduler.watch()`` which yields the state transitions
+        of the app. Schedulers that support native notifications (e.g. process
+        exits or watch APIs) return as soon as the app finishes, others are
+        polled with an exponential backoff.
 
         Args:
             app_handle: the app handle to wait for completion
-            wait_interval: the minimum interval to wait before polling for status
+            wait_interval: the maximum interval to wait between polls for status
+                (only used by schedulers that fall back to polling)
 
         Returns:
             The terminal status of the application, or ``None`` if the app does not exist anymore
@@ -466,15 +488,13 @@ class Runner:
             app_handle, check_session=False
         )
         with log_event("wait", scheduler_backend, app_id):
-            while True:
-                app_status = self.status(app_handle)
+            for desc in scheduler.watch(app_id, max_interval=wait_interval):
+                if is_terminal(desc.state):
+                    return self._to_app_status(desc)
 
-                if not app_status:
-                    return None
-                if app_status.is_terminal():
-                    return app_status
-                else:
-                    time.sleep(wait_interval)
+            # watch ended without reaching a terminal state, app no longer exists
+            self._apps.pop(app_handle, None)
+            return None
 
     def cancel(self, app_handle: AppHandle) -> None:
         """
@@ -677,6 +697,17 @@ class Runner:
         scheduler = self._scheduler(scheduler_backend)
         return scheduler, scheduler_backend, app_id
 
+    def _to_app_status(self, desc: DescribeAppResponse) -> AppStatus:
+        app_status = AppStatus(
+            desc.state,
+            desc.num_restarts,
+            msg=desc.msg,
+            structured_error_msg=desc.structured_error_msg,
+            roles=desc.roles_statuses,
+        )
+        app_status.ui_url = desc.ui_url
+        return app_status
+
     def __repr__(self) -> str:
         return f"Runner(name={self._name}, schedulers={self._scheduler_factories}, apps={self._apps})"
 
@@ -16,6 +16,7 @@ from unittest.mock import MagicMock, patch
 
 from torchx.runner import get_runner, Runner
 from torchx.schedulers.api import DescribeAppResponse, ListAppResponse, Scheduler
+from torchx.schedulers.local_app_store import ENV_TORCHX_LOCAL_APP_STORE
 from torchx.schedulers.local_scheduler import (
     LocalDirectoryImageProvider,
     LocalScheduler,
@@ -29,6 +30,23 @@ from torchx.util.types import none_throws
 from torchx.workspace import WorkspaceMixin
 
 
+_app_store_dir: str = ""
+
+
+def setUpModule() -> None:
+    # keep the apps launched by the tests out of the user's app store
+    global _app_store_dir
+    _app_store_dir = tempfile.mkdtemp(prefix="local_app_store_")
+    os.environ[ENV_TORCHX_LOCAL_APP_STORE] = os.path.join(
+        _app_store_dir, "local_apps.db"
+    )
+
+
+def tearDownModule() -> None:
+    os.environ.pop(ENV_TORCHX_LOCAL_APP_STORE, None)
+    shutil.rmtree(_app_store_dir, ignore_errors=True)
+
+
 GET_SCHEDULER_FACTORIES = "torchx.runner.api.get_scheduler_factories"
 
 
@@ -397,6 +415,24 @@ class RunnerTest(unittest.TestCase):
         with self.get_runner() as runner:
             self.assertIsNone(runner.status("local_dir://test_session/unknown_app_id"))
 
+    def test_status_many(self, _) -> None:
+        with self.get_runner() as runner:
+            role = Role(
+                name="sleep",
+                image=self.test_dir,
+                resource=resource.SMALL,
+                entrypoint="sleep.sh",
+                args=["60"],
+            )
+            app = AppDef("sleeper", roles=[role])
+            app_handle = runner.run(app, scheduler="local_dir", cfg=self.cfg)
+            unknown_handle = "local_dir://test_session/unknown_app_id"
+            statuses = runner.status_many([unknown_handle, app_handle])
+            self.assertEqual([unknown_handle, app_handle], list(statuses.keys()))
+            self.assertIsNone(statuses[unknown_handle])
+            self.assertEqual(AppState.RUNNING, none_throws(statuses[app_handle]).state)
+            runner.cancel(app_handle)
+
     @patch("json.dumps")
     def test_status_ui_url(self, json_dumps_mock: MagicMock, _) -> None:
         app_id = "test_app"
@@ -7,15 +7,17 @@
 
 import abc
 import re
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Generic, Iterable, List, Optional, TypeVar
+from typing import Dict, Generic, Iterable, List, Optional, Pattern, TypeVar
 
 from torchx.specs import (
     AppDef,
     AppDryRunInfo,
     AppState,
+    is_terminal,
     NONE,
     NULL_RESOURCE,
     Role,
@@ -207,6 +209,22 @@ class Scheduler(abc.ABC, Generic[T]):
         """
         raise NotImplementedError()
 
+    def describe_many(
+        self, app_ids: List[str]
+    ) -> Dict[str, Optional[DescribeAppResponse]]:
+        """
+        Describes the specified applications in bulk.
+
+        The default implementation calls ``describe()`` for each app.
+        Schedulers whose backend can query many jobs in a single request
+        should override this method.
+
+        Returns:
+            A dict keyed by app id with the description of each app or
+            ``None`` if the app does not exist.
+        """
+        return {app_id: self.describe(app_id) for app_id in app_ids}
+
     @abc.abstractmethod
     def list(self) -> List[ListAppResponse]:
         """
@@ -216,6 +234,48 @@ class Scheduler(abc.ABC, Generic[T]):
         """
         raise NotImplementedError()
 
+    def watch(
+        self,
+        app_id: str,
+        interval: float = 1,
+        max_interval: float = 30,
+    ) -> Iterable[DescribeAppResponse]:
+        """
+        Returns an iterator over the state transitions of the application.
+        A ``DescribeAppResponse`` is yielded for the first observed state and
+        then once every time the state of the app changes. The iterator ends
+        after yielding a terminal state or when the app no longer exists.
+
+        The default implementation polls ``describe()`` with an exponential
+        backoff that starts at ``interval`` seconds, doubles on every poll
+        that observes no change (capped at ``max_interval`` seconds) and resets
+        whenever the state changes. Schedulers that can be notified of state
+        changes natively (e.g. process exits, watch APIs) should override this
+        method.
+
+        Args:
+            app_id: the app to watch
+            interval: the initial interval (in seconds) between polls
+            max_interval: the maximum interval (in seconds) between polls,
+                overrides ``interval`` if smaller
+        """
+        interval = min(interval, max_interval)
+        delay = interval
+        last_state = None
+        while True:
+            desc = self.describe(app_id)
+            if desc is None:
+                return
+            if desc.state != last_state:
+                last_state = desc.state
+                delay = interval
+                yield desc
+            else:
+                delay = min(delay * 2, max_interval)
+            if is_terminal(desc.state):
+                return
+            time.sleep(delay)
+
     def exists(self, app_id: str) -> bool:
         """
         Returns:
@@ -357,28 +417,89 @@ def filter_regex(regex: str, data: Iterable[str]) -> Iterable[str]:
     return filter(lambda datum: r.search(datum), data)
 
 
+# a line ends after a ``\n`` or after a ``\r`` (progress bar update) that is
+# not part of a ``\r\n``
+_LINE_END: Pattern[str] = re.compile(r"\n|\r(?!\n)")
+
+
+class LineAssembler:
+    """
+    Incrementally splits chunks of text into lines in linear time. Partial
+    lines are buffered and carried over to the next chunk so that chunks need
+    not end on a line boundary.
+
+    Lines keep their line ending characters. To support interactive progress
+    bars a ``\r`` that is not followed by a ``\n`` also ends a line (printing
+    the lines without adding newlines reproduces the original output).
+
+    Usage:
+
+    .. code-block:: python
+
+     assembler = LineAssembler()
+     for chunk in chunks:
+         yield from assembler.feed(chunk)
+     yield from assembler.flush()
+    """
+
+    def __init__(self) -> None:
+        self._partial: List[str] = []
+        # whether the last chunk ended with a \r (can't tell yet if it is a \r\n)
+        self._pending_cr = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Returns the lines completed by ``chunk``.
+        """
+        if self._pending_cr:
+            chunk = "\r" + chunk
+            self._pending_cr = False
+        if chunk.endswith("\r"):
+            chunk = chunk[:-1]
+            self._pending_cr = True
+
+        lines = []
+        start = 0
+        for m in _LINE_END.finditer(chunk):
+            end = m.end()
+            if self._partial:
+                self._partial.append(chunk[start:end])
+                lines.append("".join(self._partial))
+                self._partial = []
+            else:
+                lines.append(chunk[start:end])
+            start = end
+        if start < len(chunk):
+            self._partial.append(chunk[start:])
+        return lines
+
+    def flush(self) -> List[str]:
+        """
+        Returns the buffered partial line (if any) and resets the assembler.
+        """
+        if self._pending_cr:
+            self._partial.append("\r")
+            self._pending_cr = False
+        rest = "".join(self._partial)
+        self._partial = []
+        return [rest] if rest else []
+
+
 def split_lines(text: str) -> List[str]:
     """
     split_lines splits the string by new lines and keeps the new line characters.
     """
-    lines = []
-    while len(text) > 0:
-        idx = text.find("\n")
-        if idx >= 0:
-            lines.append(text[: idx + 1])
-            text = text[idx + 1 :]
-        else:
-            lines.append(text)
-            break
-    return lines
+    assembler = LineAssembler()
+    return assembler.feed(text) + assembler.flush()
 
 
 def split_lines_iterator(chunks: Iterable[str]) -> Iterable[str]:
     """
-    split_lines_iterator splits each chunk in the iterator by new lines and
-    returns them.
+    split_lines_iterator splits the chunks in the iterator by new lines and
+    returns them. Chunks need not end on a line boundary, partial lines are
+    joined with the following chunks.
     """
+    assembler = LineAssembler()
     for chunk in chunks:
-        lines = split_lines(chunk)
-        for line in lines:
-            yield line
+        yield from assembler.feed(chunk)
+    yield from assembler.flush()
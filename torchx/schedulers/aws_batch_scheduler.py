@@ -35,9 +35,16 @@ https://docs.aws.amazon.com/AmazonECR/latest/userguide/getting-started-cli.html#
 for how to create a image repository.
 """
 import getpass
+import logging
+import os
+import random
 import re
 import threading
-from dataclasses import dataclass
+import time
+import typing
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from typing import (
     Any,
@@ -45,9 +52,11 @@ from typing import (
     cast,
     Dict,
     Iterable,
+    Iterator,
     List,
     Mapping,
     Optional,
+    Set,
     Tuple,
     TYPE_CHECKING,
     TypeVar,
@@ -71,18 +80,65 @@ from torchx.specs.api import (
     BindMount,
     CfgVal,
     DeviceMount,
+    is_terminal,
     macros,
     Role,
     runopts,
     VolumeMount,
 )
+from torchx.util.cache import TTLCache
+from torchx.util.io import load_json, save_json
+from torchx.util.types import none_throws
 from torchx.workspace.docker_workspace import DockerWorkspaceMixin
 from typing_extensions import TypedDict
 
+log: logging.Logger = logging.getLogger(__name__)
+
 TAG_TORCHX_VER = "torchx.pytorch.org/version"
 TAG_TORCHX_APPNAME = "torchx.pytorch.org/app-name"
 TAG_TORCHX_USER = "torchx.pytorch.org/user"
 
+# the describe_jobs API takes at most 100 job ids per call
+DESCRIBE_JOBS_MAX_IDS = 100
+
+# By default, only running jobs are listed by batch/boto client's list_jobs API
+# When 'filters' parameter is specified, jobs with all statuses are listed
+# So use AFTER_CREATED_AT filter to list jobs in all statuses
+# milli_seconds_after_epoch can later be used to list jobs by timeframe
+MS_AFTER_EPOCH = "1"
+EVERY_STATUS = {"name": "AFTER_CREATED_AT", "values": [MS_AFTER_EPOCH]}
+
+# job names are made unique (see ``make_unique``) so the job id of a job name
+# never changes, the TTL only bounds how long unused entries are kept around
+JOB_ID_CACHE_TTL_SECONDS = 60 * 60
+
+# max number of ``list_jobs`` pages (of up to 100 jobs) scanned to resolve the
+# job ids of many job names at once, the names that are not found within
+# these pages are resolved with a name filtered ``list_jobs`` call each
+JOB_IDS_SCAN_MAX_PAGES = 10
+
+# max number of job queues listed concurrently by ``list()``
+LIST_PARALLELISM = 8
+
+# jobs known from previous ``list()`` calls are persisted here so that
+# subsequent calls (e.g. ``torchx list``) only fetch the newly created jobs
+DEFAULT_LIST_CACHE: str = os.path.join("~", ".torchx", "aws_batch_list_cache.json")
+
+# follow mode (``log_iter(should_tail=True)``) polls ``get_log_events`` with a
+# jittered exponential backoff between these many seconds while no events arrive
+LOG_POLL_MIN_INTERVAL: float = 1
+LOG_POLL_MAX_INTERVAL: float = 30
+# how often (in seconds) follow mode checks whether the job has finished
+LOG_JOB_STATE_CHECK_INTERVAL: float = 30
+
+# max number of jobs per queue kept in the list cache, the oldest finished
+# jobs are dropped first
+LIST_CACHE_MAX_JOBS = 10000
+
+# finished jobs are dropped from the list cache this many seconds after they
+# stopped, AWS Batch itself only keeps them for about 7 days
+LIST_CACHE_MAX_AGE_SECONDS: int = 7 * 24 * 60 * 60
+
 
 if TYPE_CHECKING:
     from docker import DockerClient
@@ -195,6 +251,35 @@ def _role_to_node_properties(idx: int, role: Role) -> Dict[str, object]:
     }
 
 
+def _backoff(min_interval: float, max_interval: float) -> Iterator[float]:
+    """
+    Yields exponentially increasing sleep intervals (capped at ``max_interval``)
+    with "equal jitter" so that concurrent pollers do not synchronize.
+    """
+    interval = min_interval
+    while True:
+        yield interval / 2 + random.uniform(0, interval / 2)
+        interval = min(interval * 2, max_interval)
+
+
+def _log_stream_name(job: Dict[str, Any]) -> Optional[str]:
+    if job.get("status") == "RUNNING":
+        return job["container"].get("logStreamName")
+    attempts = job.get("attempts") or []
+    if not attempts:
+        return None
+    return attempts[-1]["container"].get("logStreamName")
+
+
+def _to_listed_job(jobdesc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "jobName": jobdesc["jobName"],
+        "status": jobdesc["status"],
+        "createdAt": jobdesc.get("createdAt", 0),
+        "stoppedAt": jobdesc.get("stoppedAt", 0),
+    }
+
+
 def _job_ui_url(job_arn: str) -> Optional[str]:
     match = re.match(
         "arn:aws:batch:([a-z-0-9]+):[0-9]+:job/([a-z-0-9]+)",
@@ -207,6 +292,18 @@ def _job_ui_url(job_arn: str) -> Optional[str]:
     return f"https://{region}.console.aws.amazon.com/batch/home?region={region}#jobs/mnp-job/{job_id}"
 
 
+@dataclass
+class _QueueListing:
+    """
+    TorchX jobs of a job queue known from previous ``list()`` calls.
+    """
+
+    # createdAt (ms since epoch) of the newest job seen in the queue
+    watermark: int = 0
+    # job arn -> {"jobName", "status", "createdAt", "stoppedAt"}
+    jobs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
 @dataclass
 class BatchJob:
     name: str
@@ -270,6 +367,11 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
     Authentication is loaded from the environment using the ``boto3`` credential
     handling.
 
+    ``list()`` caches the TorchX jobs it has seen in
+    ``~/.torchx/aws_batch_list_cache.json`` so that subsequent calls only
+    fetch the jobs created since the previous call. Finished jobs are kept
+    in the cache for ``LIST_CACHE_MAX_AGE_SECONDS`` after they stopped.
+
     **Config Options**
 
     .. runopts::
@@ -316,6 +418,7 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
         # pyre-fixme[2]: Parameter annotation cannot be `Any`.
         log_client: Optional[Any] = None,
         docker_client: Optional["DockerClient"] = None,
+        list_cache_path: Optional[str] = None,
     ) -> None:
         super().__init__("aws_batch", session_name, docker_client=docker_client)
 
@@ -324,6 +427,21 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
         # pyre-fixme[4]: Attribute annotation cannot be `Any`.
         self.__log_client = log_client
 
+        # number of batch and logs API calls (one per page for paginated APIs)
+        # made by this scheduler keyed by the API name
+        self.api_calls: typing.Counter[str] = Counter()
+        self._api_calls_lock = threading.Lock()
+        # app_id (``<queue>:<job name>``) -> job id
+        self._job_ids: TTLCache[str, str] = TTLCache(JOB_ID_CACHE_TTL_SECONDS)
+        # job id -> rank of the node of each (role name, replica id)
+        self._node_ranks: TTLCache[str, Dict[Tuple[str, int], int]] = TTLCache(
+            JOB_ID_CACHE_TTL_SECONDS
+        )
+        # job queue arn -> jobs known from previous list() calls, loaded lazily
+        # from ``list_cache_path`` (kept in memory only if not set)
+        self._list_cache_path = list_cache_path
+        self._list_cache: Optional[Dict[str, _QueueListing]] = None
+
     @property
     # pyre-fixme[3]: Return annotation cannot be `Any`.
     def _client(self) -> Any:
@@ -338,6 +456,24 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
             return self.__log_client
         return _local_session().client("logs")
 
+    def _call(self, op: str, **kwargs: object) -> Dict[str, Any]:
+        """
+        Calls the ``op`` batch API and counts the call in ``self.api_calls``.
+        """
+        with self._api_calls_lock:
+            self.api_calls[op] += 1
+        return getattr(self._client, op)(**kwargs)
+
+    def _paginate(self, op: str, **kwargs: object) -> Iterable[Dict[str, Any]]:
+        """
+        Iterates over the pages of the ``op`` batch API and counts each page
+        fetched in ``self.api_calls``.
+        """
+        for page in self._client.get_paginator(op).paginate(**kwargs):
+            with self._api_calls_lock:
+                self.api_calls[op] += 1
+            yield page
+
     def schedule(self, dryrun_info: AppDryRunInfo[BatchJob]) -> str:
         cfg = dryrun_info._cfg
         assert cfg is not None, f"{dryrun_info} missing cfg"
@@ -346,7 +482,7 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
         self.push_images(images_to_push)
 
         req = dryrun_info.request
-        self._client.register_job_definition(**req.job_def)
+        self._call("register_job_definition", **req.job_def)
 
         batch_job_req = {
             **{
@@ -357,9 +493,11 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
             },
             **({"shareIdentifier": req.share_id} if req.share_id is not None else {}),
         }
-        self._client.submit_job(**batch_job_req)
+        resp = self._call("submit_job", **batch_job_req)
 
-        return f"{req.queue}:{req.name}"
+        app_id = f"{req.queue}:{req.name}"
+        self._job_ids.put(app_id, resp["jobArn"])
+        return app_id
 
     def _submit_dryrun(self, app: AppDef, cfg: AWSBatchOpts) -> AppDryRunInfo[BatchJob]:
         queue = cfg.get("queue")
@@ -450,7 +588,8 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
 
     def _cancel_existing(self, app_id: str) -> None:
         job_id = self._get_job_id(app_id)
-        self._client.terminate_job(
+        self._call(
+            "terminate_job",
             jobId=job_id,
             reason="killed via torchx CLI",
         )
@@ -480,35 +619,150 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
         return opts
 
     def _get_job_id(self, app_id: str) -> Optional[str]:
-        queue, name = app_id.split(":")
+        job_id = self._job_ids.get(app_id)
+        if job_id:
+            return job_id
 
-        for resp in self._client.get_paginator("list_jobs").paginate(
+        queue, name = app_id.split(":")
+        for resp in self._paginate(
+            "list_jobs",
             jobQueue=queue,
             filters=[{"name": "JOB_NAME", "values": [name]}],
         ):
             job_summary_list = resp["jobSummaryList"]
             if job_summary_list:
-                return job_summary_list[0]["jobArn"]
+                job_id = job_summary_list[0]["jobArn"]
+                self._job_ids.put(app_id, job_id)
+                return job_id
         return None
 
-    def _get_job(
-        self, app_id: str, rank: Optional[int] = None
-    ) -> Optional[Dict[str, Any]]:
+    def _get_job_ids(self, queue: str, names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolves the job ids of many job names in the queue. Names are first
+        looked up in the job id cache. A single uncached name is resolved with
+        a name filtered ``list_jobs`` call, otherwise the queue is listed
+        (newest first) until all the names have been found. At most
+        ``JOB_IDS_SCAN_MAX_PAGES`` pages are listed, the names not found by
+        then (e.g. old or purged jobs) are resolved one by one.
+        """
+        job_ids: Dict[str, Optional[str]] = {name: None for name in names}
+        for name in names:
+            job_ids[name] = self._job_ids.get(f"{queue}:{name}")
+        remaining = {name for name, job_id in job_ids.items() if not job_id}
+
+        if not remaining:
+            return job_ids
+        elif len(remaining) == 1:
+            (name,) = remaining
+            job_ids[name] = self._get_job_id(f"{queue}:{name}")
+            return job_ids
+
+        pages = self._paginate("list_jobs", jobQueue=queue, filters=[EVERY_STATUS])
+        for i, resp in enumerate(pages):
+            for job_summary in resp["jobSummaryList"]:
+                name = job_summary["jobName"]
+                if name in remaining:
+                    job_ids[name] = job_summary["jobArn"]
+                    self._job_ids.put(f"{queue}:{name}", job_summary["jobArn"])
+                    remaining.remove(name)
+            if not remaining:
+                break
+            if i + 1 >= JOB_IDS_SCAN_MAX_PAGES:
+                for name in sorted(remaining):
+                    job_ids[name] = self._get_job_id(f"{queue}:{name}")
+                break
+        return job_ids
+
+    def _get_job(self, app_id: str) -> Optional[Dict[str, Any]]:
         job_id = self._get_job_id(app_id)
         if not job_id:
             return None
-        if rank is not None:
-            job_id += f"#{rank}"
-        jobs = self._client.describe_jobs(jobs=[job_id])["jobs"]
+        jobs = self._call("describe_jobs", jobs=[job_id])["jobs"]
         if len(jobs) == 0:
             return None
         return jobs[0]
 
+    def _get_node_jobs(
+        self, job_id: str, ranks: List[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Describes the node jobs (``<job id>#<rank>``) of the multi-node job
+        ``job_id`` with a single ``describe_jobs`` call per 100 nodes.
+
+        Returns:
+            the node jobs keyed by rank, nodes that were not found are omitted
+        """
+        node_jobs = {}
+        for i in range(0, len(ranks), DESCRIBE_JOBS_MAX_IDS):
+            batch = ranks[i : i + DESCRIBE_JOBS_MAX_IDS]
+            jobs = self._call(
+                "describe_jobs", jobs=[f"{job_id}#{rank}" for rank in batch]
+            )["jobs"]
+            for pos, job in enumerate(jobs):
+                # node job ids are suffixed with ``#<rank>``
+                _, sep, rank = job.get("jobId", "").rpartition("#")
+                node_jobs[int(rank) if sep else batch[pos]] = job
+        return node_jobs
+
+    def _get_node_ranks(self, job_id: str) -> Optional[Dict[Tuple[str, int], int]]:
+        """
+        Returns the rank of the node of each (role name, replica id) of the job.
+        The nodes of a job never change so the ranks are cached.
+        """
+        node_ranks = self._node_ranks.get(job_id)
+        if node_ranks is not None:
+            return node_ranks
+
+        jobs = self._call("describe_jobs", jobs=[job_id])["jobs"]
+        if not jobs:
+            return None
+        node_ranks = {}
+        nodes = jobs[0]["nodeProperties"]["nodeRangeProperties"]
+        for rank, node in enumerate(nodes):
+            env = {
+                opt["name"]: opt["value"] for opt in node["container"]["environment"]
+            }
+            node_ranks[(env["TORCHX_ROLE_NAME"], int(env["TORCHX_REPLICA_IDX"]))] = rank
+        self._node_ranks.put(job_id, node_ranks)
+        return node_ranks
+
     def describe(self, app_id: str) -> Optional[DescribeAppResponse]:
         job = self._get_job(app_id)
         if job is None:
             return None
-
+        return self._job_to_describe_response(app_id, job)
+
+    def describe_many(
+        self, app_ids: List[str]
+    ) -> Dict[str, Optional[DescribeAppResponse]]:
+        names: Dict[str, List[str]] = {}
+        for app_id in app_ids:
+            queue, name = app_id.split(":")
+            names.setdefault(queue, []).append(name)
+
+        job_ids: Dict[str, Optional[str]] = {}
+        for queue, queue_names in names.items():
+            for name, job_id in self._get_job_ids(queue, queue_names).items():
+                job_ids[f"{queue}:{name}"] = job_id
+
+        jobs = {}
+        ids = [job_id for job_id in job_ids.values() if job_id]
+        for i in range(0, len(ids), DESCRIBE_JOBS_MAX_IDS):
+            for job in self._call(
+                "describe_jobs", jobs=ids[i : i + DESCRIBE_JOBS_MAX_IDS]
+            )["jobs"]:
+                jobs[job["jobArn"]] = job
+
+        out: Dict[str, Optional[DescribeAppResponse]] = {}
+        for app_id in app_ids:
+            job_id = job_ids[app_id]
+            job = jobs.get(job_id) if job_id else None
+            out[app_id] = self._job_to_describe_response(app_id, job) if job else None
+        return out
+
+    def _job_to_describe_response(
+        self, app_id: str, job: Dict[str, Any]
+    ) -> DescribeAppResponse:
         # TODO: role statuses
 
         roles = {}
@@ -551,88 +805,206 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
         if streams not in (None, Stream.COMBINED):
             raise ValueError("AWSBatchScheduler only supports COMBINED log stream")
 
-        job = self._get_job(app_id)
-        if job is None:
+        job_id = self._get_job_id(app_id)
+        if not job_id:
             return []
-        nodes = job["nodeProperties"]["nodeRangeProperties"]
-        i = 0
-        for i, node in enumerate(nodes):
-            container = node["container"]
-            env = {opt["name"]: opt["value"] for opt in container["environment"]}
-            node_role = env["TORCHX_ROLE_NAME"]
-            replica_id = int(env["TORCHX_REPLICA_IDX"])
-            if role_name == node_role and k == replica_id:
-                break
+        node_ranks = self._get_node_ranks(job_id)
+        if node_ranks is None:
+            return []
+        # falls back to the last node if the replica does not exist
+        rank = node_ranks.get((role_name, k), max(len(node_ranks) - 1, 0))
 
-        job = self._get_job(app_id, rank=i)
+        job = self._get_node_jobs(job_id, [rank]).get(rank)
         if not job:
             return []
 
-        if "status" in job and job["status"] == "RUNNING":
-            stream_name = job["container"]["logStreamName"]
-        else:
-            attempts = job["attempts"]
-            if len(attempts) == 0:
-                return []
-
-            attempt = attempts[-1]
-            container = attempt["container"]
-            stream_name = container["logStreamName"]
+        def node_finished() -> bool:
+            node_job = self._get_node_jobs(job_id, [rank]).get(rank)
+            return not node_job or is_terminal(JOB_STATE[node_job["status"]])
+
+        stream_name = _log_stream_name(job)
+        finished = is_terminal(JOB_STATE[job["status"]])
+        if should_tail and not finished and not stream_name:
+            # wait for the node to start and create its log stream
+            for interval in _backoff(LOG_POLL_MIN_INTERVAL, LOG_POLL_MAX_INTERVAL):
+                time.sleep(interval)
+                job = self._get_node_jobs(job_id, [rank]).get(rank)
+                if not job:
+                    return []
+                stream_name = _log_stream_name(job)
+                finished = is_terminal(JOB_STATE[job["status"]])
+                if stream_name or finished:
+                    break
+        if not stream_name:
+            return []
 
-        iterator = self._stream_events(stream_name, since=since, until=until)
+        iterator = self._stream_events(
+            stream_name,
+            since=since,
+            until=until,
+            is_finished=node_finished if should_tail and not finished else None,
+        )
         if regex:
             return filter_regex(regex, iterator)
         else:
             return iterator
 
     def list(self) -> List[ListAppResponse]:
+        """
+        Lists the TorchX jobs in all the job queues. The queues are listed
+        concurrently and only the jobs created since the previous call are
+        described (to tell whether they were launched by TorchX). The jobs
+        known from previous calls are only described again if they have not
+        finished yet.
+        """
         # TODO: get queue name input instead of iterating over all queues?
-        all_apps = []
-        for resp in self._client.get_paginator("describe_job_queues").paginate():
-            queue_names = [queue["jobQueueName"] for queue in resp["jobQueues"]]
-            for qn in queue_names:
-                all_apps.extend(self._list_by_queue(qn))
-        return all_apps
+        queues = [
+            queue
+            for resp in self._paginate("describe_job_queues")
+            for queue in resp["jobQueues"]
+        ]
+        list_cache = self._get_list_cache()
+        listings = [
+            list_cache.setdefault(
+                queue.get("jobQueueArn", queue["jobQueueName"]), _QueueListing()
+            )
+            for queue in queues
+        ]
 
-    def _list_by_queue(self, queue_name: str) -> List[ListAppResponse]:
-        # By default, only running jobs are listed by batch/boto client's list_jobs API
-        # When 'filters' parameter is specified, jobs with all statuses are listed
-        # So use AFTER_CREATED_AT filter to list jobs in all statuses
-        # milli_seconds_after_epoch can later be used to list jobs by timeframe
-        MS_AFTER_EPOCH = "1"
-        EVERY_STATUS = {"name": "AFTER_CREATED_AT", "values": [MS_AFTER_EPOCH]}
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(LIST_PARALLELISM, len(queues)))
+        ) as executor:
+            results = executor.map(
+                self._list_by_queue,
+                [queue["jobQueueName"] for queue in queues],
+                listings,
+            )
+            all_apps = [app for apps in results for app in apps]
 
-        jobs = []
-        for resp in self._client.get_paginator("list_jobs").paginate(
+        self._save_list_cache()
+        return all_apps
+
+    def _list_by_queue(
+        self, queue_name: str, listing: _QueueListing
+    ) -> List[ListAppResponse]:
+        """
+        Updates ``listing`` with the jobs created in the queue since
+        ``listing.watermark`` and with the status of its unfinished jobs.
+        """
+        watermark = listing.watermark
+        seen = set()
+        for resp in self._paginate(
+            "list_jobs",
             jobQueue=queue_name,
-            filters=[EVERY_STATUS],
+            # minus one ms to not miss jobs created in the same ms as the
+            # newest job of the previous call, duplicates are skipped below
+            filters=[
+                {
+                    "name": "AFTER_CREATED_AT",
+                    "values": [str(max(listing.watermark - 1, int(MS_AFTER_EPOCH)))],
+                }
+            ],
             # describe-jobs API can take up to 100 jobIds
-            PaginationConfig={"MaxItems": 100},
+            PaginationConfig={"PageSize": DESCRIBE_JOBS_MAX_IDS},
         ):
+            job_ids = []
+            for js in resp["jobSummaryList"]:
+                watermark = max(watermark, js.get("createdAt", 0))
+                known_job = listing.jobs.get(js["jobArn"])
+                if known_job:
+                    seen.add(js["jobArn"])
+                    known_job["status"] = js["status"]
+                    known_job["stoppedAt"] = js.get("stoppedAt", 0)
+                else:
+                    job_ids.append(js["jobId"])
 
             # torchx.pytorch.org/version tag is used to filter torchx jobs
             # list_jobs() API only returns a job summary which does not include the job's tag
             # so we need to call the describe_jobs API.
             # Ideally batch lets us pass tags as a filter to list_jobs API
             # but this is currently not supported
-            job_ids = [js["jobId"] for js in resp["jobSummaryList"]]
             for jobdesc in self._get_torchx_submitted_jobs(job_ids):
-                jobs.append(
-                    ListAppResponse(
-                        app_id=f"{queue_name}:{jobdesc['jobName']}",
-                        state=JOB_STATE[jobdesc["status"]],
-                    )
-                )
+                seen.add(jobdesc["jobArn"])
+                listing.jobs[jobdesc["jobArn"]] = _to_listed_job(jobdesc)
+
+        # jobs listed by previous calls that may have changed status since
+        unfinished = [
+            job_arn
+            for job_arn, job in listing.jobs.items()
+            if job_arn not in seen and not is_terminal(JOB_STATE[job["status"]])
+        ]
+        for i in range(0, len(unfinished), DESCRIBE_JOBS_MAX_IDS):
+            batch = unfinished[i : i + DESCRIBE_JOBS_MAX_IDS]
+            for jobdesc in self._call("describe_jobs", jobs=batch)["jobs"]:
+                listing.jobs[jobdesc["jobArn"]] = _to_listed_job(jobdesc)
+                seen.add(jobdesc["jobArn"])
+            # the jobs that describe_jobs does not return anymore are gone
+            for job_arn in batch:
+                if job_arn not in seen:
+                    del listing.jobs[job_arn]
+
+        listing.watermark = watermark
+        # the finished jobs not listed by this call are dropped once AWS
+        # Batch is likely to have dropped them too
+        expired_at = int((time.time() - LIST_CACHE_MAX_AGE_SECONDS) * 1000)
+        for job_arn, job in list(listing.jobs.items()):
+            if (
+                job_arn not in seen
+                and is_terminal(JOB_STATE[job["status"]])
+                and (job.get("stoppedAt") or job["createdAt"]) < expired_at
+            ):
+                del listing.jobs[job_arn]
+
+        num_evict = len(listing.jobs) - LIST_CACHE_MAX_JOBS
+        if num_evict > 0:
+            finished = sorted(
+                (job["createdAt"], job_arn)
+                for job_arn, job in listing.jobs.items()
+                if is_terminal(JOB_STATE[job["status"]])
+            )
+            for _, job_arn in finished[:num_evict]:
+                del listing.jobs[job_arn]
 
+        jobs = []
+        for job_arn, job in listing.jobs.items():
+            app_id = f"{queue_name}:{job['jobName']}"
+            self._job_ids.put(app_id, job_arn)
+            jobs.append(ListAppResponse(app_id=app_id, state=JOB_STATE[job["status"]]))
         return jobs
 
+    def _get_list_cache(self) -> Dict[str, _QueueListing]:
+        if self._list_cache is not None:
+            return self._list_cache
+
+        self._list_cache = {}
+        path = self._list_cache_path
+        if path:
+            self._list_cache = (
+                load_json(
+                    path,
+                    lambda c: {k: _QueueListing(**listing) for k, listing in c.items()},
+                    "list cache",
+                )
+                or {}
+            )
+        return self._list_cache
+
+    def _save_list_cache(self) -> None:
+        path = self._list_cache_path
+        if path and self._list_cache is not None:
+            save_json(
+                path,
+                {key: asdict(listing) for key, listing in self._list_cache.items()},
+                "list cache",
+            )
+
     def _get_torchx_submitted_jobs(self, job_ids: List[str]) -> List[Dict[str, Any]]:
         if not job_ids:
             return []
 
         return [
             jobdesc
-            for jobdesc in self._client.describe_jobs(jobs=job_ids)["jobs"]
+            for jobdesc in self._call("describe_jobs", jobs=job_ids)["jobs"]
             if TAG_TORCHX_VER in jobdesc["tags"]
         ]
 
@@ -641,19 +1013,40 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
         stream_name: str,
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
+        is_finished: Optional[Callable[[], bool]] = None,
     ) -> Iterable[str]:
+        """
+        Yields the events of the log stream. Stops once all the events have been
+        read unless ``is_finished`` is specified, in which case the stream is
+        followed (polled with backoff while no new events arrive) until
+        ``is_finished()`` returns ``True``. ``is_finished`` is called at most
+        once every ``LOG_JOB_STATE_CHECK_INTERVAL`` seconds and a final read
+        is done after it returns ``True`` so that no trailing events are lost.
+        """
 
         next_token = None
+        finished = is_finished is None
+        last_state_check = time.monotonic()
+        backoff = _backoff(LOG_POLL_MIN_INTERVAL, LOG_POLL_MAX_INTERVAL)
+
+        # the (timestamp, ingestionTime, message) of the events with the
+        # latest timestamp delivered so far, used to drop events that are
+        # returned again across token boundaries
+        last_timestamp = -1
+        last_events: Set[Tuple[int, int, str]] = set()
 
         while True:
             args = {}
             if next_token is not None:
                 args["nextToken"] = next_token
+            # CloudWatch timestamps are in milliseconds since epoch
             if until is not None:
-                args["endTime"] = until.timestamp()
+                args["endTime"] = int(until.timestamp() * 1000)
             if since is not None:
-                args["startTime"] = since.timestamp()
+                args["startTime"] = int(since.timestamp() * 1000)
             try:
+                with self._api_calls_lock:
+                    self.api_calls["get_log_events"] += 1
                 response = self._log_client.get_log_events(
                     logGroupName="/aws/batch/job",
                     logStreamName=stream_name,
@@ -662,16 +1055,43 @@ class AWSBatchScheduler(DockerWorkspaceMixin, Scheduler[AWSBatchOpts]):
                     **args,
                 )
             except self._log_client.exceptions.ResourceNotFoundException:
-                return []  # noqa: B901
-            if response["nextForwardToken"] == next_token:
-                break
+                if finished:
+                    return []  # noqa: B901
+                # the stream is created when the first event is logged
+                response = {"nextForwardToken": next_token, "events": []}
+
+            caught_up = response["nextForwardToken"] == next_token
             next_token = response["nextForwardToken"]
 
             for event in response["events"]:
+                timestamp = event.get("timestamp", last_timestamp)
+                key = (timestamp, event.get("ingestionTime", 0), event["message"])
+                if timestamp < last_timestamp or key in last_events:
+                    continue
+                if timestamp > last_timestamp:
+                    last_timestamp = timestamp
+                    last_events.clear()
+                last_events.add(key)
                 yield event["message"] + "\n"
 
+            if not caught_up:
+                backoff = _backoff(LOG_POLL_MIN_INTERVAL, LOG_POLL_MAX_INTERVAL)
+                continue
+            elif finished:
+                break
+
+            now = time.monotonic()
+            if now - last_state_check >= LOG_JOB_STATE_CHECK_INTERVAL:
+                last_state_check = now
+                # read once more after the job finished
+                finished = none_throws(is_finished)()
+                if finished:
+                    continue
+            time.sleep(next(backoff))
+
 
 def create_scheduler(session_name: str, **kwargs: object) -> AWSBatchScheduler:
     return AWSBatchScheduler(
         session_name=session_name,
+        list_cache_path=os.path.expanduser(DEFAULT_LIST_CACHE),
     )
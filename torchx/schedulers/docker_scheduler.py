@@ -4,13 +4,26 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import codecs
 import fnmatch
 import logging
 import os.path
 import tempfile
-from dataclasses import dataclass
+import time
+from concurrent.futures import as_completed, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING, Union
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
 
 import torchx
 import yaml
@@ -21,6 +34,7 @@ from torchx.schedulers.api import (
     ListAppResponse,
     Scheduler,
     split_lines,
+    split_lines_iterator,
     Stream,
 )
 from torchx.schedulers.devices import get_device_mounts
@@ -43,6 +57,7 @@ from typing_extensions import TypedDict
 
 
 if TYPE_CHECKING:
+    from docker import DockerClient
     from docker.models.containers import Container
 
 log: logging.Logger = logging.getLogger(__name__)
@@ -68,6 +83,8 @@ class DockerContainer:
 class DockerJob:
     app_id: str
     containers: List[DockerContainer]
+    # seconds spent in each phase of ``schedule()`` (``pull``, ``start``)
+    timings: Dict[str, float] = field(default_factory=dict)
 
     def __str__(self) -> str:
         return yaml.dump(self.containers)
@@ -83,6 +100,11 @@ LABEL_REPLICA_ID: str = "torchx.pytorch.org/replica-id"
 
 NETWORK = "torchx"
 
+# max number of images pulled concurrently by ``schedule()``
+PULL_PARALLELISM = 4
+# max number of containers started concurrently by ``schedule()``
+START_PARALLELISM = 8
+
 
 def has_docker() -> bool:
     try:
@@ -142,8 +164,13 @@ class DockerScheduler(DockerWorkspaceMixin, Scheduler[DockerOpts]):
             elasticity: false
     """
 
-    def __init__(self, session_name: str) -> None:
-        super().__init__("docker", session_name)
+    def __init__(
+        self, session_name: str, docker_client: Optional["DockerClient"] = None
+    ) -> None:
+        super().__init__("docker", session_name, docker_client=docker_client)
+
+        # container id -> exit code of the exited containers
+        self._exit_codes: Dict[str, int] = {}
 
     def _ensure_network(self) -> None:
         import filelock
@@ -164,34 +191,105 @@ class DockerScheduler(DockerWorkspaceMixin, Scheduler[DockerOpts]):
                     raise
 
     def schedule(self, dryrun_info: AppDryRunInfo[DockerJob]) -> str:
-        client = self._docker_client
-
         req = dryrun_info.request
 
-        images = set()
-        for container in req.containers:
-            images.add(container.image)
-        for image in images:
-            if image.startswith("sha256:"):
-                continue
-            log.info(f"Pulling container image: {image} (this may take a while)")
-            try:
-                client.images.pull(image)
-            except Exception as e:
-                log.warning(f"failed to pull image {image}, falling back to local: {e}")
+        start = time.perf_counter()
+        self._pull_images({container.image for container in req.containers})
+        req.timings["pull"] = time.perf_counter() - start
 
         self._ensure_network()
 
-        for container in req.containers:
-            client.containers.run(
-                container.image,
-                container.command,
-                detach=True,
-                **container.kwargs,
-            )
+        start = time.perf_counter()
+        self._start_containers(req.containers)
+        req.timings["start"] = time.perf_counter() - start
 
+        log.info(
+            f"Scheduled {req.app_id}: "
+            + ", ".join(f"{phase} {secs:.2f}s" for phase, secs in req.timings.items())
+        )
         return req.app_id
 
+    def _pull_images(self, images: Set[str]) -> None:
+        """
+        Pulls the images concurrently. Images referenced by id or pinned by
+        digest that are already present locally are not pulled.
+        """
+        to_pull = sorted(image for image in images if not self._has_pinned(image))
+        if not to_pull:
+            return
+
+        log.info(
+            f"Pulling {len(to_pull)} container image(s): {', '.join(to_pull)}"
+            " (this may take a while)"
+        )
+        with ThreadPoolExecutor(
+            max_workers=min(PULL_PARALLELISM, len(to_pull))
+        ) as executor:
+            futures = {
+                executor.submit(self._pull_image, image): image for image in to_pull
+            }
+            for i, future in enumerate(as_completed(futures)):
+                log.info(
+                    f"[{i + 1}/{len(to_pull)}] {futures[future]}: {future.result()}"
+                )
+
+    def _has_pinned(self, image: str) -> bool:
+        from docker.errors import ImageNotFound
+
+        if image.startswith("sha256:"):
+            return True
+        if "@sha256:" not in image:
+            # tags may have moved, always pull
+            return False
+        try:
+            self._docker_client.images.get(image)
+            return True
+        except ImageNotFound:
+            return False
+
+    def _pull_image(self, image: str) -> str:
+        """
+        Pulls the image and returns a summary of the outcome.
+        """
+        start = time.perf_counter()
+        try:
+            self._docker_client.images.pull(image)
+        except Exception as e:
+            log.warning(f"failed to pull image {image}, falling back to local: {e}")
+            return "failed, using local image"
+        return f"pulled in {time.perf_counter() - start:.2f}s"
+
+    def _start_containers(self, containers: List[DockerContainer]) -> None:
+        """
+        Starts the containers concurrently. If any container fails to start
+        the ones that did start are stopped and the first error is raised.
+        """
+        client = self._docker_client
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(START_PARALLELISM, len(containers)))
+        ) as executor:
+            futures = [
+                executor.submit(
+                    client.containers.run,
+                    container.image,
+                    container.command,
+                    detach=True,
+                    **container.kwargs,
+                )
+                for container in containers
+            ]
+            wait(futures)
+
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        if errors:
+            for f in futures:
+                if f.exception() is None:
+                    try:
+                        f.result().stop()
+                    except Exception as e:
+                        log.warning(f"failed to stop container: {e}")
+            raise errors[0]
+
     def _submit_dryrun(self, app: AppDef, cfg: DockerOpts) -> AppDryRunInfo[DockerJob]:
         from docker.types import DeviceRequest, Mount
 
@@ -331,9 +429,17 @@ class DockerScheduler(DockerWorkspaceMixin, Scheduler[DockerOpts]):
         return containers[0]
 
     def _get_containers(self, app_id: str) -> List["Container"]:
-        client = self._docker_client
-        return client.containers.list(
-            all=True, filters={"label": f"{LABEL_APP_ID}={app_id}"}
+        """
+        Returns the containers of the app. The containers are sparse (not
+        inspected) so their labels, name and image are only available
+        through ``container.attrs`` (see ``_container_info``).
+        """
+        return self._list_containers(label=f"{LABEL_APP_ID}={app_id}")
+
+    def _list_containers(self, label: str) -> List["Container"]:
+        # a non-sparse list inspects every container, one API call each
+        return self._docker_client.containers.list(
+            all=True, sparse=True, filters={"label": label}
         )
 
     def _cancel_existing(self, app_id: str) -> None:
@@ -352,17 +458,22 @@ class DockerScheduler(DockerWorkspaceMixin, Scheduler[DockerOpts]):
         return opts
 
     def _get_app_state(self, container: "Container") -> AppState:
-        if container.status == "exited":
-            # docker doesn't have success/failed states -- we have to call
-            # `wait()` to get the exit code to determine that
-            status = container.wait(timeout=10)
-            if status["StatusCode"] == 0:
-                state = AppState.SUCCEEDED
-            else:
-                state = AppState.FAILED
-        else:
-            state = CONTAINER_STATE[container.status]
-        return state
+        status = container.status
+        if status != "exited":
+            # the container may have been restarted
+            self._exit_codes.pop(container.id, None)
+            return CONTAINER_STATE[status]
+
+        # docker doesn't have success/failed states -- the exit code is only
+        # reported by inspect, exited containers are inspected once
+        exit_code = self._exit_codes.get(container.id)
+        if exit_code is None:
+            state = container.attrs.get("State")
+            if not isinstance(state, dict):
+                container.reload()
+                state = container.attrs["State"]
+            exit_code = self._exit_codes[container.id] = state["ExitCode"]
+        return AppState.SUCCEEDED if exit_code == 0 else AppState.FAILED
 
     def describe(self, app_id: str) -> Optional[DescribeAppResponse]:
         roles = {}
@@ -372,14 +483,15 @@ class DockerScheduler(DockerWorkspaceMixin, Scheduler[DockerOpts]):
 
         containers = self._get_containers(app_id)
         for container in containers:
-            role = container.labels[LABEL_ROLE_NAME]
-            replica_id = container.labels[LABEL_REPLICA_ID]
+            labels, name, image = _container_info(container)
+            role = labels[LABEL_ROLE_NAME]
+            replica_id = labels[LABEL_REPLICA_ID]
 
             if role not in roles:
                 roles[role] = Role(
                     name=role,
                     num_replicas=0,
-                    image=container.image,
+                    image=image,
                 )
                 roles_statuses[role] = RoleStatus(role, [])
             roles[role].num_replicas += 1
@@ -391,25 +503,16 @@ class DockerScheduler(DockerWorkspaceMixin, Scheduler[DockerOpts]):
                     id=int(replica_id),
                     role=role,
                     state=state,
-                    hostname=container.name,
+                    hostname=name,
                 )
             )
             states.append(state)
 
-        state = AppState.UNKNOWN
-        if all(is_terminal(state) for state in states):
-            if all(state == AppState.SUCCEEDED for state in states):
-                state = AppState.SUCCEEDED
-            else:
-                state = AppState.FAILED
-        else:
-            state = next(state for state in states if not is_terminal(state))
-
         return DescribeAppResponse(
             app_id=app_id,
             roles=list(roles.values()),
             roles_statuses=list(roles_statuses.values()),
-            state=state,
+            state=_app_state(states),
         )
 
     def log_iter(
@@ -434,14 +537,14 @@ class DockerScheduler(DockerWorkspaceMixin, Scheduler[DockerOpts]):
         )
 
         if isinstance(logs, (bytes, str)):
-            logs = _to_str(logs)
-
-            if len(logs) == 0:
-                logs = []
-            else:
-                logs = split_lines(logs)
-
-        logs = map(_to_str, logs)
+            logs = split_lines(_to_str(logs))
+        else:
+            # streamed chunks need not end on a line (or utf-8 character) boundary
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            logs = split_lines_iterator(
+                decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+                for chunk in logs
+            )
 
         if regex:
             return filter_regex(regex, logs)
@@ -449,15 +552,37 @@ class DockerScheduler(DockerWorkspaceMixin, Scheduler[DockerOpts]):
             return logs
 
     def list(self) -> List[ListAppResponse]:
-        unique_apps = {
-            ListAppResponse(
-                app_id=cntr.labels[LABEL_APP_ID], state=self._get_app_state(cntr)
-            )
-            for cntr in self._docker_client.containers.list(
-                all=True, filters={"label": f"{LABEL_APP_ID}"}
+        states: Dict[str, List[AppState]] = {}
+        for container in self._list_containers(label=LABEL_APP_ID):
+            labels, _, _ = _container_info(container)
+            states.setdefault(labels[LABEL_APP_ID], []).append(
+                self._get_app_state(container)
             )
-        }
-        return list(unique_apps)
+        return [
+            ListAppResponse(app_id=app_id, state=_app_state(app_states))
+            for app_id, app_states in states.items()
+        ]
+
+
+def _container_info(container: "Container") -> Tuple[Dict[str, str], str, str]:
+    """
+    Returns the labels, name and image of a sparse or inspected container.
+    """
+    attrs = container.attrs
+    if "Config" in attrs:
+        return container.labels, container.name, attrs["Config"].get("Image", "")
+    names = attrs.get("Names") or [container.id]
+    return attrs.get("Labels") or {}, names[0].lstrip("/"), attrs.get("Image", "")
+
+
+def _app_state(states: List[AppState]) -> AppState:
+    if all(is_terminal(state) for state in states):
+        if all(state == AppState.SUCCEEDED for state in states):
+            return AppState.SUCCEEDED
+        else:
+            return AppState.FAILED
+    else:
+        return next(state for state in states if not is_terminal(state))
 
 
 def _to_str(a: Union[str, bytes]) -> str:
@@ -29,6 +29,8 @@ for more information.
 
 import json
 import logging
+import threading
+import time
 import warnings
 from dataclasses import dataclass
 from datetime import datetime
@@ -62,6 +64,7 @@ from torchx.specs.api import (
     BindMount,
     CfgVal,
     DeviceMount,
+    is_terminal,
     macros,
     ReplicaState,
     ReplicaStatus,
@@ -84,6 +87,7 @@ if TYPE_CHECKING:
         V1Pod,
     )
     from kubernetes.client.rest import ApiException
+    from kubernetes.watch import Watch
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -159,6 +163,20 @@ LABEL_APP_NAME = "torchx.pytorch.org/app-name"
 LABEL_ROLE_INDEX = "torchx.pytorch.org/role-index"
 LABEL_ROLE_NAME = "torchx.pytorch.org/role-name"
 LABEL_REPLICA_ID = "torchx.pytorch.org/replica-id"
+LABEL_UNIQUE_NAME = "torchx.pytorch.org/app-id"
+
+# max number of names in a single ``in (...)`` label selector
+LABEL_SELECTOR_MAX_NAMES = 100
+# number of jobs fetched per page when listing jobs
+LIST_PAGE_SIZE = 500
+
+# server side timeout of a single watch request
+WATCH_TIMEOUT_SECONDS = 300
+# minimum interval between re-establishing watch requests
+WATCH_MIN_INTERVAL_SECONDS = 5
+# max seconds the first use of an informer waits for its initial list before
+# falling back to the API server
+INFORMER_SYNC_TIMEOUT_SECONDS = 30
 
 ANNOTATION_ISTIO_SIDECAR = "sidecar.istio.io/inject"
 
@@ -409,7 +427,13 @@ does NOT support retries correctly. More info: https://github.com/volcano-sh/vol
     resource: Dict[str, object] = {
         "apiVersion": "batch.volcano.sh/v1alpha1",
         "kind": "Job",
-        "metadata": {"name": f"{unique_app_id}"},
+        "metadata": {
+            "name": f"{unique_app_id}",
+            "labels": {
+                **app_labels(app),
+                LABEL_UNIQUE_NAME: unique_app_id,
+            },
+        },
         "spec": job_spec,
     }
     return resource
@@ -435,6 +459,189 @@ class KubernetesOpts(TypedDict, total=False):
     priority_class: Optional[str]
 
 
+def _list_job_pages(
+    api: "CustomObjectsApi", namespace: str, label_selector: Optional[str] = None
+) -> Iterable[Dict[str, Any]]:
+    """
+    Lists the Volcano jobs in the namespace yielding one page (list response)
+    at a time.
+    """
+    args: Dict[str, object] = {"limit": LIST_PAGE_SIZE}
+    if label_selector:
+        args["label_selector"] = label_selector
+    while True:
+        resp = api.list_namespaced_custom_object(
+            group="batch.volcano.sh",
+            version="v1alpha1",
+            namespace=namespace,
+            plural="jobs",
+            **args,
+        )
+        yield resp
+        next_token = resp.get("metadata", {}).get("continue")
+        if not next_token:
+            return
+        args["_continue"] = next_token
+
+
+def _job_state(job: Dict[str, Any]) -> AppState:
+    status = job.get("status")
+    return JOB_STATE[status["state"]["phase"]] if status else AppState.UNKNOWN
+
+
+def _resource_version(job: Optional[Dict[str, Any]]) -> Optional[str]:
+    return job["metadata"].get("resourceVersion") if job else None
+
+
+class JobInformer:
+    """
+    Keeps an in-memory index (by name) of the torchx Volcano jobs in a
+    namespace, that is the jobs labelled with ``torchx.pytorch.org/version``.
+
+    A background thread lists the jobs (paged) and then watches them from the
+    resource version of the list, resuming each watch from the last seen or
+    bookmarked resource version. When the resource version expires (410) the
+    jobs are listed again. Watch requests are re-established at most once
+    every ``WATCH_MIN_INTERVAL_SECONDS``.
+    """
+
+    def __init__(self, api: "CustomObjectsApi", namespace: str) -> None:
+        self.api = api
+        self.namespace = namespace
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._cond = threading.Condition()
+        self._synced = False
+        self._stopped = False
+        self._watch: Optional["Watch"] = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"torchx-k8s-informer-{namespace}", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            w = self._watch
+        if w is not None:
+            w.stop()
+
+    def wait_for_sync(self, timeout: float) -> bool:
+        """
+        Waits for the initial list of the jobs, returns whether the index
+        has been populated.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._synced or self._stopped, timeout=timeout)
+            return self._synced
+
+    @property
+    def synced(self) -> bool:
+        with self._cond:
+            return self._synced
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            return self._jobs.get(name)
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            return list(self._jobs.values())
+
+    def wait_for_change(
+        self, name: str, resource_version: Optional[str], timeout: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Waits up to ``timeout`` seconds for the job's resource version to be
+        different from ``resource_version`` (``None`` if the job is not
+        indexed) and returns the job, ``None`` if the job is not indexed.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._stopped
+                or _resource_version(self._jobs.get(name)) != resource_version,
+                timeout=timeout,
+            )
+            return self._jobs.get(name)
+
+    def _run(self) -> None:
+        from kubernetes.client.rest import ApiException
+
+        resource_version = None
+        while not self._stopped:
+            not_before = time.monotonic() + WATCH_MIN_INTERVAL_SECONDS
+            try:
+                if resource_version is None:
+                    resource_version = self._list()
+                resource_version = self._watch_jobs(resource_version)
+            except ApiException as e:
+                if e.status == 410:
+                    # resource version is too old, list the jobs again
+                    resource_version = None
+                else:
+                    logger.warning(f"informer for {self.namespace} failed: {e}")
+            except Exception:
+                logger.exception(f"informer for {self.namespace} failed")
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopped,
+                    timeout=max(0, not_before - time.monotonic()),
+                )
+
+    def _list(self) -> str:
+        jobs = {}
+        resource_version = None
+        for page in _list_job_pages(self.api, self.namespace, LABEL_VERSION):
+            # all the pages are served from the snapshot of the first page
+            resource_version = resource_version or page["metadata"]["resourceVersion"]
+            for job in page["items"]:
+                jobs[job["metadata"]["name"]] = job
+        with self._cond:
+            self._jobs = jobs
+            self._synced = True
+            self._cond.notify_all()
+        assert resource_version is not None
+        return resource_version
+
+    def _watch_jobs(self, resource_version: str) -> str:
+        from kubernetes import watch
+
+        w = watch.Watch()
+        with self._cond:
+            if self._stopped:
+                return resource_version
+            self._watch = w
+        try:
+            for event in w.stream(
+                self.api.list_namespaced_custom_object,
+                group="batch.volcano.sh",
+                version="v1alpha1",
+                namespace=self.namespace,
+                plural="jobs",
+                label_selector=LABEL_VERSION,
+                resource_version=resource_version,
+                timeout_seconds=WATCH_TIMEOUT_SECONDS,
+                allow_watch_bookmarks=True,
+            ):
+                obj = event["object"]
+                resource_version = _resource_version(obj) or resource_version
+                if event["type"] == "BOOKMARK":
+                    continue
+                name = obj["metadata"]["name"]
+                with self._cond:
+                    if event["type"] == "DELETED":
+                        self._jobs.pop(name, None)
+                    else:
+                        self._jobs[name] = obj
+                    self._cond.notify_all()
+        finally:
+            with self._cond:
+                self._watch = None
+        return resource_version
+
+
 class KubernetesScheduler(DockerWorkspaceMixin, Scheduler[KubernetesOpts]):
     """
     KubernetesScheduler is a TorchX scheduling interface to Kubernetes.
@@ -507,6 +714,17 @@ class KubernetesScheduler(DockerWorkspaceMixin, Scheduler[KubernetesOpts]):
     If you run into scheduling issues you may need to reduce the requested CPU
     and memory from the host values.
 
+    **Informer mode**
+
+    By default ``describe``, ``list`` and ``watch`` query the API server on
+    every call. When created with ``informer=True`` the scheduler instead
+    keeps an in-memory index of the torchx jobs of each namespace it is asked
+    about, maintained by a background list+watch (see
+    :py:class:`JobInformer`), and serves these calls from memory. Jobs that
+    are not in the index (e.g. submitted by older versions of torchx) are
+    still looked up on the API server. This is useful for long running
+    processes that track many jobs.
+
     **Compatibility**
 
     .. compatibility::
@@ -528,10 +746,14 @@ class KubernetesScheduler(DockerWorkspaceMixin, Scheduler[KubernetesOpts]):
         session_name: str,
         client: Optional["ApiClient"] = None,
         docker_client: Optional["DockerClient"] = None,
+        informer: bool = False,
     ) -> None:
         super().__init__("kubernetes", session_name, docker_client=docker_client)
 
         self._client = client
+        self._use_informer = informer
+        self._informers: Dict[str, JobInformer] = {}
+        self._informers_lock = threading.Lock()
 
     def _api_client(self) -> "ApiClient":
         from kubernetes import client, config
@@ -553,6 +775,41 @@ class KubernetesScheduler(DockerWorkspaceMixin, Scheduler[KubernetesOpts]):
 
         return client.CustomObjectsApi(self._api_client())
 
+    def _get_informer(self, namespace: str) -> Optional[JobInformer]:
+        """
+        Returns the synced informer of the namespace (starting it on first
+        use), ``None`` if informer mode is off or the informer is not synced.
+        Only the call that starts the informer waits (up to
+        ``INFORMER_SYNC_TIMEOUT_SECONDS``) for the initial list, the other
+        calls query the API server right away until the informer synced in
+        the background.
+        """
+        if not self._use_informer:
+            return None
+        with self._informers_lock:
+            informer = self._informers.get(namespace)
+            started = informer is None
+            if informer is None:
+                informer = JobInformer(self._custom_objects_api(), namespace)
+                informer.start()
+                self._informers[namespace] = informer
+        if started:
+            if not informer.wait_for_sync(INFORMER_SYNC_TIMEOUT_SECONDS):
+                logger.warning(
+                    f"informer for namespace {namespace} is not synced,"
+                    " querying the API server directly until it is"
+                )
+                return None
+        elif not informer.synced:
+            return None
+        return informer
+
+    def close(self) -> None:
+        with self._informers_lock:
+            for informer in self._informers.values():
+                informer.stop()
+            self._informers.clear()
+
     def _get_job_name_from_exception(self, e: "ApiException") -> Optional[str]:
         try:
             return json.loads(e.body)["details"]["name"]
@@ -665,8 +922,11 @@ class KubernetesScheduler(DockerWorkspaceMixin, Scheduler[KubernetesOpts]):
 
     def describe(self, app_id: str) -> Optional[DescribeAppResponse]:
         namespace, name = app_id.split(":")
-        roles = {}
-        roles_statuses = {}
+        informer = self._get_informer(namespace)
+        job = informer.get(name) if informer else None
+        if job:
+            return self._job_to_describe_response(app_id, job)
+        # not a torchx labelled job or not yet seen by the informer
         resp = self._custom_objects_api().get_namespaced_custom_object_status(
             group="batch.volcano.sh",
             version="v1alpha1",
@@ -674,6 +934,70 @@ class KubernetesScheduler(DockerWorkspaceMixin, Scheduler[KubernetesOpts]):
             plural="jobs",
             name=name,
         )
+        return self._job_to_describe_response(app_id, resp)
+
+    def describe_many(
+        self, app_ids: List[str]
+    ) -> Dict[str, Optional[DescribeAppResponse]]:
+        """
+        Describes the apps by listing the requested jobs by their
+        ``torchx.pytorch.org/app-id`` label, batching the names into set-based
+        label selectors. Jobs that are not labelled (e.g. submitted by older
+        versions of torchx) are described individually.
+        """
+        from kubernetes.client.rest import ApiException
+
+        names: Dict[str, Dict[str, str]] = {}
+        for app_id in app_ids:
+            namespace, name = app_id.split(":")
+            names.setdefault(namespace, {})[app_id] = name
+
+        out: Dict[str, Optional[DescribeAppResponse]] = {}
+        for namespace, app_names in names.items():
+            unique_names = sorted(set(app_names.values()))
+            jobs = {}
+            informer = self._get_informer(namespace)
+            if informer:
+                for name in unique_names:
+                    job = informer.get(name)
+                    if job:
+                        jobs[name] = job
+                unique_names = []
+            for i in range(0, len(unique_names), LABEL_SELECTOR_MAX_NAMES):
+                selected = ",".join(unique_names[i : i + LABEL_SELECTOR_MAX_NAMES])
+                for job in self._list_jobs(
+                    namespace, label_selector=f"{LABEL_UNIQUE_NAME} in ({selected})"
+                ):
+                    jobs[job["metadata"]["name"]] = job
+
+            for app_id, name in app_names.items():
+                if name in jobs:
+                    out[app_id] = self._job_to_describe_response(app_id, jobs[name])
+                    continue
+                try:
+                    out[app_id] = self.describe(app_id)
+                except ApiException as e:
+                    if e.status != 404:
+                        raise
+                    out[app_id] = None
+        return out
+
+    def _list_jobs(
+        self, namespace: str, label_selector: Optional[str] = None
+    ) -> Iterable[Dict[str, Any]]:
+        """
+        Lists the Volcano jobs in the namespace one page at a time.
+        """
+        for page in _list_job_pages(
+            self._custom_objects_api(), namespace, label_selector
+        ):
+            yield from page["items"]
+
+    def _job_to_describe_response(
+        self, app_id: str, resp: Dict[str, Any]
+    ) -> DescribeAppResponse:
+        roles = {}
+        roles_statuses = {}
         status = resp.get("status")
         if status:
             state_str = status["state"]["phase"]
@@ -704,6 +1028,107 @@ class KubernetesScheduler(DockerWorkspaceMixin, Scheduler[KubernetesOpts]):
             state=app_state,
         )
 
+    def watch(
+        self,
+        app_id: str,
+        interval: float = 1,
+        max_interval: float = 30,
+    ) -> Iterable[DescribeAppResponse]:
+        """
+        Same as ``Scheduler.watch()`` except that rather than polling, this
+        watches the Volcano job and yields as soon as the job's state changes.
+        ``interval`` and ``max_interval`` are ignored. Each watch request is
+        held open for ``WATCH_TIMEOUT_SECONDS`` and re-established (from the
+        last seen or bookmarked resource version) at most once every
+        ``WATCH_MIN_INTERVAL_SECONDS``.
+
+        In informer mode the job is watched from the informer's index instead.
+        """
+        from kubernetes import watch
+        from kubernetes.client.rest import ApiException
+
+        namespace, name = app_id.split(":")
+        informer = self._get_informer(namespace)
+        if informer and informer.get(name):
+            yield from self._watch_informer(informer, app_id)
+            return
+        api = self._custom_objects_api()
+
+        try:
+            desc = self.describe(app_id)
+        except ApiException as e:
+            if e.status == 404:
+                return
+            raise
+        yield desc
+        if is_terminal(desc.state):
+            return
+        last_state = desc.state
+
+        resource_version = None
+        while True:
+            args: Dict[str, object] = {
+                "group": "batch.volcano.sh",
+                "version": "v1alpha1",
+                "namespace": namespace,
+                "plural": "jobs",
+                "field_selector": f"metadata.name={name}",
+                "timeout_seconds": WATCH_TIMEOUT_SECONDS,
+                "allow_watch_bookmarks": True,
+            }
+            if resource_version:
+                args["resource_version"] = resource_version
+
+            # don't re-open the watch more often than the floor even if the
+            # server closes it early
+            not_before = time.monotonic() + WATCH_MIN_INTERVAL_SECONDS
+            w = watch.Watch()
+            try:
+                for event in w.stream(api.list_namespaced_custom_object, **args):
+                    obj = event["object"]
+                    if event["type"] == "ERROR":
+                        # the object is a Status, not a job
+                        raise ApiException(
+                            status=obj.get("code"), reason=obj.get("message")
+                        )
+                    if event["type"] == "BOOKMARK":
+                        resource_version = obj["metadata"]["resourceVersion"]
+                        continue
+                    if event["type"] == "DELETED":
+                        w.stop()
+                        return
+                    resource_version = obj["metadata"].get("resourceVersion")
+                    desc = self._job_to_describe_response(app_id, obj)
+                    if desc.state != last_state:
+                        last_state = desc.state
+                        yield desc
+                    if is_terminal(desc.state):
+                        w.stop()
+                        return
+            except ApiException as e:
+                if e.status != 410:
+                    raise
+                # resource version is too old, restart the watch from the current state
+                resource_version = None
+            time.sleep(max(0, not_before - time.monotonic()))
+
+    def _watch_informer(
+        self, informer: JobInformer, app_id: str
+    ) -> Iterable[DescribeAppResponse]:
+        name = app_id.split(":")[1]
+        job = informer.get(name)
+        last_state = None
+        while job:
+            desc = self._job_to_describe_response(app_id, job)
+            if desc.state != last_state:
+                last_state = desc.state
+                yield desc
+            if is_terminal(desc.state):
+                return
+            job = informer.wait_for_change(
+                name, _resource_version(job), timeout=WATCH_TIMEOUT_SECONDS
+            )
+
     def log_iter(
         self,
         app_id: str,
@@ -748,36 +1173,43 @@ class KubernetesScheduler(DockerWorkspaceMixin, Scheduler[KubernetesOpts]):
             return iterator
 
     def list(self) -> List[ListAppResponse]:
+        """
+        Lists the Volcano jobs in the active context's namespace, paging
+        through them ``LIST_PAGE_SIZE`` jobs at a time. In informer mode only
+        the torchx jobs are listed, from memory.
+        """
         active_context = self._get_active_context()
         namespace = active_context["context"]["namespace"]
-        resp = self._custom_objects_api().list_namespaced_custom_object(
-            group="batch.volcano.sh",
-            version="v1alpha1",
-            namespace=namespace,
-            plural="jobs",
-            timeout_seconds=30,
-        )
+        informer = self._get_informer(namespace)
+        jobs = informer.jobs() if informer else self._list_jobs(namespace)
         return [
             ListAppResponse(
-                app_id=f"{namespace}:{app['metadata']['name']}",
-                state=JOB_STATE[app["status"]["state"]["phase"]],
+                app_id=f"{namespace}:{job['metadata']['name']}",
+                state=_job_state(job),
             )
-            for app in resp["items"]
+            for job in jobs
         ]
 
 
 def create_scheduler(session_name: str, **kwargs: Any) -> KubernetesScheduler:
     return KubernetesScheduler(
         session_name=session_name,
+        informer=kwargs.get("informer", False),
     )
 
 
+def app_labels(app: AppDef) -> Dict[str, str]:
+    return {
+        LABEL_VERSION: torchx.__version__,
+        LABEL_APP_NAME: app.name,
+    }
+
+
 def pod_labels(
     app: AppDef, role_idx: int, role: Role, replica_id: int
 ) -> Dict[str, str]:
     return {
-        LABEL_VERSION: torchx.__version__,
-        LABEL_APP_NAME: app.name,
+        **app_labels(app),
         LABEL_ROLE_INDEX: str(role_idx),
         LABEL_ROLE_NAME: role.name,
         LABEL_REPLICA_ID: str(replica_id),
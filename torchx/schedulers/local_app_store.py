@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+On-disk store of the apps launched by the ``LocalScheduler``. Apps are
+recorded in a SQLite database so that ``list``, ``status`` and ``log`` work
+from a different process than the one that launched the app (e.g. a separate
+``torchx`` CLI invocation).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from torchx.specs.api import AppState
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# env var that overrides the location of the local app store
+ENV_TORCHX_LOCAL_APP_STORE = "TORCHX_LOCAL_APP_STORE"
+DEFAULT_LOCAL_APP_STORE: str = os.path.join("~", ".torchx", "local_apps.db")
+
+# max number of records kept in the store, the least recently updated
+# records are pruned first
+MAX_RECORDS = 1000
+
+# seconds to wait on the database lock held by another process
+_LOCK_TIMEOUT = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    app_id TEXT PRIMARY KEY,
+    session_name TEXT NOT NULL,
+    log_dir TEXT NOT NULL,
+    state TEXT NOT NULL,
+    last_updated REAL NOT NULL,
+    roles TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS apps_by_session ON apps (session_name, last_updated);
+"""
+
+
+@dataclass
+class LocalAppRecord:
+    """
+    Persisted state of a local app. ``roles`` maps the role name to the list
+    of replica infos (``replica_id``, ``pid``, ``exitcode``, ``stdout``,
+    ``stderr`` and ``error_file``), same as the ``SUCCESS`` file written
+    into the app's log dir.
+    """
+
+    app_id: str
+    session_name: str
+    log_dir: str
+    state: AppState
+    roles: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    last_updated: float = -1
+
+
+def default_store_path() -> str:
+    path = os.getenv(ENV_TORCHX_LOCAL_APP_STORE) or DEFAULT_LOCAL_APP_STORE
+    return os.path.expanduser(path)
+
+
+class LocalAppStore:
+    """
+    SQLite backed store of ``LocalAppRecord`` keyed by app id. Safe to use
+    from multiple threads and processes.
+
+    If the database cannot be opened (e.g. the home dir is read-only) the
+    store logs a warning and behaves as an empty store so that the apps can
+    still be launched.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            conn = sqlite3.connect(path, timeout=_LOCK_TIMEOUT, check_same_thread=False)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            log.warning(
+                f"Unable to open the local app store at {path}: {e}."
+                " Apps will not be visible outside of this process"
+            )
+
+    def put(self, record: LocalAppRecord) -> None:
+        """
+        Inserts or replaces the record for ``record.app_id`` and prunes the
+        store down to ``MAX_RECORDS``.
+        """
+        conn = self._conn
+        if not conn:
+            return
+        record.last_updated = time.time()
+        with self._lock, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO apps VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    record.app_id,
+                    record.session_name,
+                    record.log_dir,
+                    record.state.name,
+                    record.last_updated,
+                    json.dumps(record.roles),
+                ),
+            )
+            conn.execute(
+                "DELETE FROM apps WHERE app_id IN"
+                " (SELECT app_id FROM apps ORDER BY last_updated DESC LIMIT -1 OFFSET ?)",
+                (MAX_RECORDS,),
+            )
+
+    def get(self, app_id: str) -> Optional[LocalAppRecord]:
+        rows = self._query("SELECT * FROM apps WHERE app_id = ?", (app_id,))
+        return rows[0] if rows else None
+
+    def list(self, session_name: str) -> List[LocalAppRecord]:
+        """
+        Returns the records of the apps launched with ``session_name``
+        ordered from the least to the most recently updated.
+        """
+        return self._query(
+            "SELECT * FROM apps WHERE session_name = ? ORDER BY last_updated",
+            (session_name,),
+        )
+
+    def delete(self, app_ids: List[str]) -> None:
+        conn = self._conn
+        if not conn or not app_ids:
+            return
+        with self._lock, conn:
+            conn.executemany(
+                "DELETE FROM apps WHERE app_id = ?", [(i,) for i in app_ids]
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def _query(self, sql: str, params: Any) -> List[LocalAppRecord]:
+        conn = self._conn
+        if not conn:
+            return []
+        with self._lock:
+            rows = conn.execute(sql, params).fetchall()
+        return [
+            LocalAppRecord(
+                app_id=app_id,
+                session_name=session_name,
+                log_dir=log_dir,
+                state=AppState[state],
+                roles=json.loads(roles),
+                last_updated=last_updated,
+            )
+            for (app_id, session_name, log_dir, state, last_updated, roles) in rows
+        ]
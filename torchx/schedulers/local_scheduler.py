@@ -11,6 +11,7 @@ components locally via subprocesses.
 """
 
 import abc
+import heapq
 import io
 import json
 import logging
@@ -24,10 +25,21 @@ import tempfile
 import threading
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from types import FrameType
-from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, TextIO
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
 
 from torchx.schedulers.api import (
     AppDryRunInfo,
@@ -39,7 +51,12 @@ from torchx.schedulers.api import (
     Stream,
 )
 from torchx.schedulers.ids import make_unique
-from torchx.schedulers.streams import Tee
+from torchx.schedulers.local_app_store import (
+    default_store_path,
+    LocalAppRecord,
+    LocalAppStore,
+)
+from torchx.schedulers.streams import FileWatch, get_file_watcher, Tee
 from torchx.specs.api import AppDef, AppState, is_terminal, macros, NONE, Role, runopts
 
 from torchx.util.types import none_throws
@@ -52,6 +69,9 @@ STDOUT_LOG = "stdout.log"
 STDERR_LOG = "stderr.log"
 COMBINED_LOG = "combined.log"
 
+# max number of replicas launched concurrently by ``LocalScheduler.schedule()``
+LAUNCH_PARALLELISM = 16
+
 
 NA: str = "<N/A>"
 
@@ -271,6 +291,13 @@ class _LocalReplica:
 
     error_file: str
 
+    # seconds it took to create the log files and spawn the process
+    launch_secs: float = 0.0
+
+    # start time of the process, tells it apart from a process that reuses
+    # its pid after it exited (see ``_replica_alive``)
+    start_time: Optional[int] = None
+
     def terminate(self) -> None:
         """
         terminates the underlying process for this replica
@@ -301,6 +328,82 @@ class _LocalReplica:
             return self.proc.returncode != 0
 
 
+def _get_structured_error_msg(error_files: Iterable[str]) -> str:
+    """
+    Returns the contents of the error file that was written first
+    or ``NONE`` if none of the given error files exist.
+    """
+    error_file = None
+    min_timestamp = sys.maxsize
+    for f in error_files:
+        if not os.path.exists(f):
+            continue
+        mtime = os.path.getmtime(f)
+        if mtime < min_timestamp:
+            min_timestamp = mtime
+            error_file = f
+
+    if not error_file:
+        return NONE
+
+    with open(error_file, "r") as fp:
+        return json.dumps(json.load(fp))
+
+
+def _proc_start_time(pid: int) -> Optional[int]:
+    """
+    Returns the start time of the process (in clock ticks since boot) or
+    ``None`` if it cannot be read (e.g. no ``/proc`` on macOS).
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "r") as fp:
+            stat = fp.read()
+    except OSError:
+        return None
+    # the process name may contain spaces and parens, the fields after it
+    # start at the third one and ``starttime`` is the 22nd
+    return int(stat.rsplit(")", 1)[1].split()[19])
+
+
+def _replica_alive(replica: Dict[str, Any]) -> bool:
+    """
+    Returns whether the process of a replica recorded in the app store is
+    still running. Replicas are started in a new session so they lead their
+    process group, a different pgid or start time means the pid got reused.
+    """
+    pid = replica["pid"]
+    try:
+        if os.getpgid(pid) != pid:
+            return False
+    except ProcessLookupError:
+        return False
+    start_time = replica.get("start_time")
+    return start_time is None or start_time == _proc_start_time(pid)
+
+
+def _record_state(record: LocalAppRecord) -> AppState:
+    """
+    Returns the state of an app launched by another process. Since the
+    replicas are not children of this process the state is derived from
+    whether the replica pids are alive and the exit codes recorded by the
+    process that launched the app.
+    """
+    if is_terminal(record.state):
+        return record.state
+
+    replicas = [r for replicas in record.roles.values() for r in replicas]
+    if any(r["exitcode"] is None and _replica_alive(r) for r in replicas):
+        return AppState.RUNNING
+    elif any(r["exitcode"] is None for r in replicas):
+        # the app exited after the launching process exited
+        # so there is no exit code to tell whether it failed
+        return AppState.UNKNOWN
+    elif any(r["exitcode"] != 0 for r in replicas):
+        return AppState.FAILED
+    else:
+        return AppState.SUCCEEDED
+
+
 class _LocalAppDef:
     """
     Container object used by ``LocalhostScheduler`` to group the pids that
@@ -317,6 +420,9 @@ class _LocalAppDef:
         self.state: AppState = AppState.PENDING
         # time (in seconds since epoch) when the last set_state method() was called
         self.last_updated: float = -1
+        # time (in seconds since epoch) when the app was last used after it
+        # finished, used as the LRU key when evicting from the apps cache
+        self.lru_time: float = -1
 
     def add_replica(self, role_name: str, replica: _LocalReplica) -> None:
         procs = self.role_replicas.setdefault(role_name, [])
@@ -342,19 +448,9 @@ class _LocalAppDef:
             for r in replicas:
                 r.terminate()
 
-        timeout = 10  # seconds
-        end = time.monotonic() + timeout
-        for replicas in self.role_replicas.values():
-            for r in replicas:
-                time_to_wait = end - time.monotonic()
-                if time_to_wait <= 0:
-                    break
-                try:
-                    r.proc.wait(time_to_wait)
-                except subprocess.TimeoutExpired:
-                    # Ignore the timeout expired exception, since
-                    # the child process will be forcefully terminated via SIGKILL
-                    pass
+        # processes still alive after the timeout are
+        # forcefully terminated via SIGKILL
+        self.wait(timeout=10)
 
         # Stage #2: SIGKILL
         for replicas in self.role_replicas.values():
@@ -367,37 +463,35 @@ class _LocalAppDef:
                 r.proc.wait()
                 r.terminate()
 
-    def _get_error_file(self) -> Optional[str]:
-        error_file = None
-        min_timestamp = sys.maxsize
+    def wait(self, timeout: float) -> bool:
+        """
+        Blocks until all the replica processes have exited or ``timeout``
+        seconds have passed, whichever happens first.
+
+        Returns:
+            ``True`` if all the replica processes have exited, ``False`` on timeout
+        """
+        end = time.monotonic() + timeout
         for replicas in self.role_replicas.values():
-            for replica in replicas:
-                if not os.path.exists(replica.error_file):
-                    continue
-                mtime = os.path.getmtime(replica.error_file)
-                if mtime < min_timestamp:
-                    min_timestamp = mtime
-                    error_file = replica.error_file
-        return error_file
+            for r in replicas:
+                time_to_wait = end - time.monotonic()
+                if time_to_wait <= 0 and r.is_alive():
+                    return False
+                try:
+                    r.proc.wait(max(time_to_wait, 0))
+                except subprocess.TimeoutExpired:
+                    return False
+        return True
 
     def get_structured_error_msg(self) -> str:
-        error_file = self._get_error_file()
-        if not error_file:
-            return NONE
-
-        with open(error_file, "r") as f:
-            return json.dumps(json.load(f))
+        return _get_structured_error_msg(
+            r.error_file for replicas in self.role_replicas.values() for r in replicas
+        )
 
-    def close(self) -> None:
+    def roles_info(self) -> Dict[RoleName, List[Dict[str, Any]]]:
         """
-        terminates all procs associated with this app,
-        and closes any resources (e.g. log file handles)
-        and if log_dir has been specified,
-        writes a SUCCESS file indicating that the log files
-        have been flushed and closed and ready to read.
-        NOT safe to call multiple times!
+        Returns the pid, exitcode and log files of each replica keyed by role.
         """
-        self.kill()
 
         def _fmt_io_filename(std_io: Optional[BinaryIO]) -> str:
             if std_io:
@@ -405,9 +499,6 @@ class _LocalAppDef:
             else:
                 return "<CONSOLE>"
 
-        # drop a SUCCESS file in the log dir to signal that
-        # the log file handles have all been closed properly
-        # and that they can reliably be read
         roles_info = {}
         for role_name, replicas in self.role_replicas.items():
             replicas_info = []
@@ -419,9 +510,28 @@ class _LocalAppDef:
                     "stdout": _fmt_io_filename(replica.stdout),
                     "stderr": _fmt_io_filename(replica.stderr),
                     "error_file": replica.error_file,
+                    "launch_secs": replica.launch_secs,
+                    "start_time": replica.start_time,
                 }
                 replicas_info.append(replica_info)
             roles_info[role_name] = replicas_info
+        return roles_info
+
+    def close(self) -> None:
+        """
+        terminates all procs associated with this app,
+        and closes any resources (e.g. log file handles)
+        and if log_dir has been specified,
+        writes a SUCCESS file indicating that the log files
+        have been flushed and closed and ready to read.
+        NOT safe to call multiple times!
+        """
+        self.kill()
+
+        # drop a SUCCESS file in the log dir to signal that
+        # the log file handles have all been closed properly
+        # and that they can reliably be read
+        roles_info = self.roles_info()
         app_info = {
             "app_id": self.id,
             "log_dir": self.log_dir,
@@ -522,6 +632,11 @@ class LocalScheduler(Scheduler[LocalOpts]):
     .. note::
         The orphan cleanup only works if `LocalScheduler` is instantiated from the main thread.
 
+    Launched apps are recorded in an on-disk app store (``~/.torchx/local_apps.db``
+    or the path set in the ``TORCHX_LOCAL_APP_STORE`` env var) so that they can be
+    listed, described, cancelled and their logs read from other processes
+    (e.g. ``torchx list -s local_cwd``).
+
     **Config Options**
 
     .. runopts::
@@ -555,11 +670,14 @@ class LocalScheduler(Scheduler[LocalOpts]):
         image_provider_class: Callable[[LocalOpts], ImageProvider],
         cache_size: int = 100,
         extra_paths: Optional[List[str]] = None,
+        app_store_path: Optional[str] = None,
     ) -> None:
         super().__init__("local", session_name)
 
-        # TODO T72035686 replace dict with a proper LRUCache data structure
         self._apps: Dict[AppId, _LocalAppDef] = {}
+        # min-heap of (lru_time, app_id) of the finished apps in ``self._apps``,
+        # entries that no longer match the app's ``lru_time`` are stale
+        self._lru: List[Tuple[float, AppId]] = []
         self._image_provider_class = image_provider_class
 
         if cache_size <= 0:
@@ -573,6 +691,10 @@ class LocalScheduler(Scheduler[LocalOpts]):
         self._base_log_dir: Optional[str] = None
         self._created_tmp_log_dir: bool = False
 
+        # opened lazily since most schedulers (e.g. dryrun) never need it
+        self._app_store_path: str = app_store_path or default_store_path()
+        self._app_store: Optional[LocalAppStore] = None
+
     def _run_opts(self) -> runopts:
         opts = runopts()
         opts.add(
@@ -604,28 +726,59 @@ class LocalScheduler(Scheduler[LocalOpts]):
     def _evict_lru(self) -> bool:
         """
         Evicts one least recently used element from the apps cache. LRU is defined as
-        the oldest app in a terminal state (e.g. oldest finished app).
+        the finished app (e.g. app in a terminal state) that was least recently described.
+        Evicted apps can still be described from the app store.
 
         Returns:
             ``True`` if an entry was evicted, ``False`` if no entries could be evicted
             (e.g. all apps are running)
         """
-        lru_time = sys.maxsize
-        lru_app_id = None
-        for (app_id, app) in self._apps.items():
-            if is_terminal(app.state):
-                if app.last_updated <= lru_time:
-                    lru_app_id = app_id
-
-        if lru_app_id:
-            # evict LRU finished app from the apps cache
-            del self._apps[lru_app_id]
-
-            log.debug(f"evicting app: {lru_app_id}, from local scheduler cache")
-            return True
-        else:
-            log.debug(f"no apps evicted, all {len(self._apps)} apps are running")
-            return False
+        while self._lru:
+            lru_time, app_id = heapq.heappop(self._lru)
+            app = self._apps.get(app_id)
+            if app and app.lru_time == lru_time:
+                # evict LRU finished app from the apps cache
+                del self._apps[app_id]
+                log.debug(f"evicting app: {app_id}, from local scheduler cache")
+                return True
+
+        log.debug(f"no apps evicted, all {len(self._apps)} apps are running")
+        return False
+
+    def _touch(self, app: _LocalAppDef) -> None:
+        """
+        Marks the finished ``app`` as the most recently used app in the apps cache.
+        """
+        app.lru_time = time.monotonic()
+        heapq.heappush(self._lru, (app.lru_time, app.id))
+        if len(self._lru) > 2 * self._cache_size:
+            # drop the stale entries left behind by the previous touches
+            self._lru = [
+                (lru_time, app_id)
+                for (lru_time, app_id) in self._lru
+                if app_id in self._apps and self._apps[app_id].lru_time == lru_time
+            ]
+            heapq.heapify(self._lru)
+
+    def _get_app_store(self) -> LocalAppStore:
+        if not self._app_store:
+            self._app_store = LocalAppStore(self._app_store_path)
+        return self._app_store
+
+    def _persist(self, app: _LocalAppDef) -> None:
+        """
+        Records the state, replica pids, exit codes and log files of ``app`` in
+        the app store so that it can be listed and described by other processes.
+        """
+        self._get_app_store().put(
+            LocalAppRecord(
+                app_id=app.id,
+                session_name=self.session_name,
+                log_dir=app.log_dir,
+                state=app.state,
+                roles=app.roles_info(),
+            )
+        )
 
     def _get_file_io(self, file: Optional[str]) -> Optional[io.FileIO]:
         """
@@ -651,11 +804,17 @@ class LocalScheduler(Scheduler[LocalOpts]):
         role_name: RoleName,
         replica_id: int,
         replica_params: ReplicaParam,
+        parent_env: Optional[Dict[str, str]] = None,
     ) -> _LocalReplica:
         """
         Same as ``subprocess.Popen(**popen_kwargs)`` but is able to take ``stdout`` and ``stderr``
         as file name ``str`` rather than a file-like obj.
+
+        ``parent_env`` is a copy of ``os.environ`` shared by all the replicas
+        of the app so that it is not copied for each replica. Defaults to
+        ``os.environ`` if not specified.
         """
+        start = time.perf_counter()
 
         stdout_ = self._get_file_io(replica_params.stdout)
         stderr_ = self._get_file_io(replica_params.stderr)
@@ -670,10 +829,12 @@ class LocalScheduler(Scheduler[LocalOpts]):
 
         # inherit parent's env vars since 99.9% of the time we want this behavior
         # just make sure we override the parent's env vars with the user_defined ones
-        env = os.environ.copy()
+        if parent_env is None:
+            parent_env = os.environ.copy()
+        env = dict(parent_env)
         env.update(replica_params.env)
         # PATH is a special one, instead of overriding, append
-        env["PATH"] = _join_PATH(replica_params.env.get("PATH"), os.getenv("PATH"))
+        env["PATH"] = _join_PATH(replica_params.env.get("PATH"), parent_env.get("PATH"))
 
         # default to unbuffered python for faster responsiveness locally
         env.setdefault("PYTHONUNBUFFERED", "x")
@@ -697,6 +858,8 @@ class LocalScheduler(Scheduler[LocalOpts]):
             stderr=stderr_,
             combined=combined_,
             error_file=env.get("TORCHELASTIC_ERROR_FILE", "<N/A>"),
+            launch_secs=time.perf_counter() - start,
+            start_time=_proc_start_time(proc.pid),
         )
 
     def _get_app_log_dir(self, app_id: str, cfg: LocalOpts) -> str:
@@ -737,24 +900,77 @@ class LocalScheduler(Scheduler[LocalOpts]):
 
         os.makedirs(app_log_dir)
         local_app = _LocalAppDef(app_id, app_log_dir)
-
-        for role_name in request.role_params.keys():
-            role_params = request.role_params[role_name]
-            role_log_dirs = request.role_log_dirs[role_name]
-            for replica_id in range(len(role_params)):
-                replica_params = role_params[replica_id]
-                replica_log_dir = role_log_dirs[replica_id]
-
-                os.makedirs(replica_log_dir)
-                replica = self._popen(
-                    role_name,
-                    replica_id,
-                    replica_params,
-                )
+        for role_name, replicas in self._launch(request).items():
+            for replica in replicas:
                 local_app.add_replica(role_name, replica)
         self._apps[app_id] = local_app
+        self._persist(local_app)
         return app_id
 
+    def _launch(self, request: PopenRequest) -> Dict[RoleName, List[_LocalReplica]]:
+        """
+        Launches the replicas of all the roles in ``request`` concurrently
+        (at most ``LAUNCH_PARALLELISM`` at a time) since creating the log files
+        and spawning each process is mostly spent blocked on syscalls.
+        If any replica fails to launch, the ones that did launch are terminated.
+
+        Returns:
+            the launched replicas of each role ordered by replica id
+        """
+        # copied once for all replicas rather than once per replica
+        parent_env = os.environ.copy()
+
+        def launch_replica(
+            role_name: RoleName, replica_id: int, replica_log_dir: str
+        ) -> _LocalReplica:
+            os.makedirs(replica_log_dir)
+            return self._popen(
+                role_name,
+                replica_id,
+                request.role_params[role_name][replica_id],
+                parent_env,
+            )
+
+        start = time.perf_counter()
+        num_replicas = sum(len(params) for params in request.role_params.values())
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(LAUNCH_PARALLELISM, num_replicas))
+        ) as executor:
+            futures = {
+                role_name: [
+                    executor.submit(launch_replica, role_name, replica_id, log_dir)
+                    for replica_id, log_dir in enumerate(
+                        request.role_log_dirs[role_name]
+                    )
+                ]
+                for role_name in request.role_params.keys()
+            }
+
+        launched: Dict[RoleName, List[_LocalReplica]] = {}
+        errors = []
+        for role_name, role_futures in futures.items():
+            for f in role_futures:
+                if f.exception():
+                    errors.append(f.exception())
+                else:
+                    launched.setdefault(role_name, []).append(f.result())
+
+        if errors:
+            for replicas in launched.values():
+                for replica in replicas:
+                    replica.terminate()
+            raise errors[0]
+
+        launch_secs = [
+            r.launch_secs for replicas in launched.values() for r in replicas
+        ]
+        log.debug(
+            f"Launched {num_replicas} replicas of app: {request.app_id}"
+            f" in {time.perf_counter() - start:.3f}s"
+            f" (slowest replica: {max(launch_secs, default=0):.3f}s)"
+        )
+        return launched
+
     def _submit_dryrun(
         self, app: AppDef, cfg: LocalOpts
     ) -> AppDryRunInfo[PopenRequest]:
@@ -901,10 +1117,11 @@ class LocalScheduler(Scheduler[LocalOpts]):
         return PopenRequest(app_id, app_log_dir, role_params, role_log_dirs)
 
     def describe(self, app_id: str) -> Optional[DescribeAppResponse]:
-        if app_id not in self._apps:
-            return None
+        local_app = self._apps.get(app_id)
+        if not local_app:
+            # launched by another process or evicted from the apps cache
+            return self._describe_record(app_id)
 
-        local_app = self._apps[app_id]
         structured_error_msg = local_app.get_structured_error_msg()
 
         # check if the app is known to have finished
@@ -925,9 +1142,12 @@ class LocalScheduler(Scheduler[LocalOpts]):
             else:
                 state = AppState.SUCCEEDED
             local_app.set_state(state)
+            if is_terminal(state):
+                self._persist(local_app)
 
         if is_terminal(local_app.state):
             local_app.close()
+            self._touch(local_app)
 
         resp = DescribeAppResponse()
         resp.app_id = app_id
@@ -937,6 +1157,51 @@ class LocalScheduler(Scheduler[LocalOpts]):
         resp.ui_url = f"file://{local_app.log_dir}"
         return resp
 
+    def _describe_record(self, app_id: str) -> Optional[DescribeAppResponse]:
+        record = self._get_app_store().get(app_id)
+        if not record:
+            return None
+
+        resp = DescribeAppResponse()
+        resp.app_id = app_id
+        resp.structured_error_msg = _get_structured_error_msg(
+            r["error_file"] for replicas in record.roles.values() for r in replicas
+        )
+        resp.state = _record_state(record)
+        resp.num_restarts = 0
+        resp.ui_url = f"file://{record.log_dir}"
+        return resp
+
+    def watch(
+        self,
+        app_id: str,
+        interval: float = 1,
+        max_interval: float = 30,
+    ) -> Iterable[DescribeAppResponse]:
+        """
+        Same as ``Scheduler.watch()`` except that rather than polling, this
+        blocks on the replica processes exiting so that the terminal state is
+        yielded as soon as the last replica exits. ``interval`` is ignored and
+        ``max_interval`` bounds how long to block before re-checking the app
+        (e.g. to observe a cancel issued from another thread).
+        """
+        last_state = None
+        while True:
+            desc = self.describe(app_id)
+            if desc is None:
+                return
+            if desc.state != last_state:
+                last_state = desc.state
+                yield desc
+            if is_terminal(desc.state):
+                return
+            app = self._apps.get(app_id)
+            if app:
+                app.wait(timeout=max_interval)
+            else:
+                # launched by another process, cannot wait on its replicas
+                time.sleep(interval)
+
     def log_iter(
         self,
         app_id: str,
@@ -954,14 +1219,22 @@ class LocalScheduler(Scheduler[LocalOpts]):
                 " These will be ignored and all log lines will be returned"
             )
 
-        app = self._apps[app_id]
+        app = self._apps.get(app_id)
+        if app:
+            log_dir = app.log_dir
+        else:
+            record = self._get_app_store().get(app_id)
+            if not record:
+                raise KeyError(f"app: {app_id} not found")
+            log_dir = record.log_dir
+
         STREAM_FILES = {
             None: COMBINED_LOG,
             Stream.COMBINED: COMBINED_LOG,
             Stream.STDOUT: STDOUT_LOG,
             Stream.STDERR: STDERR_LOG,
         }
-        log_file = os.path.join(app.log_dir, role_name, str(k), STREAM_FILES[streams])
+        log_file = os.path.join(log_dir, role_name, str(k), STREAM_FILES[streams])
 
         if not os.path.isfile(log_file):
             raise RuntimeError(
@@ -976,24 +1249,77 @@ class LocalScheduler(Scheduler[LocalOpts]):
         return iterator
 
     def list(self) -> List[ListAppResponse]:
-        raise Exception(
-            "App handles cannot be listed for local scheduler as they are not persisted by torchx"
-        )
+        apps = []
+        for record in self._get_app_store().list(self.session_name):
+            if record.app_id in self._apps:
+                state = none_throws(self.describe(record.app_id)).state
+            else:
+                state = _record_state(record)
+            apps.append(ListAppResponse(app_id=record.app_id, state=state))
+        return apps
 
     def _cancel_existing(self, app_id: str) -> None:
         # can assume app_id exists
-        local_app = self._apps[app_id]
-        local_app.close()
-        local_app.state = AppState.CANCELLED
+        local_app = self._apps.get(app_id)
+        if local_app:
+            local_app.close()
+            local_app.set_state(AppState.CANCELLED)
+            self._persist(local_app)
+            self._touch(local_app)
+        else:
+            self._cancel_record(app_id)
+
+    def _cancel_record(self, app_id: str) -> None:
+        """
+        Cancels an app launched by another process by sending ``SIGTERM`` to
+        the process group of each of its replicas that is still running.
+        """
+        store = self._get_app_store()
+        record = none_throws(store.get(app_id))
+        if is_terminal(_record_state(record)):
+            return
+
+        for replicas in record.roles.values():
+            for r in replicas:
+                pid = r["pid"]
+                if r["exitcode"] is not None or not _replica_alive(r):
+                    continue
+                try:
+                    os.killpg(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    log.debug(f"Process {pid} already got terminated")
+        record.state = AppState.CANCELLED
+        store.put(record)
 
     def close(self) -> None:
         # terminate all apps
         for (app_id, app) in self._apps.items():
             log.debug(f"Terminating app: {app_id}")
             app.kill()
+
+        store = self._app_store
+        if store:
+            # record the exit codes of the killed apps
+            for app in self._apps.values():
+                if not is_terminal(app.state):
+                    self._persist(app)
+
         # delete logdir if torchx created a log dir
         if self._base_log_dir and self._created_tmp_log_dir:
             shutil.rmtree(self._base_log_dir, ignore_errors=True)
+            if store:
+                # the logs of these apps are gone, do not list them anymore
+                store.delete(
+                    [
+                        app_id
+                        for (app_id, app) in self._apps.items()
+                        if app.log_dir.startswith(self._base_log_dir)
+                    ]
+                )
+
+        if store:
+            store.close()
+            self._app_store = None
 
     def __del__(self) -> None:
         try:
@@ -1007,6 +1333,16 @@ class LocalScheduler(Scheduler[LocalOpts]):
 
 
 class LogIterator:
+    """
+    Follows the log file of a running app. Rather than sleep-polling the file
+    the iterator blocks on a ``FileWatch`` (see ``torchx.schedulers.streams``)
+    until the file is written to and only checks whether the app has finished
+    (via ``scheduler.describe()``) when no data arrived for
+    ``CHECK_FINISHED_INTERVAL`` seconds.
+    """
+
+    CHECK_FINISHED_INTERVAL: float = 1
+
     def __init__(
         self,
         app_id: str,
@@ -1021,32 +1357,57 @@ class LogIterator:
         # pyre-fixme: Scheduler opts
         self._scheduler: Scheduler = scheduler
         self._app_finished: bool = not should_tail
+        self._watch: Optional[FileWatch] = None
+        self._last_checked: float = 0
 
     def _check_finished(self) -> None:
         # either the app (already finished) was evicted from the LRU cache
         # -- or -- the app reached a terminal state (and still in the cache)
+        self._last_checked = time.monotonic()
         desc = self._scheduler.describe(self._app_id)
         if not desc or is_terminal(desc.state):
             self._app_finished = True
         else:
             self._app_finished = False
 
+    def _wait_for_change(self) -> None:
+        """
+        Blocks until the log file changes and checks whether the app finished
+        if nothing changed for ``CHECK_FINISHED_INTERVAL`` seconds.
+        """
+        watch = self._watch
+        assert watch is not None
+        changed = watch.wait(self.CHECK_FINISHED_INTERVAL)
+        if (
+            not changed
+            or time.monotonic() - self._last_checked >= self.CHECK_FINISHED_INTERVAL
+        ):
+            self._check_finished()
+
+    def _close(self) -> None:
+        if self._log_fp:
+            self._log_fp.close()
+        if self._watch:
+            self._watch.close()
+
     def __iter__(self) -> "LogIterator":
+        self._watch = get_file_watcher().watch(self._log_file)
+        self._check_finished()  # check to see if app has finished running
+
         # wait for the log file to appear or app to finish (whichever happens first)
         while True:
-            self._check_finished()  # check to see if app has finished running
-
             if os.path.isfile(self._log_file):
                 self._log_fp = open(self._log_file, "rt", newline="\n")  # noqa: P201
                 break
 
             if self._app_finished:
+                self._close()
                 # app finished without ever writing a log file
                 raise RuntimeError(
                     f"app: {self._app_id} finished without writing: {self._log_file}"
                 )
 
-            time.sleep(0.1)
+            self._wait_for_change()
         return self
 
     def __next__(self) -> str:
@@ -1058,13 +1419,11 @@ class LogIterator:
             if not line:
                 # we have reached EOF and app finished
                 if self._app_finished:
-                    log_fp.close()
+                    self._close()
                     raise StopIteration()
 
                 # if app is still running we need to wait for more possible log lines
-                # sleep for 1 sec to avoid thrashing the follow
-                time.sleep(0.1)
-                self._check_finished()
+                self._wait_for_change()
             else:
                 return line
 
@@ -1074,4 +1433,5 @@ def create_scheduler(session_name: str, **kwargs: Any) -> LocalScheduler:
         session_name=session_name,
         cache_size=kwargs.get("cache_size", 100),
         image_provider_class=CWDImageProvider,
+        app_store_path=kwargs.get("app_store_path"),
     )
@@ -25,9 +25,10 @@ import os.path
 import re
 import subprocess
 import tempfile
+import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import torchx
 from torchx.schedulers.api import (
@@ -55,6 +56,7 @@ from torchx.specs import (
     VolumeMount,
 )
 from torchx.util import shlex
+from torchx.util.cache import TTLCache
 from typing_extensions import TypedDict
 
 JOB_STATE: Dict[str, AppState] = {
@@ -67,6 +69,14 @@ JOB_STATE: Dict[str, AppState] = {
     "SSUSP": AppState.PENDING,
 }
 
+# ``bjobs -o`` fields read by ``describe()``
+BJOBS_DESCRIBE_FIELDS = "proj name stat exit_code output_dir"
+# output dirs of the jobs of an app are cached for this many seconds so that
+# reading the logs of several replicas runs ``bjobs`` only once
+LOG_DIR_CACHE_TTL_SECONDS = 60
+# ``bhosts`` output used to pick the rank0 host is cached for this many seconds
+HOSTS_CACHE_TTL_SECONDS = 60
+
 
 def get_job_state(state_str: str, exit_code: str) -> AppState:
     state = AppState.UNKNOWN
@@ -440,6 +450,11 @@ class LsfScheduler(Scheduler[LsfOpts]):
     def __init__(self, session_name: str) -> None:
         super().__init__("lsf", session_name)
 
+        # app id -> ``bjobs -o "proj name output_dir"`` output of its jobs
+        self._log_dirs: TTLCache[str, str] = TTLCache(ttl=LOG_DIR_CACHE_TTL_SECONDS)
+        # (``bhosts`` output, time.monotonic() it expires at)
+        self._hosts: Optional[Tuple[str, float]] = None
+
     def _run_opts(self) -> runopts:
         opts = runopts()
         opts.add(
@@ -481,10 +496,31 @@ class LsfScheduler(Scheduler[LsfOpts]):
             path = os.path.join(req.jobdir or tempdir, f"{req.app_id}.sh")
             req.cmd += [path]
             with open(path, "w") as f:
-                f.write(req.materialize(find_rank0_host(req.app.roles[0])))
+                rank0_host = find_rank0_host_from_bhosts_stdout(
+                    self._get_hosts(), req.app.roles[0]
+                )
+                f.write(req.materialize(rank0_host))
             subprocess.run(req.cmd, stdout=subprocess.PIPE, check=True)
         return req.app_id
 
+    def _get_hosts(self) -> str:
+        """
+        Returns the (cached) ``bhosts`` output used by
+        :py:func:`find_rank0_host_from_bhosts_stdout`.
+        """
+        now = time.monotonic()
+        if self._hosts is not None and now < self._hosts[1]:
+            return self._hosts[0]
+        p = subprocess.run(
+            ["bhosts", "-noheader", "-o", "hname max ng"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        hosts = p.stdout.decode("utf-8")
+        self._hosts = (hosts, now + HOSTS_CACHE_TTL_SECONDS)
+        return hosts
+
     def _validate(self, app: AppDef, scheduler: str) -> None:
         # Skip validation step for lsf
         pass
@@ -516,21 +552,50 @@ class LsfScheduler(Scheduler[LsfOpts]):
         )
 
     def describe(self, app_id: str) -> Optional[DescribeAppResponse]:
+        return self.describe_many([app_id])[app_id]
+
+    def describe_many(
+        self, app_ids: List[str]
+    ) -> Dict[str, Optional[DescribeAppResponse]]:
+        """
+        Describes the apps with a single ``bjobs`` call. ``bjobs -P`` only
+        takes a single project so the jobs of all the apps are listed when
+        describing more than one app. The output dirs of the jobs are cached
+        for ``log_iter()``.
+        """
+        if not app_ids:
+            return {}
+
+        cmd = ["bjobs", "-noheader", "-a"]
+        if len(set(app_ids)) == 1:
+            cmd += ["-P", app_ids[0]]
         p = subprocess.run(
-            [
-                "bjobs",
-                "-noheader",
-                "-a",
-                "-P",
-                app_id,
-                "-o",
-                "proj name stat exit_code",
-            ],
+            cmd + ["-o", BJOBS_DESCRIBE_FIELDS],
             stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL,
             check=True,
         )
-        return bjobs_msg_to_describe(app_id=app_id, msg=p.stdout.decode("utf-8"))
+
+        # app id -> bjobs output lines of its jobs
+        lines: Dict[str, List[str]] = {app_id: [] for app_id in app_ids}
+        for line in p.stdout.decode("utf-8").split("\n"):
+            proj = line.split(" ")[0]
+            if proj in lines:
+                lines[proj].append(line)
+
+        out = {}
+        for app_id, app_lines in lines.items():
+            log_dirs = [
+                " ".join(split[:2] + split[4:5])
+                for split in (line.split(" ") for line in app_lines)
+                if len(split) >= 5
+            ]
+            if log_dirs:
+                self._log_dirs.put(app_id, "".join(f"{line}\n" for line in log_dirs))
+            out[app_id] = bjobs_msg_to_describe(
+                app_id=app_id, msg="".join(f"{line}\n" for line in app_lines)
+            )
+        return out
 
     def log_iter(
         self,
@@ -543,18 +608,31 @@ class LsfScheduler(Scheduler[LsfOpts]):
         should_tail: bool = False,
         streams: Optional[Stream] = None,
     ) -> Iterable[str]:
-        p = subprocess.run(
-            ["bjobs", "-noheader", "-a", "-P", app_id, "-o", "proj name output_dir"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            check=True,
-        )
+        msg = self._log_dirs.get(app_id)
+        if msg is None:
+            p = subprocess.run(
+                [
+                    "bjobs",
+                    "-noheader",
+                    "-a",
+                    "-P",
+                    app_id,
+                    "-o",
+                    "proj name output_dir",
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+            msg = p.stdout.decode("utf-8")
+            if msg:
+                self._log_dirs.put(app_id, msg)
         log_file = bjobs_msg_to_log_file(
             app_id=app_id,
             role_name=role_name,
             k=k,
             streams=streams,
-            msg=p.stdout.decode("utf-8"),
+            msg=msg,
         )
         iterator = split_lines_iterator(
             LogIterator(app_id, log_file, self, should_tail=should_tail)
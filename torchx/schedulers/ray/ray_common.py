@@ -8,6 +8,13 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
 TORCHX_RANK0_HOST: str = "TORCHX_RANK0_HOST"
+# env var of the ray driver with the json serialized actors of the job
+TORCHX_RAY_ACTORS: str = "TORCHX_RAY_ACTORS"
+# env var of the ray driver with the placement group readiness timeout
+TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT: str = "TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT"
+DEFAULT_PLACEMENT_GROUP_TIMEOUT: int = 100
+# prefix of the driver log line with the json startup phase timings
+TORCHX_RAY_TIMINGS: str = "TORCHX_RAY_TIMINGS"
 
 
 @dataclass
@@ -20,3 +27,14 @@ class RayActor:
     num_cpus: int = 1
     num_gpus: int = 0
     min_replicas: Optional[int] = None
+    replica_id: int = 0
+    # number of times the actor is recreated if it dies
+    max_retries: int = 0
+
+
+def command_actor_name(role: str, replica_id: int) -> str:
+    """
+    Returns the name of the command actor running the replica, Ray prefixes
+    the lines the actor logs with ``(<name> pid=...)``.
+    """
+    return f"{role}/{replica_id}"
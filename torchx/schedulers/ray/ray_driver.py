@@ -17,6 +17,17 @@ acquired the resources from the ray cluster, the actor scheduled to this placeme
 will be executed. Command actors are state machines their behavior is defined by the
 _step function, this give more flexibility to us if we want to bette handle the
 node failures.
+
+A command actor that dies (e.g. its node is preempted) is recreated in its
+placement group up to ``max_retries`` times, if it was the rank 0 actor the
+next scheduled actor is elected as the new rank 0 and the running actors are
+recreated too so that they rendezvous with the new rank 0.
+
+All the placement groups are created up front and the command actors are
+created right away, so that ray places the actors as soon as their placement
+group is ready. The time from the start of the driver to each startup phase is
+logged and printed as a ``TORCHX_RAY_TIMINGS <json>`` line as soon as the
+command is first executed.
 """
 import json
 import logging
@@ -24,25 +35,51 @@ import os
 import socket
 import subprocess
 import sys
+import time
 
 from contextlib import closing
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 import ray
+from ray.exceptions import RayActorError
 from ray.util.placement_group import PlacementGroup
 
 if TYPE_CHECKING:
-    from torchx.schedulers.ray.ray_common import RayActor, TORCHX_RANK0_HOST
+    from torchx.schedulers.ray.ray_common import (
+        command_actor_name,
+        DEFAULT_PLACEMENT_GROUP_TIMEOUT,
+        RayActor,
+        TORCHX_RANK0_HOST,
+        TORCHX_RAY_ACTORS,
+        TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT,
+        TORCHX_RAY_TIMINGS,
+    )
 
 # Hack to make code work for tests as well as running ray job.
 # For tests the `torchx.schedulers.ray.ray_common` import must be used
 # For running ray jobs `ray_common` import must be used
 try:
     # pyre-fixme[21]: Could not find a module corresponding to import `ray_common`.
-    from ray_common import RayActor, TORCHX_RANK0_HOST  # noqa: F811
+    from ray_common import (  # noqa: F811
+        command_actor_name,
+        DEFAULT_PLACEMENT_GROUP_TIMEOUT,
+        RayActor,
+        TORCHX_RANK0_HOST,
+        TORCHX_RAY_ACTORS,
+        TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT,
+        TORCHX_RAY_TIMINGS,
+    )
 except ModuleNotFoundError:
-    from torchx.schedulers.ray.ray_common import RayActor, TORCHX_RANK0_HOST
+    from torchx.schedulers.ray.ray_common import (
+        command_actor_name,
+        DEFAULT_PLACEMENT_GROUP_TIMEOUT,
+        RayActor,
+        TORCHX_RANK0_HOST,
+        TORCHX_RAY_ACTORS,
+        TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT,
+        TORCHX_RAY_TIMINGS,
+    )
 
 _logger: logging.Logger = logging.getLogger(__name__)
 _logger.setLevel(logging.getLevelName(os.environ.get("LOGLEVEL", "INFO")))
@@ -64,9 +101,16 @@ class CommandActorScheduled(RayResult):
 
 @ray.remote
 class CommandActor:  # pragma: no cover
-    def __init__(self, cmd: List[str], env: Dict[str, str]) -> None:
+    def __init__(
+        self, cmd: List[str], env: Dict[str, str], name: str = "CommandActor"
+    ) -> None:
         self.cmd: List[str] = cmd
         self.env: Dict[str, str] = env
+        self.name = name
+
+    def __repr__(self) -> str:
+        # used by ray as the prefix of the lines logged by the actor
+        return self.name
 
     def exec_module(
         self, master_addr: str, master_port: int, actor_id: str
@@ -80,6 +124,7 @@ class CommandActor:  # pragma: no cover
         worker_evn = {}
         worker_evn.update(os.environ)
         worker_evn.update(self.env)
+        worker_evn.pop(TORCHX_RAY_ACTORS, None)
         worker_evn[TORCHX_RANK0_HOST] = master_addr
         popen = subprocess.Popen(self.cmd, env=worker_evn)
 
@@ -107,13 +152,13 @@ class CommandActor:  # pragma: no cover
 def load_actor_json(filename: str) -> List[RayActor]:
     """Loading replicas specifications from a JSON file"""
     with open(filename) as f:
-        actors: List[RayActor] = []
         # Yes this is gross but it works
-        actor_dict = json.load(f)
-        actor_dict = json.loads(actor_dict)
-        for actor in actor_dict:
-            actors.append(RayActor(**actor))
-        return actors
+        return load_actors(json.load(f))
+
+
+def load_actors(actors_json: str) -> List[RayActor]:
+    """Loading replicas specifications from a JSON string"""
+    return [RayActor(**actor) for actor in json.loads(actors_json)]
 
 
 def create_placement_group_async(replicas: List[RayActor]) -> PlacementGroup:
@@ -133,11 +178,66 @@ class ActorInfo:
     pg: PlacementGroup
     replica: RayActor
     actor: CommandActor
+    # time.monotonic() when the actor was created
+    created_at: float = 0.0
+    # whether the actor is executing the command
+    started: bool = False
+
+
+# buckets (in seconds) of the command actor placement latency histogram
+PLACEMENT_LATENCY_BOUNDARIES: List[float] = [0.1, 0.5, 1, 5, 10, 30, 60, 300, 900]
+
+
+@dataclass
+class DriverMetrics:
+    """
+    Restart counts and placement latencies (seconds from creating a command
+    actor to it being scheduled) of the command actors by actor name. When the
+    driver is connected to a ray cluster they are also exported as ray
+    metrics.
+    """
+
+    restarts: Dict[str, int] = field(default_factory=dict)
+    placement_latencies: Dict[str, List[float]] = field(default_factory=dict)
+    _restarts_counter: Any = None
+    _placement_histogram: Any = None
+
+    def _export(self) -> bool:
+        if self._restarts_counter is None and ray.is_initialized():
+            from ray.util.metrics import Counter, Histogram
+
+            self._restarts_counter = Counter(
+                "torchx_command_actor_restarts",
+                description="Number of restarts of the command actors",
+                tag_keys=("actor",),
+            )
+            self._placement_histogram = Histogram(
+                "torchx_command_actor_placement_seconds",
+                description="Time from creating a command actor to it being scheduled",
+                boundaries=PLACEMENT_LATENCY_BOUNDARIES,
+                tag_keys=("actor",),
+            )
+        return self._restarts_counter is not None
+
+    def record_restart(self, name: str) -> None:
+        self.restarts[name] = self.restarts.get(name, 0) + 1
+        if self._export():
+            self._restarts_counter.inc(tags={"actor": name})
+
+    def record_placement(self, name: str, latency: float) -> None:
+        self.placement_latencies.setdefault(name, []).append(latency)
+        if self._export():
+            self._placement_histogram.observe(latency, tags={"actor": name})
 
 
 class RayDriver:
-    def __init__(self, replicas: List[RayActor]) -> None:
+    def __init__(
+        self,
+        replicas: List[RayActor],
+        placement_group_timeout: float = DEFAULT_PLACEMENT_GROUP_TIMEOUT,
+    ) -> None:
         self.replicas = replicas
+        self.placement_group_timeout = placement_group_timeout
         self.master_node_id: Optional[str] = None  # the actor id of the master node
         self.rank_0_address: Optional[str] = None
         self.rank_0_port: Optional[int] = None
@@ -155,12 +255,25 @@ class RayDriver:
             str, ActorInfo
         ] = {}  # store the info used to recover an actor
         self.active_tasks: List["ray.ObjectRef"] = []  # list of active tasks
+        # the actor id of the command actor of each active task
+        self.actor_id_of_task: Dict["ray.ObjectRef", str] = {}
+        self.metrics = DriverMetrics()
+        self.start_time: float = time.monotonic()
+        # seconds from the start of the driver to the first time each phase
+        # (placement_group_ready, actor_scheduled, rank0_elected, first_exec)
+        # was reached
+        self.timings: Dict[str, float] = {}
 
         self.terminating: bool = False  # if the job has finished and being terminated
         self.command_actors_count: int = 0  # number of created command actors
 
     def init_placement_groups(self) -> None:
         """Initialize all placement groups needed for this job"""
+        self.create_placement_groups()
+        self.wait_for_placement_group()
+
+    def create_placement_groups(self) -> None:
+        """Create all placement groups of this job without waiting for them"""
         # find the actor specifications of a given placement group
         replica_ix_of_pg: List[int] = [0] + list(
             range(
@@ -168,12 +281,20 @@ class RayDriver:
                 self.max_replicas + 1,
             )
         )
-        # create all the placement groups
-        initial_group = create_placement_group_async(
-            self.replicas[replica_ix_of_pg[0] : replica_ix_of_pg[1]]
-        )
+        # the group of the minimum replicas is created first so that ray
+        # schedules it before the elastic groups
+        for i in range(len(replica_ix_of_pg) - 1):
+            self.placement_groups.append(
+                create_placement_group_async(
+                    self.replicas[replica_ix_of_pg[i] : replica_ix_of_pg[i + 1]]
+                )
+            )
+
+    def wait_for_placement_group(self) -> None:
+        """Wait for the placement group of the minimum replicas to be ready"""
+        initial_group = self.placement_groups[0]
         _logger.info("Waiting for minimum placement group to start.")
-        ready = initial_group.wait(100)
+        ready = initial_group.wait(self.placement_group_timeout)
         if not ready:  # pragma: no cover
             raise TimeoutError(
                 "Placement group creation timed out. Make sure "
@@ -184,13 +305,17 @@ class RayDriver:
                     ray.available_resources(), initial_group.bundle_specs
                 )
             )
-        self.placement_groups.append(initial_group)
-        for i in range(1, len(replica_ix_of_pg) - 1):
-            self.placement_groups.append(
-                create_placement_group_async(
-                    self.replicas[replica_ix_of_pg[i] : replica_ix_of_pg[i + 1]]
-                )
-            )
+        self.record_timing("placement_group_ready")
+
+    def record_timing(self, phase: str) -> None:
+        """Record the first time the job reached the startup ``phase``"""
+        if phase not in self.timings:
+            elapsed = time.monotonic() - self.start_time
+            self.timings[phase] = elapsed
+            _logger.info(f"Reached {phase} after {elapsed:.3f}s")
+            if phase == "first_exec":
+                # the startup is over, read by RayScheduler.driver_timings()
+                print(f"{TORCHX_RAY_TIMINGS} {json.dumps(self.timings)}", flush=True)
 
     def pop_actor_info(self, actor_id: str) -> ActorInfo:
         """Remove and return the info of a dead command actor"""
@@ -203,18 +328,80 @@ class RayDriver:
             placement_group=pg,
             num_cpus=replica.num_cpus,
             num_gpus=replica.num_gpus,
-        ).remote(replica.command, replica.env)
+        ).remote(
+            replica.command,
+            replica.env,
+            command_actor_name(replica.name, replica.replica_id),
+        )
 
         # get the actor id of the created actor
         actor_id = actor._actor_id.hex()
         # launch a task to check if the actor is scheduled
-        self.active_tasks.append(actor.schedule.remote(actor_id))
+        self._add_task(actor.schedule.remote(actor_id), actor_id)
         # save the actor info for recovering from node failures
         self.actor_info_of_id[actor_id] = ActorInfo(
             actor=actor,
             pg=pg,
             replica=replica,
+            created_at=time.monotonic(),
+        )
+
+    def _add_task(self, task: "ray.ObjectRef", actor_id: str) -> None:
+        self.active_tasks.append(task)
+        self.actor_id_of_task[task] = actor_id
+
+    def recover_actor(self, actor_id: str, error: RayActorError) -> None:
+        """
+        Recreates a dead command actor in its placement group. Raises if the
+        actor already used up its ``max_retries``.
+        """
+        info = self.pop_actor_info(actor_id)
+        replica = info.replica
+        name = command_actor_name(replica.name, replica.replica_id)
+        if info.started:
+            self.command_actors_count -= 1
+        was_rank_0 = actor_id == self.master_node_id
+        if was_rank_0:
+            # the next scheduled actor is elected as rank 0
+            self.master_node_id = None
+        if self.terminating:
+            _logger.warning(f"Command actor {name} died while terminating: {error}")
+            return
+
+        restarts = self.metrics.restarts.get(name, 0)
+        if restarts >= replica.max_retries:
+            raise RuntimeError(
+                f"Command actor {name} died after {restarts} restarts"
+            ) from error
+        self.metrics.record_restart(name)
+        _logger.warning(
+            f"Command actor {name} died, restarting it"
+            f" ({restarts + 1}/{replica.max_retries}): {error}"
         )
+        self.create_and_schedule_actor(info.pg, replica)
+        if was_rank_0:
+            self.restart_running_actors()
+
+    def restart_running_actors(self) -> None:
+        """
+        Recreates the command actors that are executing the command so that
+        they rendezvous with the newly elected rank 0 instead of the dead one.
+        """
+        for actor_id, info in list(self.actor_info_of_id.items()):
+            if not info.started:
+                continue
+            replica = info.replica
+            name = command_actor_name(replica.name, replica.replica_id)
+            _logger.warning(f"Rank 0 died, restarting command actor {name}")
+            self.pop_actor_info(actor_id)
+            self.command_actors_count -= 1
+            # the results of the killed actor are ignored
+            tasks = {t for t, a in self.actor_id_of_task.items() if a == actor_id}
+            for task in tasks:
+                del self.actor_id_of_task[task]
+            self.active_tasks = [t for t in self.active_tasks if t not in tasks]
+            ray.kill(info.actor)
+            self.create_and_schedule_actor(info.pg, replica)
 
     def place_command_actors(self) -> None:
         """Creating all command actors in all placement groups"""
@@ -233,32 +420,61 @@ class RayDriver:
         """Handling command actor's return"""
         result: RayResult  # execution result
         _logger.info(f"running ray.wait on {self.active_tasks}")
-        # ray.wait is partial waiting
+        # ray.wait is partial waiting, block for one result then also take
+        # the other results that are ready
         completed_tasks, self.active_tasks = ray.wait(self.active_tasks)
+        if self.active_tasks:
+            ready_tasks, self.active_tasks = ray.wait(
+                self.active_tasks, num_returns=len(self.active_tasks), timeout=0
+            )
+            completed_tasks += ready_tasks
         # If a failure occurs the ObjectRef will be marked as completed.
         # Calling ray.get will expose the failure as a RayActorError.
         for object_ref in completed_tasks:
-            result = ray.get(object_ref)
+            if object_ref not in self.actor_id_of_task:
+                # the actor was restarted after the task completed
+                continue
+            actor_id = self.actor_id_of_task.pop(object_ref)
+            try:
+                result = ray.get(object_ref)
+            except RayActorError as e:
+                self.recover_actor(actor_id, e)
+                if self.terminating and self.command_actors_count == 0:
+                    return True
+                continue
+
             if isinstance(result, CommandActorScheduled):
                 if not self.terminating:
-                    actor = self.actor_info_of_id[result.id].actor
+                    self.record_timing("actor_scheduled")
+                    info = self.actor_info_of_id[result.id]
+                    replica = info.replica
+                    self.metrics.record_placement(
+                        command_actor_name(replica.name, replica.replica_id),
+                        time.monotonic() - info.created_at,
+                    )
+                    actor = info.actor
                     if self.master_node_id is None:
                         # make this actor be the master node
                         self.master_node_id = result.id
                         self.rank_0_address, self.rank_0_port = ray.get(
                             actor.get_actor_address_and_port.remote()  # pyre-ignore
                         )
-                        self.active_tasks.append(
+                        self.record_timing("rank0_elected")
+                        self._add_task(
                             actor.exec_module.remote(  # pyre-ignore
                                 "localhost", 0, result.id
-                            )
+                            ),
+                            result.id,
                         )
                     else:
-                        self.active_tasks.append(
+                        self._add_task(
                             actor.exec_module.remote(
                                 self.rank_0_address, self.rank_0_port, result.id
-                            )
+                            ),
+                            result.id,
                         )
+                    info.started = True
+                    self.record_timing("first_exec")
                     self.command_actors_count += 1
             elif isinstance(result, TaskCompleted):
                 self.terminating = (
@@ -289,16 +505,33 @@ class RayDriver:
             terminal = self._step()
             if terminal:
                 break
+        _logger.info(
+            f"Command actor restarts: {self.metrics.restarts},"
+            f" placement latencies (s): {self.metrics.placement_latencies}"
+        )
+        _logger.info(f"Startup phase timings (s): {self.timings}")
 
 
 def main() -> None:  # pragma: no cover
-    actors: List[RayActor] = load_actor_json("actors.json")
-    driver = RayDriver(actors)
+    actors_json = os.environ.get(TORCHX_RAY_ACTORS)
+    actors: List[RayActor] = (
+        load_actors(actors_json) if actors_json else load_actor_json("actors.json")
+    )
+    driver = RayDriver(
+        actors,
+        placement_group_timeout=float(
+            os.environ.get(
+                TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT, DEFAULT_PLACEMENT_GROUP_TIMEOUT
+            )
+        ),
+    )
     ray.init(address="auto", namespace="torchx-ray")
-    driver.init_placement_groups()
+    driver.create_placement_groups()
     _logger.info("Successfully created placement groups")
+    # the actors are placed by ray once their placement group is ready
     driver.place_command_actors()
     _logger.info("Successfully placed command actors")
+    driver.wait_for_placement_group()
     _logger.info("Entering main loop, start executing the script on worker nodes")
     driver.run()
 
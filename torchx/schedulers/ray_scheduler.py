@@ -4,17 +4,26 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import asyncio
 import dataclasses
+import hashlib
 import json
 import logging
 import os
+import queue
 import re
+import stat
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
 from shutil import copy2, rmtree
-from typing import Any, cast, Dict, Iterable, List, Optional, Tuple  # noqa
+from typing import Any, cast, Dict, Iterable, Iterator, List, Optional, Tuple  # noqa
+
+import fsspec
 
 from torchx.schedulers.api import (
     AppDryRunInfo,
@@ -24,16 +33,32 @@ from torchx.schedulers.api import (
     ListAppResponse,
     Scheduler,
     split_lines,
+    split_lines_iterator,
     Stream,
 )
 from torchx.schedulers.ids import make_unique
-from torchx.schedulers.ray.ray_common import RayActor, TORCHX_RANK0_HOST
+from torchx.schedulers.ray.ray_common import (
+    command_actor_name,
+    DEFAULT_PLACEMENT_GROUP_TIMEOUT,
+    RayActor,
+    TORCHX_RANK0_HOST,
+    TORCHX_RAY_ACTORS,
+    TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT,
+    TORCHX_RAY_TIMINGS,
+)
 from torchx.specs import AppDef, macros, NONE, ReplicaStatus, Role, RoleStatus, runopts
+from torchx.workspace.api import _digest_file
 from torchx.workspace.dir_workspace import TmpDirWorkspaceMixin
 from typing_extensions import TypedDict
 
 
 try:
+    import requests
+    from ray._private.runtime_env.packaging import (
+        _dir_travel,
+        _get_excludes,
+        _zip_directory,
+    )
     from ray.autoscaler import sdk as ray_autoscaler_sdk
     from ray.dashboard.modules.job.common import JobStatus
     from ray.dashboard.modules.job.sdk import JobSubmissionClient
@@ -55,7 +80,27 @@ class RayOpts(TypedDict, total=False):
     dashboard_address: Optional[str]
     working_dir: Optional[str]
     requirements: Optional[str]
-
+    placement_group_timeout: Optional[int]
+
+
+# max number of log chunks buffered between the log stream and the reader
+LOG_TAIL_QUEUE_SIZE = 64
+# seconds to wait before reconnecting to the log stream of a running job
+LOG_TAIL_RECONNECT_INTERVAL = 2
+# ``driver_timings`` stops reading the log stream of a running job once no
+# output arrived for this many seconds
+DRIVER_TIMINGS_IDLE_TIMEOUT: float = 2
+# the role name of the combined log of all the actors
+RAY_LOG_ROLE = "ray"
+# actors serialized to more than this many bytes are written to the working
+# dir instead of the TORCHX_RAY_ACTORS env var (the working dir is then
+# uploaded by ray on every submission)
+ACTORS_ENV_MAX_SIZE: int = 64 * 1024
+# number of working dir files hashed concurrently
+PACKAGE_DIGEST_PARALLELISM = 8
+# seconds a cached job submission client may be idle before its connection is
+# checked again before reuse
+CLIENT_HEALTH_CHECK_INTERVAL = 60
 
 if _has_ray:
 
@@ -69,6 +114,67 @@ if _has_ray:
         JobStatus.STOPPED: AppState.CANCELLED,
     }
 
+    class _PooledJobSubmissionClient(JobSubmissionClient):
+        """
+        ``JobSubmissionClient`` that sends its requests over a single
+        ``requests.Session`` so that the connection to the dashboard is kept
+        alive between requests (the base client opens a new connection per
+        request). The client is marked unhealthy when the dashboard does not
+        answer a health check.
+        """
+
+        def __init__(self, address: str) -> None:
+            self._session = requests.Session()
+            self._session.hooks["response"].append(self._on_response)
+            self.healthy = True
+            self.last_used: float = time.monotonic()
+            # the base class checks the dashboard version on init
+            super().__init__(address)
+
+        def _on_response(
+            self, r: "requests.Response", *args: Any, **kwargs: Any
+        ) -> None:
+            self.last_used = time.monotonic()
+
+        def _do_request(
+            self,
+            method: str,
+            endpoint: str,
+            *,
+            data: Optional[bytes] = None,
+            json_data: Optional[Dict[str, Any]] = None,
+            **kwargs: Any,
+        ) -> "requests.Response":
+            # same as the base class but over the session
+            if hasattr(self, "_verify"):
+                kwargs.setdefault("verify", self._verify)
+            return self._session.request(
+                method,
+                self._address + endpoint,
+                cookies=self._cookies,
+                data=data,
+                json=json_data,
+                headers=self._headers,
+                **kwargs,
+            )
+
+        def check_health(self) -> bool:
+            """
+            Pings the dashboard if the client was idle for more than
+            ``CLIENT_HEALTH_CHECK_INTERVAL`` seconds.
+            """
+            if self.healthy and (
+                time.monotonic() - self.last_used > CLIENT_HEALTH_CHECK_INTERVAL
+            ):
+                try:
+                    self._do_request("GET", "/api/version").raise_for_status()
+                except requests.exceptions.RequestException:
+                    self.healthy = False
+            return self.healthy
+
+        def close(self) -> None:
+            self._session.close()
+
     class _EnhancedJSONEncoder(json.JSONEncoder):
         def default(self, o: RayActor):  # pyre-ignore[3]
             if dataclasses.is_dataclass(o):
@@ -78,10 +184,56 @@ if _has_ray:
     def serialize(
         actors: List[RayActor], dirpath: str, output_filename: str = "actors.json"
     ) -> None:
-        actors_json = json.dumps(actors, cls=_EnhancedJSONEncoder)
+        actors_json = _actors_to_json(actors)
         with open(os.path.join(dirpath, output_filename), "w") as tmp:
             json.dump(actors_json, tmp)
 
+    def _actors_to_json(actors: List[RayActor]) -> str:
+        return json.dumps(actors, cls=_EnhancedJSONEncoder)
+
+    def _package_paths(dirpath: str) -> List[Path]:
+        """
+        Returns the files and empty dirs of the working dir that ray packages
+        (see ``_zip_package``), the ones matched by a ``.gitignore`` are
+        skipped.
+        """
+        paths = []
+
+        def add(path: Path) -> None:
+            if path.is_file() or (path.is_dir() and next(path.iterdir(), None) is None):
+                paths.append(path)
+
+        root = Path(dirpath).absolute()
+        _dir_travel(root, [_get_excludes(root, [])], add)
+        return sorted(paths)
+
+    def _package_uri(dirpath: str) -> str:
+        """
+        Returns the ``gcs://_ray_pkg_<hash>.zip`` URI of the working dir
+        package, the hash is the sha256 of the relative paths, modes and
+        contents of the packaged files so an unchanged working dir maps to an
+        already uploaded package.
+        """
+        root = Path(dirpath).absolute()
+        paths = _package_paths(dirpath)
+        fs = fsspec.filesystem("file")
+        with ThreadPoolExecutor(max_workers=PACKAGE_DIGEST_PARALLELISM) as executor:
+            digests = executor.map(
+                lambda path: _digest_file(fs, str(path)) if path.is_file() else None,
+                paths,
+            )
+            package_hash = hashlib.sha256()
+            for path, digest in zip(paths, digests):
+                relpath = path.relative_to(root).as_posix()
+                mode = stat.S_IMODE(path.stat().st_mode)
+                package_hash.update(json.dumps([relpath, mode, digest]).encode())
+        return f"gcs://_ray_pkg_{package_hash.hexdigest()[:32]}.zip"
+
+    def _zip_package(dirpath: str, output_path: str) -> None:
+        # same packaging (and .gitignore handling) as the working dirs
+        # uploaded by ray itself
+        _zip_directory(dirpath, [], output_path)
+
     @dataclass
     class RayJob:
         """Represents a job that should be run on a Ray cluster.
@@ -99,6 +251,9 @@ if _has_ray:
                 The working directory to copy to the cluster
             requirements:
                 The libraries to install on the cluster per requirements.txt
+            placement_group_timeout:
+                Seconds the driver waits for the placement group of the
+                minimum replicas to be ready
             actors:
                 The Ray actors which represent the job to be run. This attribute is
                 dumped to a JSON file and copied to the cluster where `ray_main.py`
@@ -111,6 +266,7 @@ if _has_ray:
         cluster_name: Optional[str] = None
         dashboard_address: Optional[str] = None
         requirements: Optional[str] = None
+        placement_group_timeout: int = DEFAULT_PLACEMENT_GROUP_TIMEOUT
         actors: List[RayActor] = field(default_factory=list)
 
     class RayScheduler(TmpDirWorkspaceMixin, Scheduler[RayOpts]):
@@ -136,21 +292,53 @@ if _has_ray:
             features:
                 cancel: true
                 logs: |
-                    Partial support. Ray only supports a single log stream so
-                    only a dummy "ray/0" combined log role is supported.
-                    Tailing and time seeking are not supported.
+                    Partial support. Ray only supports a single combined log
+                    stream, the "ray/0" role returns the logs of all the
+                    actors and ``<role>/<replica_id>`` only the lines logged
+                    by that replica. Time seeking is not supported.
                 distributed: true
                 describe: |
                     Partial support. RayScheduler will return job status but
                     does not provide the complete original AppSpec.
                 workspaces: true
                 mounts: false
-                elasticity: Partial support. Multi role jobs are not supported.
+                elasticity: |
+                    Partial support. Multi role jobs are not supported. Dead
+                    actors are restarted up to the role's ``max_retries``.
 
         """
 
         def __init__(self, session_name: str) -> None:
             super().__init__("ray", session_name)
+            # dashboard address -> client, creating a client handshakes with
+            # the dashboard so they are reused across calls
+            self._clients: Dict[str, _PooledJobSubmissionClient] = {}
+            self._clients_lock = threading.Lock()
+
+        def _get_client(self, address: str) -> JobSubmissionClient:
+            """
+            Returns the cached client of the dashboard at ``address``. A new
+            client is created if there is none or the cached one is unhealthy.
+            The dashboard is pinged and connected to outside of the lock so
+            that a slow dashboard does not block the calls to the other ones.
+            """
+            with self._clients_lock:
+                client = self._clients.get(address)
+            if client is not None and not client.check_health():
+                _logger.info(f"Reconnecting to the Ray dashboard at {address}")
+                with self._clients_lock:
+                    if self._clients.get(address) is client:
+                        del self._clients[address]
+                client.close()
+                client = None
+            if client is None:
+                new_client = _PooledJobSubmissionClient(address)
+                with self._clients_lock:
+                    # another thread may have connected in the meantime
+                    client = self._clients.setdefault(address, new_client)
+                if client is not new_client:
+                    new_client.close()
+            return client
 
         # TODO: Add address as a potential CLI argument after writing ray.status() or passing in config file
         def _run_opts(self) -> runopts:
@@ -174,16 +362,19 @@ if _has_ray:
                 help="Use ray status to get the dashboard address you will submit jobs against",
             )
             opts.add("requirements", type_=str, help="Path to requirements.txt")
+            opts.add(
+                "placement_group_timeout",
+                type_=int,
+                default=DEFAULT_PLACEMENT_GROUP_TIMEOUT,
+                help="Seconds to wait for the placement group of the minimum number"
+                " of replicas to be ready before failing the job",
+            )
             return opts
 
         def schedule(self, dryrun_info: AppDryRunInfo[RayJob]) -> str:
             cfg: RayJob = dryrun_info.request
 
-            # Create serialized actors for ray_driver.py
-            actors = cfg.actors
             dirpath = cfg.working_dir
-            serialize(actors, dirpath)
-
             job_submission_addr: str = ""
             if cfg.cluster_config_file:
                 job_submission_addr = ray_autoscaler_sdk.get_head_node_ip(
@@ -197,24 +388,33 @@ if _has_ray:
                 )
 
             # 0. Create Job Client
-            client: JobSubmissionClient = JobSubmissionClient(
-                f"http://{job_submission_addr}"
-            )
+            client = self._get_client(f"http://{job_submission_addr}")
 
             # 1. Copy Ray driver utilities
             current_directory = os.path.dirname(os.path.abspath(__file__))
             copy2(os.path.join(current_directory, "ray", "ray_driver.py"), dirpath)
             copy2(os.path.join(current_directory, "ray", "ray_common.py"), dirpath)
-            runtime_env = {"working_dir": dirpath}
+            env_vars = {
+                TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT: str(cfg.placement_group_timeout)
+            }
+            runtime_env: Dict[str, Any] = {"env_vars": env_vars}
             if cfg.requirements:
                 runtime_env["pip"] = cfg.requirements
 
             # 1. Submit Job via the Ray Job Submission API
             try:
+                # Pass the actors to ray_driver.py out of the working dir so
+                # that unchanged working dirs are only uploaded once
+                actors_json = _actors_to_json(cfg.actors)
+                if len(actors_json) <= ACTORS_ENV_MAX_SIZE:
+                    env_vars[TORCHX_RAY_ACTORS] = actors_json
+                    runtime_env["working_dir"] = self._upload_package(client, dirpath)
+                else:
+                    serialize(cfg.actors, dirpath)
+                    runtime_env["working_dir"] = dirpath
+
                 job_id: str = client.submit_job(
                     submission_id=cfg.app_id,
-                    # we will pack, hash, zip, upload, register working_dir in GCS of ray cluster
-                    # and use it to configure your job execution.
                     entrypoint="python3 ray_driver.py",
                     runtime_env=runtime_env,
                 )
@@ -226,6 +426,23 @@ if _has_ray:
             # Encode job submission client in job_id
             return f"{job_submission_addr}-{job_id}"
 
+        def _upload_package(self, client: JobSubmissionClient, dirpath: str) -> str:
+            """
+            Zips and uploads the working dir unless a package with the same
+            content hash already exists on the cluster. Returns the package
+            URI to use as the ``working_dir`` of the job.
+            """
+            uri = _package_uri(dirpath)
+            if client._package_exists(uri):
+                _logger.info(f"Reusing working dir package {uri}")
+                return uri
+
+            with tempfile.TemporaryDirectory() as tmpdir:
+                package_path = os.path.join(tmpdir, "package.zip")
+                _zip_package(dirpath, package_path)
+                client._upload_package(uri, package_path, is_file=True)
+            return uri
+
         def _submit_dryrun(self, app: AppDef, cfg: RayOpts) -> AppDryRunInfo[RayJob]:
             app_id = make_unique(app.name)
 
@@ -264,6 +481,9 @@ if _has_ray:
                     working_dir=working_dir,
                 )
             job.cluster_name = cfg.get("cluster_name")
+            placement_group_timeout = cfg.get("placement_group_timeout")
+            if placement_group_timeout is not None:
+                job.placement_group_timeout = placement_group_timeout
 
             for role in app.roles:
                 for replica_id in range(role.num_replicas):
@@ -278,7 +498,9 @@ if _has_ray:
 
                     actor = RayActor(
                         name=role.name,
+                        replica_id=replica_id,
                         min_replicas=role.min_replicas,
+                        max_retries=role.max_retries,
                         command=[replica_role.entrypoint] + replica_role.args,
                         env=replica_role.env,
                         num_cpus=max(1, replica_role.resource.cpu),
@@ -342,19 +564,49 @@ if _has_ray:
 
         def _cancel_existing(self, app_id: str) -> None:  # pragma: no cover
             addr, app_id = self._parse_app_id(app_id)
-            client = JobSubmissionClient(f"http://{addr}")
+            client = self._get_client(f"http://{addr}")
             client.stop_job(app_id)
 
         def _get_job_status(self, app_id: str) -> JobStatus:
             addr, app_id = self._parse_app_id(app_id)
-            client = JobSubmissionClient(f"http://{addr}")
+            client = self._get_client(f"http://{addr}")
             status = client.get_job_status(app_id)
             if isinstance(status, str):
                 return cast(JobStatus, status)
             return status.status
 
         def describe(self, app_id: str) -> Optional[DescribeAppResponse]:
-            job_status_info = self._get_job_status(app_id)
+            return self._to_describe_response(app_id, self._get_job_status(app_id))
+
+        def describe_many(
+            self, app_ids: List[str]
+        ) -> Dict[str, Optional[DescribeAppResponse]]:
+            """
+            Describes the apps of each dashboard with a single ``list_jobs()``
+            call, apps that are not listed are ``None``.
+            """
+            job_ids: Dict[str, Dict[str, str]] = {}
+            for app_id in app_ids:
+                addr, job_id = self._parse_app_id(app_id)
+                job_ids.setdefault(addr, {})[app_id] = job_id
+
+            out: Dict[str, Optional[DescribeAppResponse]] = {}
+            for addr, addr_job_ids in job_ids.items():
+                statuses = {}
+                for details in self._get_client(f"http://{addr}").list_jobs():
+                    for job_id in (details.submission_id, details.job_id):
+                        if job_id:
+                            statuses[job_id] = details.status
+                for app_id, job_id in addr_job_ids.items():
+                    status = statuses.get(job_id)
+                    out[app_id] = (
+                        self._to_describe_response(app_id, status) if status else None
+                    )
+            return out
+
+        def _to_describe_response(
+            self, app_id: str, job_status_info: JobStatus
+        ) -> DescribeAppResponse:
             state = _ray_status_to_torchx_appstate[job_status_info]
             roles = [Role(name="ray", num_replicas=1, image="<N/A>")]
 
@@ -392,15 +644,81 @@ if _has_ray:
             should_tail: bool = False,
             streams: Optional[Stream] = None,
         ) -> Iterable[str]:
-            # TODO: support tailing, streams etc..
+            if streams not in (None, Stream.COMBINED):
+                raise ValueError("RayScheduler only supports COMBINED log stream")
+            if since or until:
+                _logger.warning(
+                    "The Ray scheduler does not support `since` and `until` for logs"
+                )
+
             addr, app_id = self._parse_app_id(app_id)
-            client: JobSubmissionClient = JobSubmissionClient(f"http://{addr}")
-            logs: str = client.get_job_logs(app_id)
-            iterator = split_lines(logs)
+            client = self._get_client(f"http://{addr}")
+            if should_tail:
+                iterator = split_lines_iterator(self._tail_logs(client, app_id))
+            else:
+                iterator = split_lines(client.get_job_logs(app_id))
+
+            if role_name and role_name != RAY_LOG_ROLE:
+                # ray prefixes the actor logs with ``(<actor name> pid=...)``,
+                # possibly colored
+                name = re.escape(command_actor_name(role_name, k))
+                iterator = filter_regex(rf"^(\x1b\[[0-9;]*m)*\({name} pid=", iterator)
             if regex:
                 return filter_regex(regex, iterator)
             return iterator
 
+        def _tail_logs(self, client: JobSubmissionClient, job_id: str) -> Iterator[str]:
+            """
+            Follows the logs of the job until it finishes. If the log stream
+            disconnects while the job is running it is reopened, the stream
+            always starts from the beginning of the log so the characters that
+            were already returned (``offset``) are skipped.
+            """
+            offset = 0
+            while True:
+                skip = offset
+                try:
+                    for chunk in _iter_async(client.tail_job_logs(job_id)):
+                        if skip >= len(chunk):
+                            skip -= len(chunk)
+                            continue
+                        chunk = chunk[skip:]
+                        skip = 0
+                        offset += len(chunk)
+                        yield chunk
+                except Exception as e:
+                    _logger.warning(f"Log stream of {job_id} failed: {e}")
+
+                status = client.get_job_status(job_id)
+                if JobStatus(status).is_terminal():
+                    return
+                _logger.info(
+                    f"Log stream of {job_id} closed, reconnecting at offset {offset}"
+                )
+                time.sleep(LOG_TAIL_RECONNECT_INTERVAL)
+
+        def driver_timings(self, app_id: str) -> Optional[Dict[str, float]]:
+            """
+            Returns the seconds from the start of the ray driver of the job to
+            each of its startup phases (``placement_group_ready``,
+            ``actor_scheduled``, ``rank0_elected`` and ``first_exec``) or
+            ``None`` if the driver did not log them yet. The driver logs them
+            since the metadata of ray jobs can not be updated once submitted.
+
+            The driver logs the timings as soon as the job starts executing so
+            the log is streamed up to them rather than downloaded.
+            """
+            addr, app_id = self._parse_app_id(app_id)
+            client = self._get_client(f"http://{addr}")
+            prefix = f"{TORCHX_RAY_TIMINGS} "
+            chunks = _iter_async(
+                client.tail_job_logs(app_id), idle_timeout=DRIVER_TIMINGS_IDLE_TIMEOUT
+            )
+            for line in split_lines_iterator(chunks):
+                if line.startswith(prefix):
+                    return json.loads(line[len(prefix) :])
+            return None
+
         def list(self) -> List[ListAppResponse]:
             address = os.getenv("RAY_ADDRESS")
             if not address:
@@ -408,7 +726,7 @@ if _has_ray:
                     "RAY_ADDRESS env variable is expected to be set to list jobs on ray scheduler."
                     " See https://docs.ray.io/en/latest/cluster/jobs-package-ref.html#job-submission-sdk for more info"
                 )
-            client = JobSubmissionClient(address)
+            client = self._get_client(address)
             jobs = client.list_jobs()
             ip = address.split("http://", 1)[-1]
             return [
@@ -420,6 +738,60 @@ if _has_ray:
             ]
 
 
+_END = object()
+
+
+def _iter_async(source: Any, idle_timeout: Optional[float] = None) -> Iterator[Any]:
+    """
+    Iterates over the async iterator ``source`` from a sync generator. The
+    iterator runs on an event loop in a background thread and at most
+    ``LOG_TAIL_QUEUE_SIZE`` items are buffered if the consumer is slower.
+    If ``idle_timeout`` is set the iteration stops once ``source`` did not
+    produce an item for that many seconds.
+    """
+    items: "queue.Queue[Any]" = queue.Queue(maxsize=LOG_TAIL_QUEUE_SIZE)
+    stopped = threading.Event()
+
+    def put(item: Any) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    async def produce() -> None:
+        try:
+            async for item in source:
+                if not put(item):
+                    return
+        except Exception as e:
+            put(e)
+        finally:
+            await source.aclose()
+
+    def run() -> None:
+        asyncio.run(produce())
+        put(_END)
+
+    thread = threading.Thread(target=run, name="torchx-ray-logs", daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                item = items.get(timeout=idle_timeout)
+            except queue.Empty:
+                return
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
+
 def create_scheduler(session_name: str, **kwargs: Any) -> "RayScheduler":
     if not has_ray():  # pragma: no cover
         raise ModuleNotFoundError(
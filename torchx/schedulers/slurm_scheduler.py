@@ -10,15 +10,18 @@ This contains the TorchX Slurm scheduler which can be used to run TorchX
 components on a Slurm cluster.
 """
 import csv
-import json
 import logging
 import os.path
+import re
 import shlex
+import sqlite3
 import subprocess
 import tempfile
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 import torchx
 from torchx.schedulers.api import (
@@ -34,6 +37,7 @@ from torchx.schedulers.local_scheduler import LogIterator
 from torchx.specs import (
     AppDef,
     AppState,
+    is_terminal,
     macros,
     NONE,
     ReplicaStatus,
@@ -41,10 +45,48 @@ from torchx.specs import (
     RoleStatus,
     runopts,
 )
+from torchx.util.io import load_json, save_json
 from torchx.workspace.dir_workspace import DirWorkspaceMixin
 from typing_extensions import TypedDict
 
+# legacy append-only ``<job_id> = <job_dir>`` file, migrated into
+# SLURM_JOB_DIRS_DB on first use
 SLURM_JOB_DIRS = ".torchxslurmjobdirs"
+# SQLite database of the job dirs of the jobs launched from the current dir
+SLURM_JOB_DIRS_DB = ".torchxslurmjobdirs.db"
+# job dirs saved more than this many days ago are pruned
+SLURM_JOB_DIRS_RETENTION_DAYS = 90
+# seconds to wait on the database lock held by another process
+_JOB_DIRS_LOCK_TIMEOUT = 10
+
+_JOB_DIRS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_dirs (
+    job_id TEXT PRIMARY KEY,
+    job_dir TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_dirs_by_created ON job_dirs (created);
+"""
+
+# terminal jobs seen by ``list()`` are persisted here so that subsequent calls
+# only query sacct for the jobs that were active since the previous call
+DEFAULT_LIST_CACHE: str = os.path.join("~", ".torchx", "slurm_list_cache.json")
+# max number of jobs kept in the list cache, the oldest are dropped first
+LIST_CACHE_MAX_JOBS = 10000
+# the sacct window of a cached ``list()`` starts this many seconds before the
+# previous call to account for clock skew between this host and slurmdbd
+LIST_WINDOW_OVERLAP_SECONDS = 5 * 60
+# partition metadata (``sinfo``) is persisted here keyed by cluster name and
+# refreshed in the background once older than PARTITION_CACHE_TTL_SECONDS
+DEFAULT_PARTITION_CACHE: str = os.path.join("~", ".torchx", "slurm_partitions.json")
+PARTITION_CACHE_TTL_SECONDS: float = 60 * 60
+# partitions with at most this much memory (in MB) have no memory configured
+# see https://github.com/aws/aws-parallelcluster/issues/2198
+PARTITION_NOMEM_MB = 1000
+# by default sacct only returns the jobs of the current day, one second past
+# the unix epoch is used to list all the jobs
+SACCT_EPOCH = datetime(1970, 1, 1, 0, 0, 1)
+SACCT_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
 
 SLURM_STATES: Mapping[str, AppState] = {
     "BOOT_FAIL": AppState.FAILED,
@@ -257,6 +299,32 @@ fi
 {self.materialize()}"""
 
 
+@dataclass
+class _Partition:
+    """
+    Resources of a Slurm partition as reported by ``sinfo``. ``memMB``,
+    ``cpus`` and ``gpus`` are the max over the partition's nodes.
+    """
+
+    name: str
+    default: bool = False
+    memMB: int = 0
+    cpus: int = 0
+    gpus: int = 0
+
+
+@dataclass
+class _JobListing:
+    """
+    Finished jobs known from previous ``list()`` calls.
+    """
+
+    # time (seconds since epoch) of the previous call
+    watermark: float = 0
+    # job id -> slurm state, in the order the jobs were first seen
+    jobs: Dict[str, str] = field(default_factory=dict)
+
+
 class SlurmScheduler(DirWorkspaceMixin, Scheduler[SlurmOpts]):
     """
     SlurmScheduler is a TorchX scheduling interface to slurm. TorchX expects
@@ -318,11 +386,35 @@ class SlurmScheduler(DirWorkspaceMixin, Scheduler[SlurmOpts]):
 
     If a partition has less than 1GB of RealMemory configured we disable memory
     requests to workaround https://github.com/aws/aws-parallelcluster/issues/2198.
+
+    The partitions' resources are read with ``sinfo`` and cached per cluster
+    in ``~/.torchx/slurm_partitions.json`` (refreshed in the background every
+    hour). Dryrun fails early if a role requests more CPUs, memory or GPUs
+    than the partition's nodes have.
     """
 
-    def __init__(self, session_name: str) -> None:
+    def __init__(
+        self,
+        session_name: str,
+        list_cache_path: Optional[str] = None,
+        partition_cache_path: Optional[str] = None,
+    ) -> None:
         super().__init__("slurm", session_name)
 
+        # finished jobs seen by ``list()``, loaded from and persisted to
+        # ``list_cache_path`` (kept in memory only if not set)
+        self._list_cache_path = list_cache_path
+        self._list_cache: Optional[_JobListing] = None
+
+        # partition name -> partition, loaded on first use from
+        # ``partition_cache_path`` (or ``sinfo`` if missing or invalid)
+        self._partition_cache_path = partition_cache_path
+        self._cluster: Optional[str] = None
+        self._partitions: Optional[Dict[str, _Partition]] = None
+        self._partitions_updated: float = 0
+        self._partitions_lock = threading.Lock()
+        self._partitions_refresh: Optional[threading.Thread] = None
+
     def _run_opts(self) -> runopts:
         opts = runopts()
         opts.add(
@@ -363,8 +455,10 @@ class SlurmScheduler(DirWorkspaceMixin, Scheduler[SlurmOpts]):
             "job_dir",
             type_=str,
             help="""The directory to place the job code and outputs. The
-            directory must not exist and will be created. To enable log
-            iteration, jobs will be tracked in ``.torchxslurmjobdirs``.
+            directory must not exist and will be created (unless
+            ``workspace_sync`` is set and the workspace was synced to it
+            before). To enable log iteration, jobs will be tracked in
+            ``.torchxslurmjobdirs.db``.
             """,
         )
         return opts
@@ -390,36 +484,89 @@ class SlurmScheduler(DirWorkspaceMixin, Scheduler[SlurmOpts]):
 
             return job_id
 
-    def _partition_memmb(self, partition: Optional[str]) -> Optional[int]:
+    def _get_partitions(self) -> Dict[str, _Partition]:
         """
-        _partition_memmb returns the memory allocation for the given partition
-        or the default partition if none is specified.
+        Returns the partitions of the cluster. ``sinfo`` is only run if the
+        partitions are not cached yet, once the cache is older than
+        ``PARTITION_CACHE_TTL_SECONDS`` the partitions are refreshed in the
+        background and the cached ones are returned in the meantime.
         """
-        try:
-            p = subprocess.run(
-                ["sinfo", "--format", "%P,%m", "--noconvert"],
-                stdout=subprocess.PIPE,
-            )
-        except FileNotFoundError:
-            return None
-        if p.returncode != 0:
-            return None
-        output = p.stdout.decode("utf-8").strip().split("\n")
-        if len(output) <= 1:
-            return None
+        with self._partitions_lock:
+            if self._partitions is None:
+                self._load_partitions()
+            partitions = self._partitions
+            assert partitions is not None
+            stale = time.time() - self._partitions_updated > PARTITION_CACHE_TTL_SECONDS
+            if stale and self._partitions_refresh is None:
+                self._partitions_refresh = threading.Thread(
+                    target=self._refresh_partitions,
+                    name="torchx-slurm-partitions",
+                    daemon=True,
+                )
+                self._partitions_refresh.start()
+        return partitions
+
+    def _load_partitions(self) -> None:
+        path = self._partition_cache_path
+        cache = None
+        if path:
+            cluster = self._cluster = _cluster_name()
+
+            def parse(
+                clusters: Dict[str, Any]
+            ) -> Optional[Tuple[Dict[str, _Partition], float]]:
+                if cluster not in clusters:
+                    return None
+                partitions = clusters[cluster]["partitions"]
+                return (
+                    {p["name"]: _Partition(**p) for p in partitions},
+                    float(clusters[cluster]["updated"]),
+                )
 
-        reader = csv.DictReader(output, delimiter=",")
-        for row in reader:
-            part = row.get("PARTITION")
-            mem = row.get("MEMORY")
-            if part is None or mem is None:
-                continue
-            default = "*" in part
-            part = part.strip("*")
-            memmb = int(mem.strip("M+"))
-            if part == partition or (partition is None and default):
-                return memmb
-        return None
+            cache = load_json(path, parse, "partition cache")
+        if cache:
+            self._partitions, self._partitions_updated = cache
+            return
+
+        partitions = _sinfo_partitions()
+        self._partitions = partitions or {}
+        self._partitions_updated = time.time()
+        if partitions is not None:
+            self._save_partitions(partitions, self._partitions_updated)
+
+    def _refresh_partitions(self) -> None:
+        partitions = _sinfo_partitions()
+        with self._partitions_lock:
+            self._partitions_refresh = None
+            if partitions is None:
+                return
+            self._partitions = partitions
+            self._partitions_updated = time.time()
+            self._save_partitions(partitions, self._partitions_updated)
+
+    def _save_partitions(
+        self, partitions: Dict[str, _Partition], updated: float
+    ) -> None:
+        path = self._partition_cache_path
+        if not path:
+            return
+        # keep the partitions of the other clusters sharing the cache file
+        clusters = load_json(path, dict, "partition cache") or {}
+        clusters[self._cluster or ""] = {
+            "updated": updated,
+            "partitions": [asdict(p) for p in partitions.values()],
+        }
+        save_json(path, clusters, "partition cache")
+
+    def _get_partition(self, partition: Optional[str]) -> Optional[_Partition]:
+        """
+        Returns the given partition or the default partition if none is
+        specified, ``None`` if it is unknown.
+        """
+        partitions = self._get_partitions()
+        if partition is not None:
+            return partitions.get(partition)
+        return next((p for p in partitions.values() if p.default), None)
 
     def _submit_dryrun(
         self, app: AppDef, cfg: SlurmOpts
@@ -432,8 +579,10 @@ class SlurmScheduler(DirWorkspaceMixin, Scheduler[SlurmOpts]):
 
         # check if the partition has at least 1GB memory, if we're not sure,
         # default to using memory allocations
-        memmb = self._partition_memmb(partition)
-        nomem = memmb is not None and memmb <= 1000
+        part = self._get_partition(partition)
+        nomem = part is not None and part.memMB <= PARTITION_NOMEM_MB
+        if part is not None:
+            _check_partition_resources(app, part, nomem)
 
         replicas = {}
         for role in app.roles:
@@ -477,57 +626,38 @@ class SlurmScheduler(DirWorkspaceMixin, Scheduler[SlurmOpts]):
         subprocess.run(["scancel", app_id], check=True)
 
     def describe(self, app_id: str) -> Optional[DescribeAppResponse]:
+        return self.describe_many([app_id])[app_id]
+
+    def describe_many(
+        self, app_ids: List[str]
+    ) -> Dict[str, Optional[DescribeAppResponse]]:
+        if not app_ids:
+            return {}
+
         p = subprocess.run(
-            ["sacct", "--parsable2", "-j", app_id], stdout=subprocess.PIPE, check=True
+            ["sacct", "--parsable2", "-j", ",".join(app_ids)],
+            stdout=subprocess.PIPE,
+            check=True,
         )
         output = p.stdout.decode("utf-8").split("\n")
         if len(output) <= 1:
-            return None
+            return {app_id: None for app_id in app_ids}
 
-        reader = csv.DictReader(output, delimiter="|")
-
-        roles = {}
-        roles_statuses = {}
-        msg = ""
-        app_state = AppState.UNKNOWN
-        for row in reader:
+        # app_id -> sacct rows of the heterogeneous job's components
+        rows: Dict[str, List[Dict[str, str]]] = {app_id: [] for app_id in app_ids}
+        for row in csv.DictReader(output, delimiter="|"):
             job_id, *parts = row["JobID"].split("+")
-            if job_id != app_id:
+            if job_id not in rows:
                 continue
             if len(parts) > 0 and "." in parts[0]:
                 # we only care about the worker not the child jobs
                 continue
+            rows[job_id].append(row)
 
-            state = row["State"]
-            msg = state
-            state_enum = SLURM_STATES.get(state)
-            assert (
-                state_enum
-            ), f"failed to translate slurm state {state} to torchx state"
-            app_state = state_enum
-
-            role, _, replica_id = row["JobName"].rpartition("-")
-            if not replica_id or not role:
-                # name should always have at least 3 parts but sometimes sacct
-                # is slow to update
-                continue
-            if role not in roles:
-                roles[role] = Role(name=role, num_replicas=0, image="")
-                roles_statuses[role] = RoleStatus(role, [])
-            roles[role].num_replicas += 1
-            roles_statuses[role].replicas.append(
-                ReplicaStatus(
-                    id=int(replica_id), role=role, state=app_state, hostname=""
-                ),
-            )
-
-        return DescribeAppResponse(
-            app_id=app_id,
-            roles=list(roles.values()),
-            roles_statuses=list(roles_statuses.values()),
-            state=app_state,
-            msg=msg,
-        )
+        return {
+            app_id: _sacct_rows_to_describe_response(app_id, rows[app_id])
+            for app_id in app_ids
+        }
 
     def log_iter(
         self,
@@ -557,9 +687,9 @@ class SlurmScheduler(DirWorkspaceMixin, Scheduler[SlurmOpts]):
             )
 
         log_file = f"slurm-{app_id}-{role_name}-{k}.{extension}"
-        job_dirs = _get_job_dirs()
-        if app_id in job_dirs:
-            log_file = os.path.join(job_dirs[app_id], log_file)
+        job_dir = _get_job_dir(app_id)
+        if job_dir is not None:
+            log_file = os.path.join(job_dir, log_file)
 
         iterator = LogIterator(app_id, log_file, self, should_tail=should_tail)
         # sometimes there's multiple lines per logged line
@@ -568,46 +698,346 @@ class SlurmScheduler(DirWorkspaceMixin, Scheduler[SlurmOpts]):
             iterator = filter_regex(regex, iterator)
         return iterator
 
-    def list(self) -> List[ListAppResponse]:
-        # By default sacct only returns accounting information of jobs launched on the current day
-        # To return all jobs launched, set starttime to one second past unix epoch time
-        # Starttime will be modified when listing jobs by timeframe is supported
-        p = subprocess.run(
-            ["sacct", "--json", "-S1970-01-01-00:00:01"],
-            stdout=subprocess.PIPE,
-            check=True,
-        )
-        output_json = json.loads(p.stdout.decode("utf-8"))
-        return [
-            ListAppResponse(
-                app_id=str(job["job_id"]), state=SLURM_STATES[job["state"]["current"]]
+    def list(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        states: Optional[Iterable[AppState]] = None,
+    ) -> List[ListAppResponse]:
+        """
+        Lists the jobs of the current user. ``since``, ``until`` and
+        ``states`` are passed through to ``sacct`` to only list the jobs that
+        were active in the window and are in one of the states.
+
+        Without filters all the jobs are listed. The finished jobs are cached
+        (see ``DEFAULT_LIST_CACHE``) so that ``sacct`` is only queried for the
+        jobs that were active since the previous call.
+        """
+        if since or until or states:
+            slurm_states = None
+            if states is not None:
+                wanted = set(states)
+                slurm_states = [
+                    slurm_state
+                    for slurm_state, state in SLURM_STATES.items()
+                    if state in wanted
+                ]
+            jobs = _sacct_list(since or SACCT_EPOCH, until, slurm_states)
+            return [
+                ListAppResponse(app_id=job_id, state=_slurm_state(state))
+                for job_id, state in jobs.items()
+            ]
+
+        listing = self._get_list_cache()
+        now = time.time()
+        since = SACCT_EPOCH
+        if listing.watermark:
+            since = datetime.fromtimestamp(
+                listing.watermark - LIST_WINDOW_OVERLAP_SECONDS
             )
-            for job in output_json["jobs"]
+        active = _sacct_list(since)
+
+        jobs = {
+            job_id: state
+            for job_id, state in listing.jobs.items()
+            if job_id not in active
+        }
+        jobs.update(active)
+        listing.watermark = now
+        listing.jobs = {
+            job_id: state
+            for job_id, state in jobs.items()
+            if is_terminal(_slurm_state(state))
+        }
+        num_evict = max(0, len(listing.jobs) - LIST_CACHE_MAX_JOBS)
+        for job_id in list(listing.jobs)[:num_evict]:
+            del listing.jobs[job_id]
+        self._save_list_cache()
+        return [
+            ListAppResponse(app_id=job_id, state=_slurm_state(state))
+            for job_id, state in jobs.items()
         ]
 
+    def _get_list_cache(self) -> _JobListing:
+        if self._list_cache is not None:
+            return self._list_cache
+
+        self._list_cache = _JobListing()
+        path = self._list_cache_path
+        if path:
+            listing = load_json(path, lambda c: _JobListing(**c), "list cache")
+            self._list_cache = listing or self._list_cache
+        return self._list_cache
+
+    def _save_list_cache(self) -> None:
+        path = self._list_cache_path
+        if path and self._list_cache is not None:
+            save_json(path, asdict(self._list_cache), "list cache")
+
 
 def create_scheduler(session_name: str, **kwargs: Any) -> SlurmScheduler:
     return SlurmScheduler(
         session_name=session_name,
+        list_cache_path=os.path.expanduser(DEFAULT_LIST_CACHE),
+        partition_cache_path=os.path.expanduser(DEFAULT_PARTITION_CACHE),
     )
 
 
-def _save_job_dir(job_id: str, job_dir: str) -> None:
-    with open(SLURM_JOB_DIRS, "at") as f:
-        f.write(f"{job_id} = {job_dir}\n")
+def _sinfo_int(value: str) -> int:
+    # sinfo appends ``+`` when the nodes of a row have different values
+    try:
+        return int(value.strip().rstrip("+"))
+    except ValueError:
+        return 0
+
+
+def _cluster_name() -> str:
+    """
+    Returns the name of the Slurm cluster (``ClusterName`` in ``slurm.conf``),
+    an empty string if it can't be determined.
+    """
+    name = os.getenv("SLURM_CLUSTER_NAME")
+    if name:
+        return name
+    try:
+        p = subprocess.run(["scontrol", "show", "config"], stdout=subprocess.PIPE)
+    except FileNotFoundError:
+        return ""
+    if p.returncode != 0:
+        return ""
+    match = re.search(
+        r"^ClusterName\s*=\s*(\S+)", p.stdout.decode("utf-8"), re.MULTILINE
+    )
+    return match.group(1) if match else ""
 
 
-def _get_job_dirs() -> Mapping[str, str]:
+def _sinfo_partitions() -> Optional[Dict[str, _Partition]]:
+    """
+    Returns the partitions reported by ``sinfo``, ``None`` if ``sinfo`` is
+    not available or fails.
+    """
     try:
-        with open(SLURM_JOB_DIRS, "rt") as f:
-            lines = f.readlines()
+        p = subprocess.run(
+            ["sinfo", "--format", "%P|%m|%c|%G", "--noconvert"],
+            stdout=subprocess.PIPE,
+        )
     except FileNotFoundError:
-        return {}
+        return None
+    if p.returncode != 0:
+        return None
+    output = p.stdout.decode("utf-8").strip().split("\n")
+
+    partitions: Dict[str, _Partition] = {}
+    # sinfo reports one row per group of nodes with the same configuration
+    for row in csv.DictReader(output, delimiter="|"):
+        name = row.get("PARTITION")
+        if not name:
+            continue
+        part = partitions.setdefault(
+            name.strip("*"), _Partition(name=name.strip("*"), default="*" in name)
+        )
+        gpus = sum(
+            int(count)
+            for count in re.findall(r"gpu(?::[^:,(]+)?:(\d+)", row.get("GRES") or "")
+        )
+        part.memMB = max(part.memMB, _sinfo_int(row.get("MEMORY") or ""))
+        part.cpus = max(part.cpus, _sinfo_int(row.get("CPUS") or ""))
+        part.gpus = max(part.gpus, gpus)
+    return partitions
+
+
+def _check_partition_resources(app: AppDef, part: _Partition, nomem: bool) -> None:
+    """
+    Raises ``ValueError`` if a replica of the app needs more resources than
+    the nodes of the partition have.
+    """
+    for role in app.roles:
+        resource = role.resource
+        if resource == NONE:
+            continue
+        for requested, available, unit in [
+            (resource.cpu, part.cpus, "cpus"),
+            (0 if nomem else resource.memMB, part.memMB, "MB of memory"),
+            (resource.gpu, part.gpus, "gpus"),
+        ]:
+            if available and requested > available:
+                raise ValueError(
+                    f"role `{role.name}` requests {requested} {unit} but the"
+                    f" nodes of partition `{part.name}` have at most"
+                    f" {available} {unit}"
+                )
+
+
+def _slurm_state(state: str) -> AppState:
+    # cancelled jobs are reported as ``CANCELLED by <uid>``
+    return SLURM_STATES.get(state.split(" ")[0], AppState.UNKNOWN)
+
+
+def _sacct_lines(cmd: List[str]) -> Iterator[str]:
+    """
+    Runs ``sacct`` yielding its output one line at a time.
+    """
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True) as p:
+        assert p.stdout is not None
+        yield from p.stdout
+    if p.returncode != 0:
+        raise subprocess.CalledProcessError(p.returncode, cmd)
+
+
+def _sacct_list(
+    since: datetime,
+    until: Optional[datetime] = None,
+    slurm_states: Optional[List[str]] = None,
+) -> Dict[str, str]:
+    """
+    Returns the slurm state by job id of the jobs of the current user that
+    were active between ``since`` and ``until``. The output of ``sacct`` is
+    parsed line by line so that only the job ids and states are kept in
+    memory. For heterogeneous jobs the state of the last component is used.
+    """
+    cmd = [
+        "sacct",
+        "--parsable2",
+        "--noheader",
+        "--allocations",
+        "--format=JobID,State",
+        f"--starttime={since.strftime(SACCT_TIME_FORMAT)}",
+    ]
+    if until:
+        cmd.append(f"--endtime={until.strftime(SACCT_TIME_FORMAT)}")
+    if slurm_states is not None:
+        cmd.append(f"--state={','.join(slurm_states)}")
+
+    jobs = {}
+    for line in _sacct_lines(cmd):
+        job_id, _, state = line.rstrip("\n").partition("|")
+        if not state:
+            continue
+        jobs[job_id.partition("+")[0]] = state
+    return jobs
+
+
+def _sacct_rows_to_describe_response(
+    app_id: str, rows: List[Dict[str, str]]
+) -> Optional[DescribeAppResponse]:
+    if not rows:
+        return None
 
-    out = {}
-    for line in lines:
-        first, _, second = line.partition("=")
-        if not first or not second:
+    roles = {}
+    roles_statuses = {}
+    msg = ""
+    app_state = AppState.UNKNOWN
+    for row in rows:
+        state = row["State"]
+        msg = state
+        state_enum = SLURM_STATES.get(state)
+        assert state_enum, f"failed to translate slurm state {state} to torchx state"
+        app_state = state_enum
+
+        role, _, replica_id = row["JobName"].rpartition("-")
+        if not replica_id or not role:
+            # name should always have at least 3 parts but sometimes sacct
+            # is slow to update
             continue
-        out[first.strip()] = second.strip()
-    return out
+        if role not in roles:
+            roles[role] = Role(name=role, num_replicas=0, image="")
+            roles_statuses[role] = RoleStatus(role, [])
+        roles[role].num_replicas += 1
+        roles_statuses[role].replicas.append(
+            ReplicaStatus(id=int(replica_id), role=role, state=app_state, hostname=""),
+        )
+
+    return DescribeAppResponse(
+        app_id=app_id,
+        roles=list(roles.values()),
+        roles_statuses=list(roles_statuses.values()),
+        state=app_state,
+        msg=msg,
+    )
+
+
+def _open_job_dirs() -> sqlite3.Connection:
+    conn = sqlite3.connect(SLURM_JOB_DIRS_DB, timeout=_JOB_DIRS_LOCK_TIMEOUT)
+    try:
+        conn.executescript(_JOB_DIRS_SCHEMA)
+        if os.path.exists(SLURM_JOB_DIRS):
+            _migrate_job_dirs(conn)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+def _migrate_job_dirs(conn: sqlite3.Connection) -> None:
+    """
+    Moves the entries of the legacy ``SLURM_JOB_DIRS`` file into the store.
+    The file is renamed to ``SLURM_JOB_DIRS.migrated`` while holding the
+    database write lock so that concurrent processes migrate it only once.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        try:
+            with open(SLURM_JOB_DIRS, "rt") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            # migrated by another process
+            return
+
+        job_dirs = {}
+        for line in lines:
+            first, _, second = line.partition("=")
+            if not first or not second:
+                continue
+            job_dirs[first.strip()] = second.strip()
+
+        now = time.time()
+        conn.executemany(
+            "INSERT OR REPLACE INTO job_dirs VALUES (?, ?, ?)",
+            [(job_id, job_dir, now) for job_id, job_dir in job_dirs.items()],
+        )
+        os.replace(SLURM_JOB_DIRS, f"{SLURM_JOB_DIRS}.migrated")
+        log.info(f"migrated {len(job_dirs)} job dirs from {SLURM_JOB_DIRS}")
+
+
+def _save_job_dir(job_id: str, job_dir: str) -> None:
+    """
+    Records the job dir of the job and prunes the job dirs saved more than
+    ``SLURM_JOB_DIRS_RETENTION_DAYS`` ago.
+    """
+    now = time.time()
+    try:
+        conn = _open_job_dirs()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_dirs VALUES (?, ?, ?)",
+                    (job_id, job_dir, now),
+                )
+                conn.execute(
+                    "DELETE FROM job_dirs WHERE created < ?",
+                    (now - SLURM_JOB_DIRS_RETENTION_DAYS * 24 * 60 * 60,),
+                )
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error) as e:
+        log.warning(
+            f"failed to save the job dir of {job_id} to {SLURM_JOB_DIRS_DB}: {e}."
+            " `torchx log` will only find the logs from the job dir"
+        )
+
+
+def _get_job_dir(job_id: str) -> Optional[str]:
+    if not os.path.exists(SLURM_JOB_DIRS_DB) and not os.path.exists(SLURM_JOB_DIRS):
+        return None
+    try:
+        conn = _open_job_dirs()
+        try:
+            row = conn.execute(
+                "SELECT job_dir FROM job_dirs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error) as e:
+        log.warning(f"failed to read the job dir of {job_id}: {e}")
+        return None
+    return row[0] if row else None
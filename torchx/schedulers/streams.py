@@ -5,11 +5,292 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import ctypes
+import ctypes.util
+import errno
 import io
+import logging
 import os
+import selectors
+import struct
+import sys
 import threading
-import time
-from typing import List
+from typing import Dict, List, Optional, Set
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# inotify event masks (see ``man 7 inotify``)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+
+_WATCH_MASK: int = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_EVENT_HEADER: struct.Struct = struct.Struct("iIII")
+
+# filesystems where writes made on other hosts are not reported by inotify
+_NETWORK_FS_TYPES: Set[str] = {
+    "nfs",
+    "nfs4",
+    "cifs",
+    "smbfs",
+    "smb3",
+    "lustre",
+    "gpfs",
+    "beegfs",
+    "ceph",
+    "glusterfs",
+    "afs",
+}
+
+
+def _mount_fs_type(path: str) -> Optional[str]:
+    """
+    Returns the type of the filesystem ``path`` is mounted on or ``None`` if
+    it cannot be determined.
+    """
+    try:
+        with open("/proc/self/mounts", "rt") as f:
+            mounts = [line.split() for line in f]
+    except OSError:
+        return None
+
+    path = os.path.realpath(path)
+    fs_type = None
+    longest = -1
+    for mount in mounts:
+        if len(mount) < 3:
+            continue
+        # spaces in mount points are escaped as \040
+        mount_point = mount[1].replace("\\040", " ")
+        prefix = mount_point.rstrip("/") + "/"
+        if (path == mount_point or path.startswith(prefix)) and len(
+            mount_point
+        ) > longest:
+            longest = len(mount_point)
+            fs_type = mount[2]
+    return fs_type
+
+
+class FileWatch:
+    """
+    Handle returned by ``FileWatcher.watch()``. Use ``wait()`` to block until
+    one of the watched files changes rather than sleep-polling the files.
+
+    When the files cannot be watched natively (no inotify, network filesystems,
+    missing directories) the handle falls back to polling: ``wait()`` sleeps for
+    the poll interval and reports that the files may have changed.
+    """
+
+    def __init__(
+        self,
+        watcher: "FileWatcher",
+        paths: List[str],
+        poll_interval: float,
+    ) -> None:
+        self.paths = paths
+        self.names: Set[str] = {os.path.basename(p) for p in paths}
+        self.poll: bool = True
+        self._watcher = watcher
+        self._poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._changed = False
+        self._closed = False
+
+    def notify(self) -> None:
+        """
+        Marks the watched files as changed and wakes up any waiters.
+        """
+        with self._cond:
+            self._changed = True
+            self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until one of the watched files changes, ``notify()`` is
+        called or ``timeout`` seconds have passed.
+
+        Returns:
+            ``True`` if the files (may) have changed, ``False`` on timeout
+        """
+        with self._cond:
+            if self.poll and not self._changed:
+                interval = self._poll_interval
+                if timeout is not None:
+                    interval = min(interval, timeout)
+                self._cond.wait(interval)
+                self._changed = False
+                return True
+            if not self._changed:
+                self._cond.wait(timeout)
+            changed, self._changed = self._changed, False
+            return changed
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._watcher._unwatch(self)
+
+
+class FileWatcher:
+    """
+    Shared event loop that follows files for changes. On Linux the parent
+    directories of the files are watched with inotify from a single background
+    thread that blocks in a selector until the kernel reports an event, so
+    idle followers cost no CPU regardless of how many files are followed.
+    Elsewhere (or for files on network filesystems whose remote writes are not
+    reported by inotify) the watches fall back to polling.
+
+    Use ``get_file_watcher()`` to get the process wide instance.
+    """
+
+    def __init__(self, poll_interval: float = 0.1) -> None:
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        # inotify watch descriptor -> watched dir, dir -> watch descriptor
+        self._wd_to_dir: Dict[int, str] = {}
+        self._dir_to_wd: Dict[str, int] = {}
+        # watched dir -> watches of files in that dir
+        self._watches: Dict[str, List[FileWatch]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._libc: Optional[ctypes.CDLL] = None
+        self._fd: int = -1
+        if sys.platform.startswith("linux"):
+            self._init_inotify()
+
+    def _init_inotify(self) -> None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            log.debug(f"inotify not available, falling back to polling: {e}")
+            return
+        if fd < 0:
+            log.debug(
+                "inotify_init1 failed, falling back to polling:"
+                f" {os.strerror(ctypes.get_errno())}"
+            )
+            return
+        self._libc = libc
+        self._fd = fd
+
+    def watch(self, *paths: str) -> FileWatch:
+        """
+        Starts following the given files (which need not exist yet) and returns
+        a ``FileWatch`` handle that must be closed once no longer needed.
+        """
+        assert len(paths) > 0, "must watch at least one file"
+        dirs = {os.path.dirname(os.path.abspath(p)) for p in paths}
+        watch = FileWatch(self, list(paths), self.poll_interval)
+        if self._libc is None or len(dirs) != 1:
+            return watch
+
+        (dirname,) = dirs
+        if _mount_fs_type(dirname) in _NETWORK_FS_TYPES:
+            return watch
+
+        with self._lock:
+            wd = self._dir_to_wd.get(dirname)
+            if wd is None:
+                wd = self._libc.inotify_add_watch(
+                    self._fd, os.fsencode(dirname), _WATCH_MASK | IN_DELETE_SELF
+                )
+                if wd < 0:
+                    err = ctypes.get_errno()
+                    if err != errno.ENOENT:
+                        log.debug(
+                            f"cannot watch {dirname}, falling back to polling:"
+                            f" {os.strerror(err)}"
+                        )
+                    return watch
+                self._dir_to_wd[dirname] = wd
+                self._wd_to_dir[wd] = dirname
+            self._watches.setdefault(dirname, []).append(watch)
+            watch.poll = False
+            self._start_thread()
+        return watch
+
+    def _unwatch(self, watch: FileWatch) -> None:
+        if watch.poll:
+            return
+        dirname = os.path.dirname(os.path.abspath(watch.paths[0]))
+        with self._lock:
+            watches = self._watches.get(dirname, [])
+            if watch in watches:
+                watches.remove(watch)
+            if not watches:
+                self._watches.pop(dirname, None)
+                wd = self._dir_to_wd.pop(dirname, None)
+                if wd is not None:
+                    self._wd_to_dir.pop(wd, None)
+                    libc = self._libc
+                    assert libc is not None
+                    libc.inotify_rm_watch(self._fd, wd)
+
+    def _start_thread(self) -> None:
+        # must be called with self._lock held
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="torchx-file-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        sel = selectors.DefaultSelector()
+        sel.register(self._fd, selectors.EVENT_READ)
+        while True:
+            sel.select()
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            self._dispatch(data)
+
+    def _dispatch(self, data: bytes) -> None:
+        offset = 0
+        with self._lock:
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + name_len].rstrip(b"\0"))
+                offset += name_len
+
+                dirname = self._wd_to_dir.get(wd)
+                if dirname is None:
+                    continue
+                watches = self._watches.get(dirname, [])
+                if mask & (IN_DELETE_SELF | IN_IGNORED):
+                    # the directory is gone, let the remaining watches poll
+                    self._wd_to_dir.pop(wd, None)
+                    self._dir_to_wd.pop(dirname, None)
+                    self._watches.pop(dirname, None)
+                    for watch in watches:
+                        watch.poll = True
+                        watch.notify()
+                    continue
+                for watch in watches:
+                    if name in watch.names:
+                        watch.notify()
+
+
+_file_watcher: Optional[FileWatcher] = None
+_file_watcher_lock = threading.Lock()
+
+
+def get_file_watcher() -> FileWatcher:
+    """
+    Returns the process wide ``FileWatcher`` shared by all log followers.
+    """
+    global _file_watcher
+    with _file_watcher_lock:
+        if _file_watcher is None:
+            _file_watcher = FileWatcher()
+        return _file_watcher
 
 
 class Tee:
@@ -17,7 +298,9 @@ class Tee:
     Tee is a IO writer that allows writing to multiple writers. This uses pipe
     and file descriptors so it works with subprocess.
 
-    .. note:: Tee creates a background thread so must be closed.
+    .. note:: Tee creates a background thread so must be closed. The thread
+              sleeps on a ``FileWatch`` and only wakes up when the sources
+              are written to (or on close).
 
     The order of writes is not guaranteed when writing to both fileno() and
     directly via write().
@@ -34,6 +317,7 @@ class Tee:
             self.streams.append(r)
 
         self._closed = False
+        self._watch: FileWatch = get_file_watcher().watch(*sources)
 
         self.thread = threading.Thread(
             target=self._start_thread,
@@ -53,13 +337,15 @@ class Tee:
             if not read:
                 if self._closed:
                     break
-                time.sleep(0.1)
+                self._watch.wait()
 
     def close(self) -> None:
         if self._closed:
             return
         self._closed = True
+        self._watch.notify()
         self.thread.join()
+        self._watch.close()
         with self.streams_lock:
             for s in self.streams:
                 s.close()
@@ -13,6 +13,7 @@ from unittest.mock import MagicMock, patch
 
 from torchx.schedulers.api import (
     DescribeAppResponse,
+    LineAssembler,
     ListAppResponse,
     Scheduler,
     split_lines,
@@ -22,6 +23,7 @@ from torchx.schedulers.api import (
 from torchx.specs.api import (
     AppDef,
     AppDryRunInfo,
+    AppState,
     CfgVal,
     InvalidRunConfigException,
     NULL_RESOURCE,
@@ -165,6 +167,44 @@ class SchedulerTest(unittest.TestCase):
         scheduler_mock.close()
         # nothing to validate explicitly, just that no errors are raised
 
+    @patch("torchx.schedulers.api.time.sleep")
+    def test_watch(self, sleep_mock: MagicMock) -> None:
+        scheduler_mock = SchedulerTest.MockScheduler("test_session")
+        states = [
+            AppState.PENDING,
+            AppState.RUNNING,
+            AppState.RUNNING,
+            AppState.RUNNING,
+            AppState.SUCCEEDED,
+        ]
+        with patch.object(scheduler_mock, "describe") as describe_mock:
+            describe_mock.side_effect = [
+                DescribeAppResponse(app_id="test_id", state=state) for state in states
+            ]
+            transitions = [
+                desc.state
+                for desc in scheduler_mock.watch("test_id", interval=1, max_interval=3)
+            ]
+
+        self.assertEqual(
+            transitions, [AppState.PENDING, AppState.RUNNING, AppState.SUCCEEDED]
+        )
+        # backoff doubles while the state is unchanged and is capped at max_interval
+        self.assertEqual([c.args[0] for c in sleep_mock.call_args_list], [1, 1, 2, 3])
+
+    def test_describe_many(self) -> None:
+        scheduler_mock = SchedulerTest.MockScheduler("test_session")
+        with patch.object(scheduler_mock, "describe") as describe_mock:
+            describe_mock.side_effect = lambda app_id: (
+                DescribeAppResponse(app_id=app_id) if app_id == "foo" else None
+            )
+            descs = scheduler_mock.describe_many(["foo", "bar"])
+        self.assertEqual(descs, {"foo": DescribeAppResponse(app_id="foo"), "bar": None})
+
+    def test_watch_not_exists(self) -> None:
+        scheduler_mock = SchedulerTest.MockScheduler("test_session")
+        self.assertEqual(list(scheduler_mock.watch("test_id")), [])
+
     def test_split_lines(self) -> None:
         self.assertEqual(split_lines(""), [])
         self.assertEqual(split_lines("\n"), ["\n"])
@@ -181,11 +221,38 @@ class SchedulerTest(unittest.TestCase):
                 "4\n",
             ],
         )
+        # partial lines are carried over to the next chunk
         self.assertEqual(
             list(split_lines_iterator(["foo\nbar", "foobar"])),
             [
                 "foo\n",
-                "bar",
-                "foobar",
+                "barfoobar",
             ],
         )
+        self.assertEqual(
+            list(split_lines_iterator(["fo", "o\nb", "", "ar\n", "baz"])),
+            ["foo\n", "bar\n", "baz"],
+        )
+
+    def test_split_lines_carriage_return(self) -> None:
+        self.assertEqual(
+            split_lines("\r10%\r20%\rdone\r\nfoo"),
+            ["\r", "10%\r", "20%\r", "done\r\n", "foo"],
+        )
+        # \r\n split across chunks is kept in a single line
+        self.assertEqual(
+            list(split_lines_iterator(["foo\r", "\nbar\r", "baz"])),
+            ["foo\r\n", "bar\r", "baz"],
+        )
+        self.assertEqual(list(split_lines_iterator(["foo\r"])), ["foo\r"])
+
+    def test_line_assembler(self) -> None:
+        assembler = LineAssembler()
+        text = "".join(f"line {i}\n" for i in range(1000)) + "partial"
+        lines = []
+        for i in range(0, len(text), 7):
+            lines += assembler.feed(text[i : i + 7])
+        self.assertEqual(len(lines), 1000)
+        self.assertEqual(lines[-1], "line 999\n")
+        self.assertEqual(assembler.flush(), ["partial"])
+        self.assertEqual(assembler.flush(), [])
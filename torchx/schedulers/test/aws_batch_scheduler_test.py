@@ -3,23 +3,32 @@
 #
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
+import itertools
+import os
+import tempfile
 import threading
 import unittest
 from contextlib import contextmanager
-from typing import Any, Dict, Generator, Iterable, Optional
+from datetime import datetime
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
 from unittest.mock import MagicMock, patch
 
 import torchx
 from torchx import specs
 from torchx.schedulers.api import ListAppResponse
 from torchx.schedulers.aws_batch_scheduler import (
+    _backoff,
+    _job_ui_url,
     _local_session,
     _role_to_node_properties,
     AWSBatchOpts,
     AWSBatchScheduler,
     create_scheduler,
+    JOB_ID_CACHE_TTL_SECONDS,
+    LIST_CACHE_MAX_AGE_SECONDS,
 )
 from torchx.specs import AppState
+from torchx.util.types import none_throws
 
 
 def _test_app() -> specs.AppDef:
@@ -71,13 +80,16 @@ class MockPaginator:
         # boto3 paginators return an iterable of API responses
         self.op_to_pages: Dict[str, Iterable[boto3Response]] = op_to_pages
         self.op_name: Optional[str] = None
+        # (op_name, paginate kwargs) of each paginate call
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
 
     def __call__(self, op_name: str) -> "MockPaginator":
         self.op_name = op_name
         return self
 
-    def paginate(self, *_1: Any, **_2: Any) -> Iterable[Dict[str, Any]]:
+    def paginate(self, *_1: Any, **kwargs: Any) -> Iterable[Dict[str, Any]]:
         if self.op_name:
+            self.calls.append((self.op_name, kwargs))
             return self.op_to_pages[self.op_name]
         else:
             raise RuntimeError(
@@ -613,6 +625,88 @@ class AWSBatchSchedulerTest(unittest.TestCase):
             ),
         )
 
+    def test_describe_many(self) -> None:
+        scheduler = self._mock_scheduler()
+        app_ids = ["testqueue:app-name-42"] * 150
+        descs = scheduler.describe_many(app_ids)
+        self.assertEqual(list(descs.keys()), ["testqueue:app-name-42"])
+        desc = none_throws(descs["testqueue:app-name-42"])
+        self.assertEqual(desc.state, specs.AppState.SUCCEEDED)
+        self.assertEqual(scheduler._client.describe_jobs.call_count, 1)
+
+    def test_describe_many_batches_describe_jobs(self) -> None:
+        scheduler = self._mock_scheduler()
+        template = scheduler._client.describe_jobs.return_value["jobs"][0]
+
+        def job_arn(i: int) -> str:
+            return f"arn:aws:batch:us-west-2:495572122715:job/{i}"
+
+        scheduler._client.get_paginator.side_effect = MockPaginator(
+            list_jobs=[
+                {
+                    "jobSummaryList": [
+                        {"jobArn": job_arn(i), "jobName": f"app-name-{i}"}
+                        for i in range(page * 100, page * 100 + 100)
+                    ]
+                }
+                for page in range(3)
+            ]
+        )
+        scheduler._client.describe_jobs.side_effect = lambda jobs: {
+            "jobs": [{**template, "jobArn": job_arn} for job_arn in jobs]
+        }
+
+        # app-name-999 does not exist
+        app_ids = [f"testqueue:app-name-{i}" for i in range(1, 150)] + [
+            "testqueue:app-name-999"
+        ]
+        descs = scheduler.describe_many(app_ids)
+
+        self.assertEqual(list(descs.keys()), app_ids)
+        self.assertIsNone(descs["testqueue:app-name-999"])
+        desc = none_throws(descs["testqueue:app-name-1"])
+        self.assertEqual(desc.state, specs.AppState.SUCCEEDED)
+        self.assertEqual(desc.ui_url, _job_ui_url(job_arn(1)))
+        # names are resolved with a single list_jobs pagination for the queue
+        self.assertEqual(
+            [c.args for c in scheduler._client.get_paginator.call_args_list],
+            [("list_jobs",)],
+        )
+        # 149 job ids are described in two calls (at most 100 ids per call)
+        self.assertEqual(
+            [
+                len(c.kwargs["jobs"])
+                for c in scheduler._client.describe_jobs.call_args_list
+            ],
+            [100, 49],
+        )
+
+    @patch("torchx.schedulers.aws_batch_scheduler.JOB_IDS_SCAN_MAX_PAGES", 2)
+    def test_describe_many_caps_list_scan(self) -> None:
+        scheduler = self._mock_scheduler()
+        scheduler._client.get_paginator.side_effect = MockPaginator(
+            list_jobs=[
+                {"jobSummaryList": [{"jobArn": f"arn:{i}", "jobName": f"app-{i}"}]}
+                for i in range(5)
+            ]
+        )
+
+        # app-3 is beyond the scanned pages and app-999 does not exist
+        with patch.object(
+            scheduler,
+            "_get_job_id",
+            side_effect=lambda app_id: {"testqueue:app-3": "arn:3"}.get(app_id),
+        ) as get_job_id:
+            job_ids = scheduler._get_job_ids("testqueue", ["app-0", "app-3", "app-999"])
+
+        self.assertEqual(job_ids, {"app-0": "arn:0", "app-3": "arn:3", "app-999": None})
+        # only the capped number of pages is listed
+        self.assertEqual(scheduler.api_calls["list_jobs"], 2)
+        self.assertEqual(
+            [c.args for c in get_job_id.call_args_list],
+            [("testqueue:app-3",), ("testqueue:app-999",)],
+        )
+
     def test_list(self) -> None:
         scheduler = self._mock_scheduler()
         expected_apps = [
@@ -636,6 +730,113 @@ class AWSBatchSchedulerTest(unittest.TestCase):
 
         self.assertEqual([], scheduler.list())
 
+    @patch("time.time", return_value=1643950324.125 + 60)
+    def test_list_incremental(self, _: MagicMock) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            list_cache_path = os.path.join(tmpdir, "list_cache.json")
+            scheduler = self._mock_scheduler()
+            scheduler._list_cache_path = list_cache_path
+            expected_apps = [
+                ListAppResponse(app_id="torchx:app-name-42", state=AppState.SUCCEEDED)
+            ]
+            self.assertEqual(expected_apps, scheduler.list())
+            self.assertEqual(1, scheduler.api_calls["describe_jobs"])
+
+            paginator = scheduler._client.get_paginator.side_effect
+            _, list_jobs_kwargs = paginator.calls[-1]
+            self.assertEqual(
+                [{"name": "AFTER_CREATED_AT", "values": ["1"]}],
+                list_jobs_kwargs["filters"],
+            )
+            # every page is fetched rather than only the first 100 jobs
+            self.assertEqual({"PageSize": 100}, list_jobs_kwargs["PaginationConfig"])
+
+            # another scheduler (e.g. the next `torchx list`) only fetches the
+            # jobs created since and does not describe the known finished job
+            scheduler = self._mock_scheduler()
+            scheduler._list_cache_path = list_cache_path
+            paginator = scheduler._client.get_paginator.side_effect
+            paginator.op_to_pages["list_jobs"] = [{"jobSummaryList": []}]
+            self.assertEqual(expected_apps, scheduler.list())
+            self.assertEqual(0, scheduler.api_calls["describe_jobs"])
+            _, list_jobs_kwargs = paginator.calls[-1]
+            self.assertEqual(
+                [{"name": "AFTER_CREATED_AT", "values": ["1643949940161"]}],
+                list_jobs_kwargs["filters"],
+            )
+
+    def test_list_refreshes_unfinished_jobs(self) -> None:
+        scheduler = self._mock_scheduler()
+        job = scheduler._client.describe_jobs.return_value["jobs"][0]
+        job["status"] = "RUNNING"
+        self.assertEqual(
+            [ListAppResponse(app_id="torchx:app-name-42", state=AppState.RUNNING)],
+            scheduler.list(),
+        )
+
+        job["status"] = "FAILED"
+        scheduler._client.get_paginator.side_effect.op_to_pages["list_jobs"] = [
+            {"jobSummaryList": []}
+        ]
+        self.assertEqual(
+            [ListAppResponse(app_id="torchx:app-name-42", state=AppState.FAILED)],
+            scheduler.list(),
+        )
+        self.assertEqual(
+            [job["jobArn"]], scheduler._client.describe_jobs.call_args.kwargs["jobs"]
+        )
+
+        # finished jobs are not described again
+        scheduler.list()
+        self.assertEqual(2, scheduler.api_calls["describe_jobs"])
+
+    @patch("time.time", return_value=1643950324.125 + 60)
+    def test_list_drops_gone_jobs(self, _: MagicMock) -> None:
+        scheduler = self._mock_scheduler()
+        job = scheduler._client.describe_jobs.return_value["jobs"][0]
+        job["status"] = "RUNNING"
+        scheduler.list()
+
+        # the unfinished job is not returned by describe_jobs anymore
+        scheduler._client.describe_jobs.return_value = {"jobs": []}
+        scheduler._client.get_paginator.side_effect.op_to_pages["list_jobs"] = [
+            {"jobSummaryList": []}
+        ]
+        self.assertEqual([], scheduler.list())
+
+    def test_list_expires_finished_jobs(self) -> None:
+        scheduler = self._mock_scheduler()
+        with patch("time.time", return_value=1643950324.125 + 60):
+            self.assertEqual(1, len(scheduler.list()))
+
+        scheduler._client.get_paginator.side_effect.op_to_pages["list_jobs"] = [
+            {"jobSummaryList": []}
+        ]
+        with patch(
+            "time.time",
+            return_value=1643950324.125 + LIST_CACHE_MAX_AGE_SECONDS + 1,
+        ):
+            self.assertEqual([], scheduler.list())
+
+    def test_list_many_queues(self) -> None:
+        scheduler = self._mock_scheduler()
+        scheduler._client.get_paginator.side_effect.op_to_pages[
+            "describe_job_queues"
+        ] = [
+            {
+                "jobQueues": [
+                    {"jobQueueName": f"queue{i}", "jobQueueArn": f"arn:queue{i}"}
+                    for i in range(20)
+                ]
+            }
+        ]
+        with patch("torchx.schedulers.aws_batch_scheduler.LIST_PARALLELISM", 4):
+            apps = scheduler.list()
+        self.assertEqual(
+            [f"queue{i}:app-name-42" for i in range(20)], [a.app_id for a in apps]
+        )
+        self.assertEqual(20, scheduler.api_calls["list_jobs"])
+
     def test_log_iter(self) -> None:
         scheduler = self._mock_scheduler()
         logs = scheduler.log_iter("testqueue:app-name-42", "echo", k=1, regex="foo.*")
@@ -646,6 +847,140 @@ class AWSBatchSchedulerTest(unittest.TestCase):
         logs = scheduler.log_iter("testqueue:app-name-42", "echo", k=1, regex="foo.*")
         self.assertEqual(["foo\n", "foobar\n"], list(logs))
 
+    @mock_rand()
+    def test_job_id_cache(self) -> None:
+        scheduler = self._mock_scheduler()
+        job_arn = "arn:aws:batch:us-west-2:495572122715:job/6afc27d7-3559-43ca-89fd-1007b6bf2546"
+        scheduler._client.submit_job.return_value = {
+            "jobArn": job_arn,
+            "jobName": "app-name-42",
+            "jobId": "6afc27d7-3559-43ca-89fd-1007b6bf2546",
+        }
+        info = scheduler._submit_dryrun(
+            _test_app(), AWSBatchOpts({"queue": "testqueue"})
+        )
+        app_id = scheduler.schedule(info)
+
+        # the job id is known from submit_job so list_jobs is never called
+        none_throws(scheduler.describe(app_id))
+        scheduler.describe_many([app_id])
+        scheduler.cancel(app_id)
+        self.assertEqual(0, scheduler.api_calls["list_jobs"])
+        scheduler._client.terminate_job.assert_called_once_with(
+            jobId=job_arn, reason="killed via torchx CLI"
+        )
+
+    def test_job_id_cache_from_list(self) -> None:
+        scheduler = self._mock_scheduler()
+        scheduler.list()
+        self.assertEqual(1, scheduler.api_calls["list_jobs"])
+        scheduler.describe("torchx:app-name-42")
+        self.assertEqual(1, scheduler.api_calls["list_jobs"])
+
+    @patch("torchx.util.cache.time.monotonic")
+    def test_job_id_cache_ttl(self, monotonic: MagicMock) -> None:
+        monotonic.return_value = 0
+        scheduler = self._mock_scheduler()
+        scheduler.describe("testqueue:app-name-42")
+        scheduler.describe("testqueue:app-name-42")
+        self.assertEqual(1, scheduler.api_calls["list_jobs"])
+
+        monotonic.return_value = JOB_ID_CACHE_TTL_SECONDS
+        scheduler.describe("testqueue:app-name-42")
+        self.assertEqual(2, scheduler.api_calls["list_jobs"])
+
+    def test_log_iter_api_calls(self) -> None:
+        scheduler = self._mock_scheduler()
+        list(scheduler.log_iter("testqueue:app-name-42", "echo2", k=0))
+        self.assertEqual(1, scheduler.api_calls["list_jobs"])
+        # the parent job (for the node ranks) and the node job
+        self.assertEqual(2, scheduler.api_calls["describe_jobs"])
+        self.assertEqual(
+            "arn:aws:batch:us-west-2:495572122715:job/6afc27d7-3559-43ca-89fd-1007b6bf2546#1",
+            scheduler._client.describe_jobs.call_args.kwargs["jobs"][0],
+        )
+
+        # only the node job is described once the job id and node ranks are cached
+        list(scheduler.log_iter("testqueue:app-name-42", "echo", k=0))
+        self.assertEqual(1, scheduler.api_calls["list_jobs"])
+        self.assertEqual(3, scheduler.api_calls["describe_jobs"])
+        # each stream is read until the next token stops changing
+        self.assertEqual(4, scheduler.api_calls["get_log_events"])
+
+    def test_get_node_jobs(self) -> None:
+        scheduler = self._mock_scheduler()
+        scheduler._client.describe_jobs.side_effect = lambda jobs: {
+            "jobs": [{"jobId": job_id.split("/")[-1]} for job_id in reversed(jobs)]
+        }
+        node_jobs = scheduler._get_node_jobs(
+            "arn:aws:batch:r:1:job/foo", list(range(150))
+        )
+        self.assertEqual(list(range(150)), sorted(node_jobs.keys()))
+        self.assertEqual({"jobId": "foo#42"}, node_jobs[42])
+        self.assertEqual(2, scheduler.api_calls["describe_jobs"])
+
+    @patch("torchx.schedulers.aws_batch_scheduler.LOG_JOB_STATE_CHECK_INTERVAL", 0)
+    @patch("torchx.schedulers.aws_batch_scheduler.time.sleep")
+    def test_log_iter_follow(self, sleep: MagicMock) -> None:
+        scheduler = self._mock_scheduler_running_job()
+        running_job = scheduler._client.describe_jobs.return_value["jobs"][0]
+        succeeded_job = {
+            **running_job,
+            "status": "SUCCEEDED",
+            "attempts": [{"container": {"logStreamName": "running_log_stream"}}],
+        }
+        scheduler._client.describe_jobs.side_effect = [
+            {"jobs": [running_job]},  # node ranks
+            {"jobs": [running_job]},  # node job
+            {"jobs": [running_job]},  # first state check
+            {"jobs": [succeeded_job]},  # second state check
+        ]
+
+        def event(timestamp: int, message: str) -> Dict[str, Any]:
+            return {
+                "timestamp": timestamp,
+                "ingestionTime": timestamp,
+                "message": message,
+            }
+
+        scheduler._log_client.get_log_events.side_effect = [
+            {"nextForwardToken": "t1", "events": [event(1, "foo"), event(2, "bar")]},
+            # caught up, the job is still running
+            {"nextForwardToken": "t1", "events": []},
+            # caught up, the job finished
+            {"nextForwardToken": "t1", "events": []},
+            # final read, events at the token boundary are returned again
+            {"nextForwardToken": "t2", "events": [event(2, "bar"), event(2, "baz")]},
+            {"nextForwardToken": "t2", "events": []},
+        ]
+
+        logs = scheduler.log_iter(
+            "testqueue:app-name-42", "echo", k=0, should_tail=True
+        )
+        self.assertEqual(["foo\n", "bar\n", "baz\n"], list(logs))
+        self.assertEqual(5, scheduler.api_calls["get_log_events"])
+        self.assertEqual(4, scheduler.api_calls["describe_jobs"])
+        self.assertEqual(1, sleep.call_count)
+
+    def test_log_iter_since_until(self) -> None:
+        scheduler = self._mock_scheduler()
+        since = datetime.fromtimestamp(1000)
+        until = datetime.fromtimestamp(2000)
+        list(
+            scheduler.log_iter(
+                "testqueue:app-name-42", "echo", since=since, until=until
+            )
+        )
+        kwargs = scheduler._log_client.get_log_events.call_args.kwargs
+        self.assertEqual(1000 * 1000, kwargs["startTime"])
+        self.assertEqual(2000 * 1000, kwargs["endTime"])
+
+    def test_backoff(self) -> None:
+        intervals = list(itertools.islice(_backoff(1, 8), 6))
+        for interval, max_interval in zip(intervals, [1, 2, 4, 8, 8, 8]):
+            self.assertGreaterEqual(interval, max_interval / 2)
+            self.assertLessEqual(interval, max_interval)
+
     def test_local_session(self) -> None:
         a: object = _local_session()
         self.assertIs(a, _local_session())
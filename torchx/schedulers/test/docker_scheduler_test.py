@@ -8,10 +8,12 @@
 import posixpath
 import unittest
 from datetime import datetime, timedelta
-from unittest.mock import patch
+from typing import List
+from unittest.mock import MagicMock, patch
 
 import fsspec
 import torchx
+from docker.models.containers import Container
 from docker.types import DeviceRequest, Mount
 from torchx import specs
 from torchx.components.dist import ddp
@@ -23,9 +25,13 @@ from torchx.schedulers.docker_scheduler import (
     DockerOpts,
     DockerScheduler,
     has_docker,
+    LABEL_APP_ID,
+    LABEL_REPLICA_ID,
+    LABEL_ROLE_NAME,
 )
 from torchx.schedulers.test.local_scheduler_test import LocalSchedulerTestUtil
 from torchx.specs.api import AppDef, AppState, Role
+from torchx.util.types import none_throws
 
 
 def _test_app() -> specs.AppDef:
@@ -183,6 +189,184 @@ class DockerSchedulerTest(unittest.TestCase):
             },
         )
 
+    def _container(
+        self,
+        client: MagicMock,
+        container_id: str,
+        app_id: str,
+        status: str,
+        exit_code: int = 0,
+    ) -> Container:
+        labels = {
+            LABEL_APP_ID: app_id,
+            LABEL_ROLE_NAME: "trainer",
+            LABEL_REPLICA_ID: container_id[-1],
+        }
+        # containers are listed sparse, the exit code is only known on inspect
+        sparse = Container(
+            attrs={
+                "Id": container_id,
+                "Names": [f"/{container_id}"],
+                "Image": "busybox",
+                "Labels": labels,
+                "State": status,
+            },
+            client=client,
+            collection=client.containers,
+        )
+        inspected = Container(
+            attrs={
+                "Id": container_id,
+                "Name": f"/{container_id}",
+                "Config": {"Labels": labels},
+                "State": {"Status": status, "ExitCode": exit_code},
+            },
+            client=client,
+            collection=client.containers,
+        )
+        client.inspected[container_id] = inspected
+        return sparse
+
+    def _client(self) -> MagicMock:
+        client = MagicMock()
+        client.inspected = {}
+        client.containers.get.side_effect = lambda container_id: client.inspected[
+            container_id
+        ]
+        return client
+
+    def test_describe(self) -> None:
+        client = self._client()
+        scheduler = DockerScheduler("test_session", docker_client=client)
+        client.containers.list.return_value = [
+            self._container(client, "app-trainer-0", "app", "exited", exit_code=0),
+            self._container(client, "app-trainer-1", "app", "running"),
+        ]
+        desc = none_throws(scheduler.describe("app"))
+        self.assertEqual(desc.state, AppState.RUNNING)
+        self.assertEqual(
+            [(r.id, r.state, r.hostname) for r in desc.roles_statuses[0].replicas],
+            [
+                (0, AppState.SUCCEEDED, "app-trainer-0"),
+                (1, AppState.RUNNING, "app-trainer-1"),
+            ],
+        )
+        self.assertEqual(desc.roles[0].image, "busybox")
+        client.containers.list.assert_called_with(
+            all=True, sparse=True, filters={"label": f"{LABEL_APP_ID}=app"}
+        )
+
+        client.containers.list.return_value = [
+            self._container(client, "app-trainer-0", "app", "exited", exit_code=0),
+            self._container(client, "app-trainer-1", "app", "exited", exit_code=1),
+        ]
+        desc = none_throws(scheduler.describe("app"))
+        self.assertEqual(desc.state, AppState.FAILED)
+        # exit codes of exited containers are memoized
+        self.assertEqual(
+            [c.args[0] for c in client.containers.get.call_args_list],
+            ["app-trainer-0", "app-trainer-1"],
+        )
+        desc = none_throws(scheduler.describe("app"))
+        self.assertEqual(desc.state, AppState.FAILED)
+        self.assertEqual(client.containers.get.call_count, 2)
+
+        # restarted containers are inspected again once they exit
+        client.containers.list.return_value = [
+            self._container(client, "app-trainer-1", "app", "restarting"),
+        ]
+        desc = none_throws(scheduler.describe("app"))
+        self.assertEqual(desc.state, AppState.PENDING)
+        client.containers.list.return_value = [
+            self._container(client, "app-trainer-1", "app", "exited", exit_code=0),
+        ]
+        desc = none_throws(scheduler.describe("app"))
+        self.assertEqual(desc.state, AppState.SUCCEEDED)
+        self.assertEqual(client.containers.get.call_count, 3)
+
+    def test_list(self) -> None:
+        client = self._client()
+        scheduler = DockerScheduler("test_session", docker_client=client)
+        client.containers.list.return_value = [
+            self._container(client, "app1-trainer-0", "app1", "exited", exit_code=0),
+            self._container(client, "app1-trainer-1", "app1", "running"),
+            self._container(client, "app2-trainer-0", "app2", "exited", exit_code=0),
+            self._container(client, "app2-trainer-1", "app2", "exited", exit_code=1),
+            self._container(client, "app3-trainer-0", "app3", "exited", exit_code=0),
+        ]
+        self.assertEqual(
+            scheduler.list(),
+            [
+                ListAppResponse(app_id="app1", state=AppState.RUNNING),
+                ListAppResponse(app_id="app2", state=AppState.FAILED),
+                ListAppResponse(app_id="app3", state=AppState.SUCCEEDED),
+            ],
+        )
+        client.containers.list.assert_called_once_with(
+            all=True, sparse=True, filters={"label": LABEL_APP_ID}
+        )
+
+    def test_schedule(self) -> None:
+        from docker.errors import ImageNotFound
+
+        client = self._client()
+        scheduler = DockerScheduler("test_session", docker_client=client)
+        app = _test_app()
+        app.roles[0].num_replicas = 3
+        app.roles.append(
+            Role(name="pinned", image="busybox@sha256:1234", entrypoint="echo")
+        )
+        app.roles.append(
+            Role(name="missing", image="alpine@sha256:5678", entrypoint="echo")
+        )
+        app.roles.append(Role(name="id", image="sha256:abcd", entrypoint="echo"))
+        info = scheduler.submit_dryrun(app, DockerOpts())
+
+        def get_image(image: str) -> MagicMock:
+            if image != "busybox@sha256:1234":
+                raise ImageNotFound(image)
+            return MagicMock()
+
+        client.images.get.side_effect = get_image
+        client.images.pull.side_effect = [None, Exception("no network")]
+        app_id = scheduler.schedule(info)
+        self.assertEqual(app_id, info.request.app_id)
+
+        # only unpinned or missing images are pulled
+        self.assertEqual(
+            sorted(c.args[0] for c in client.images.pull.call_args_list),
+            ["alpine@sha256:5678", "pytorch/torchx:latest"],
+        )
+        self.assertEqual(client.containers.run.call_count, 6)
+        self.assertEqual(
+            sorted(c.kwargs["name"] for c in client.containers.run.call_args_list),
+            sorted(c.kwargs["name"] for c in info.request.containers),
+        )
+        self.assertEqual(set(info.request.timings), {"pull", "start"})
+
+    def test_schedule_start_failure(self) -> None:
+        client = self._client()
+        scheduler = DockerScheduler("test_session", docker_client=client)
+        app = _test_app()
+        app.roles[0].num_replicas = 3
+        info = scheduler.submit_dryrun(app, DockerOpts())
+
+        started = []
+
+        def run(image: str, command: List[str], **kwargs: object) -> MagicMock:
+            if kwargs["name"] == f"{info.request.app_id}-trainer-1":
+                raise RuntimeError("failed to start")
+            container = MagicMock()
+            started.append(container)
+            return container
+
+        client.containers.run.side_effect = run
+        with self.assertRaisesRegex(RuntimeError, "failed to start"):
+            scheduler.schedule(info)
+        self.assertEqual(len(started), 2)
+        for container in started:
+            container.stop.assert_called_once()
+
 
 if has_docker():
     # These are the live tests that require a local docker instance.
@@ -6,10 +6,12 @@
 
 import base64
 import importlib
+import json
 import sys
+import threading
 import unittest
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from unittest.mock import MagicMock, patch
 
 import torchx
@@ -26,6 +28,7 @@ from torchx.schedulers.kubernetes_scheduler import (
     KubernetesOpts,
     KubernetesScheduler,
     LABEL_INSTANCE_TYPE,
+    LABEL_VERSION,
     role_to_pod,
 )
 from torchx.specs import AppState
@@ -60,6 +63,146 @@ TEST_KUBE_CONFIG: Dict[str, Any] = {
 }
 
 
+class FakeJobsApi:
+    """
+    Stand-in for the Volcano job endpoints of the Kubernetes API server.
+    Lists are paged and watches stream the changes made after the requested
+    resource version until the fake is shut down.
+    """
+
+    def __init__(self) -> None:
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.resource_version = 0
+        # resource version of every change as (resource version, event)
+        self.events: List[Tuple[int, Dict[str, Any]]] = []
+        # watches can't be resumed from before this resource version
+        self.oldest_resource_version = 0
+        self.list_calls = 0
+        self.get_calls = 0
+        self.fail_list = False
+        self.cond = threading.Condition()
+        self.closed = False
+
+    def put(self, name: str, phase: str, labelled: bool = True) -> None:
+        with self.cond:
+            event_type = "MODIFIED" if name in self.jobs else "ADDED"
+            self.resource_version += 1
+            job = {
+                "metadata": {
+                    "name": name,
+                    "resourceVersion": str(self.resource_version),
+                    "labels": {LABEL_VERSION: torchx.__version__} if labelled else {},
+                },
+                "status": {"state": {"phase": phase}},
+            }
+            self.jobs[name] = job
+            self.events.append(
+                (self.resource_version, {"type": event_type, "object": job})
+            )
+            self.cond.notify_all()
+
+    def delete(self, name: str) -> None:
+        with self.cond:
+            job = self.jobs.pop(name)
+            self.resource_version += 1
+            self.events.append(
+                (self.resource_version, {"type": "DELETED", "object": job})
+            )
+            self.cond.notify_all()
+
+    def expire(self) -> None:
+        with self.cond:
+            self.oldest_resource_version = self.resource_version + 1
+            self.cond.notify_all()
+
+    def shutdown(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def _selected(self, job: Dict[str, Any], label_selector: Optional[str]) -> bool:
+        return not label_selector or label_selector in job["metadata"]["labels"]
+
+    def get_namespaced_custom_object_status(self, name: str, **kwargs: object) -> Any:
+        from kubernetes.client.rest import ApiException
+
+        self.get_calls += 1
+        with self.cond:
+            if name not in self.jobs:
+                raise ApiException(status=404)
+            return self.jobs[name]
+
+    def list_namespaced_custom_object(
+        self,
+        label_selector: Optional[str] = None,
+        limit: int = 0,
+        _continue: Optional[str] = None,
+        watch: bool = False,
+        resource_version: Optional[str] = None,
+        **kwargs: object,
+    ) -> Any:
+        if watch:
+            assert resource_version is not None
+            return FakeWatchResponse(self, int(resource_version), label_selector)
+
+        from kubernetes.client.rest import ApiException
+
+        self.list_calls += 1
+        if self.fail_list:
+            raise ApiException(status=500)
+        with self.cond:
+            jobs = [
+                job for job in self.jobs.values() if self._selected(job, label_selector)
+            ]
+            start = int(_continue or 0)
+            end = start + limit if limit else len(jobs)
+            metadata = {"resourceVersion": str(self.resource_version)}
+            if end < len(jobs):
+                metadata["continue"] = str(end)
+            return {"metadata": metadata, "items": jobs[start:end]}
+
+
+class FakeWatchResponse:
+    def __init__(
+        self, api: FakeJobsApi, resource_version: int, label_selector: Optional[str]
+    ) -> None:
+        self.api = api
+        self.resource_version = resource_version
+        self.label_selector = label_selector
+
+    def stream(self, **kwargs: object) -> Iterator[bytes]:
+        api = self.api
+        while True:
+            with api.cond:
+                api.cond.wait_for(
+                    lambda: api.closed
+                    or api.resource_version > self.resource_version
+                    or self.resource_version < api.oldest_resource_version
+                )
+                if api.closed:
+                    return
+                if self.resource_version < api.oldest_resource_version:
+                    error = {"code": 410, "reason": "Expired", "message": "too old"}
+                    yield json.dumps({"type": "ERROR", "object": error}).encode()
+                    yield b"\n"
+                    return
+                events = [
+                    event
+                    for resource_version, event in api.events
+                    if resource_version > self.resource_version
+                    and api._selected(event["object"], self.label_selector)
+                ]
+                self.resource_version = api.resource_version
+            for event in events:
+                yield json.dumps(event).encode() + b"\n"
+
+    def close(self) -> None:
+        pass
+
+    def release_conn(self) -> None:
+        pass
+
+
 def _test_app(num_replicas: int = 1) -> specs.AppDef:
     trainer_role = specs.Role(
         name="trainer_foo",
@@ -253,6 +396,10 @@ class KubernetesSchedulerTest(unittest.TestCase):
             f"""apiVersion: batch.volcano.sh/v1alpha1
 kind: Job
 metadata:
+  labels:
+    torchx.pytorch.org/app-id: app-name-42
+    torchx.pytorch.org/app-name: test
+    torchx.pytorch.org/version: {torchx.__version__}
   name: app-name-42
 spec:
   maxRetry: 3
@@ -694,6 +841,7 @@ spec:
                 "queue",
                 "namespace",
                 "image_repo",
+                "gzip_context",
                 "service_account",
                 "priority_class",
             },
@@ -722,6 +870,7 @@ spec:
             "torchx.schedulers.kubernetes_scheduler.KubernetesScheduler._get_active_context"
         ) as test_context:
             test_context.return_value = TEST_KUBE_CONFIG["contexts"][0]
+            list_namespaced_custom_object.return_value = {"items": []}
             scheduler = create_scheduler("test")
 
             scheduler.list()
@@ -735,10 +884,29 @@ spec:
                     "version": "v1alpha1",
                     "namespace": "default",
                     "plural": "jobs",
-                    "timeout_seconds": 30,
+                    "limit": 500,
                 },
             )
 
+    @patch.object(kubernetes_scheduler, "LIST_PAGE_SIZE", 2)
+    def test_list_paged(self) -> None:
+        api = FakeJobsApi()
+        for i in range(5):
+            api.put(f"job{i}", "Running", labelled=i % 2 == 0)
+        scheduler = create_scheduler("test")
+        with patch.object(
+            scheduler, "_custom_objects_api", return_value=api
+        ), patch.object(
+            scheduler,
+            "_get_active_context",
+            return_value=TEST_KUBE_CONFIG["contexts"][0],
+        ):
+            apps = scheduler.list()
+        self.assertEqual(
+            [app.app_id for app in apps], [f"default:job{i}" for i in range(5)]
+        )
+        self.assertEqual(api.list_calls, 3)
+
     @patch("kubernetes.client.CustomObjectsApi.list_namespaced_custom_object")
     def test_list_values(self, list_namespaced_custom_object: MagicMock) -> None:
         list_namespaced_custom_object.return_value = {
@@ -803,7 +971,7 @@ spec:
                     "version": "v1alpha1",
                     "namespace": "default",
                     "plural": "jobs",
-                    "timeout_seconds": 30,
+                    "limit": 500,
                 },
             )
             self.assertEqual(
@@ -835,6 +1003,265 @@ spec:
             with self.assertRaises(ApiException):
                 scheduler.list()
 
+    @patch("kubernetes.client.CustomObjectsApi.get_namespaced_custom_object_status")
+    @patch("kubernetes.client.CustomObjectsApi.list_namespaced_custom_object")
+    def test_describe_many(
+        self,
+        list_namespaced_custom_object: MagicMock,
+        get_namespaced_custom_object_status: MagicMock,
+    ) -> None:
+        from kubernetes.client.rest import ApiException
+
+        list_namespaced_custom_object.return_value = {
+            "items": [
+                {
+                    "metadata": {"name": "job1"},
+                    "status": {"state": {"phase": "Running"}},
+                },
+                {
+                    "metadata": {"name": "job2"},
+                    "status": {"state": {"phase": "Completed"}},
+                },
+            ]
+        }
+        # unlabelled jobs fall back to describe
+        get_namespaced_custom_object_status.side_effect = ApiException(status=404)
+
+        scheduler = create_scheduler("test")
+        descs = scheduler.describe_many(
+            ["testnamespace:job1", "testnamespace:job2", "testnamespace:job3"]
+        )
+        self.assertEqual(
+            {app_id: desc.state if desc else None for app_id, desc in descs.items()},
+            {
+                "testnamespace:job1": specs.AppState.RUNNING,
+                "testnamespace:job2": specs.AppState.SUCCEEDED,
+                "testnamespace:job3": None,
+            },
+        )
+        self.assertEqual(list_namespaced_custom_object.call_count, 1)
+        _, kwargs = list_namespaced_custom_object.call_args
+        self.assertEqual(kwargs["namespace"], "testnamespace")
+        self.assertEqual(
+            kwargs["label_selector"], "torchx.pytorch.org/app-id in (job1,job2,job3)"
+        )
+        self.assertEqual(get_namespaced_custom_object_status.call_count, 1)
+
+    @patch("torchx.schedulers.kubernetes_scheduler.time.sleep")
+    @patch("kubernetes.watch.Watch.stream")
+    @patch("kubernetes.client.CustomObjectsApi.get_namespaced_custom_object_status")
+    def test_watch(
+        self,
+        get_namespaced_custom_object_status: MagicMock,
+        stream: MagicMock,
+        sleep: MagicMock,
+    ) -> None:
+        def job(phase: str, resource_version: str) -> Dict[str, Any]:
+            return {
+                "metadata": {"name": "testid", "resourceVersion": resource_version},
+                "status": {"state": {"phase": phase}},
+            }
+
+        get_namespaced_custom_object_status.return_value = job("Pending", "1")
+        stream.side_effect = [
+            # first watch times out without the job finishing
+            iter(
+                [
+                    {"type": "ADDED", "object": job("Pending", "1")},
+                    {
+                        "type": "BOOKMARK",
+                        "object": {"metadata": {"resourceVersion": "2"}},
+                    },
+                ]
+            ),
+            iter(
+                [
+                    {"type": "MODIFIED", "object": job("Running", "3")},
+                    {"type": "MODIFIED", "object": job("Running", "4")},
+                    {"type": "MODIFIED", "object": job("Completed", "5")},
+                ]
+            ),
+        ]
+        scheduler = create_scheduler("test")
+        states = [
+            desc.state
+            for desc in scheduler.watch("testnamespace:testid", max_interval=5)
+        ]
+        self.assertEqual(
+            states,
+            [specs.AppState.PENDING, specs.AppState.RUNNING, specs.AppState.SUCCEEDED],
+        )
+        self.assertEqual(stream.call_count, 2)
+        _, kwargs = stream.call_args
+        self.assertEqual(kwargs["field_selector"], "metadata.name=testid")
+        self.assertEqual(kwargs["namespace"], "testnamespace")
+        # the watch timeout is independent of max_interval
+        self.assertEqual(kwargs["timeout_seconds"], 300)
+        self.assertTrue(kwargs["allow_watch_bookmarks"])
+        # the watch is resumed from the bookmarked resource version
+        self.assertEqual(kwargs["resource_version"], "2")
+        # the first watch ended early so re-opening it is delayed
+        self.assertEqual(sleep.call_count, 1)
+        self.assertGreater(sleep.call_args.args[0], 0)
+
+    @patch("kubernetes.watch.Watch.stream")
+    @patch("kubernetes.client.CustomObjectsApi.get_namespaced_custom_object_status")
+    def test_watch_deleted(
+        self, get_namespaced_custom_object_status: MagicMock, stream: MagicMock
+    ) -> None:
+        get_namespaced_custom_object_status.return_value = {
+            "status": {"state": {"phase": "Running"}},
+        }
+        stream.return_value = iter([{"type": "DELETED", "object": {}}])
+        scheduler = create_scheduler("test")
+        states = [desc.state for desc in scheduler.watch("testnamespace:testid")]
+        self.assertEqual(states, [specs.AppState.RUNNING])
+
+    @patch("torchx.schedulers.kubernetes_scheduler.time.sleep")
+    @patch("kubernetes.watch.Watch.stream")
+    @patch("kubernetes.client.CustomObjectsApi.get_namespaced_custom_object_status")
+    def test_watch_error_event(
+        self,
+        get_namespaced_custom_object_status: MagicMock,
+        stream: MagicMock,
+        sleep: MagicMock,
+    ) -> None:
+        from kubernetes.client.rest import ApiException
+
+        get_namespaced_custom_object_status.return_value = {
+            "status": {"state": {"phase": "Running"}},
+        }
+        status = {"kind": "Status", "code": 410, "message": "too old"}
+        stream.side_effect = [
+            iter([{"type": "ERROR", "object": status}]),
+            iter(
+                [
+                    {
+                        "type": "MODIFIED",
+                        "object": {
+                            "metadata": {"resourceVersion": "2"},
+                            "status": {"state": {"phase": "Completed"}},
+                        },
+                    }
+                ]
+            ),
+        ]
+        scheduler = create_scheduler("test")
+        states = [desc.state for desc in scheduler.watch("testnamespace:testid")]
+        self.assertEqual(states, [specs.AppState.RUNNING, specs.AppState.SUCCEEDED])
+        # the watch is restarted from the current state
+        self.assertNotIn("resource_version", stream.call_args[1])
+
+        stream.side_effect = [
+            iter([{"type": "ERROR", "object": {"kind": "Status", "code": 500}}])
+        ]
+        with self.assertRaises(ApiException) as cm:
+            list(scheduler.watch("testnamespace:testid"))
+        self.assertEqual(cm.exception.status, 500)
+
+    def _informer_scheduler(self, api: "FakeJobsApi") -> KubernetesScheduler:
+        scheduler = create_scheduler("test", informer=True)
+        patcher = patch.object(scheduler, "_custom_objects_api", return_value=api)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(api.shutdown)
+        self.addCleanup(scheduler.close)
+        return scheduler
+
+    @patch.object(kubernetes_scheduler, "LIST_PAGE_SIZE", 1)
+    def test_informer(self) -> None:
+        api = FakeJobsApi()
+        api.put("job1", "Running")
+        api.put("job2", "Pending")
+        api.put("unlabelled", "Running", labelled=False)
+        scheduler = self._informer_scheduler(api)
+
+        desc = scheduler.describe("default:job1")
+        self.assertIsNotNone(desc)
+        self.assertEqual(desc.state, AppState.RUNNING)
+        # the informer pages through the torchx jobs
+        self.assertEqual(api.list_calls, 2)
+
+        # unlabelled jobs are looked up on the API server
+        desc = scheduler.describe("default:unlabelled")
+        self.assertIsNotNone(desc)
+        self.assertEqual(desc.state, AppState.RUNNING)
+        self.assertEqual(api.get_calls, 1)
+
+        descs = scheduler.describe_many(["default:job1", "default:job2"])
+        self.assertEqual(
+            {app_id: desc.state for app_id, desc in descs.items() if desc},
+            {"default:job1": AppState.RUNNING, "default:job2": AppState.PENDING},
+        )
+
+        with patch.object(
+            scheduler,
+            "_get_active_context",
+            return_value=TEST_KUBE_CONFIG["contexts"][0],
+        ):
+            apps = scheduler.list()
+        self.assertEqual(
+            sorted(app.app_id for app in apps), ["default:job1", "default:job2"]
+        )
+
+        watch = iter(scheduler.watch("default:job2"))
+        self.assertEqual(next(watch).state, AppState.PENDING)
+        api.put("job2", "Running")
+        self.assertEqual(next(watch).state, AppState.RUNNING)
+        api.put("job2", "Running")
+        api.put("job2", "Completed")
+        self.assertEqual(next(watch).state, AppState.SUCCEEDED)
+        self.assertEqual(list(watch), [])
+
+        # all served from memory
+        self.assertEqual(api.list_calls, 2)
+        self.assertEqual(api.get_calls, 1)
+
+    @patch.object(kubernetes_scheduler, "WATCH_MIN_INTERVAL_SECONDS", 0)
+    def test_informer_expired(self) -> None:
+        api = FakeJobsApi()
+        api.put("job1", "Running")
+        scheduler = self._informer_scheduler(api)
+        informer = scheduler._get_informer("default")
+        assert informer is not None
+
+        api.delete("job1")
+        self.assertIsNone(informer.wait_for_change("job1", "1", timeout=10))
+
+        # the watch can no longer be resumed, the informer lists the jobs again
+        api.expire()
+        api.put("job2", "Running")
+        job = informer.wait_for_change("job2", None, timeout=10)
+        self.assertIsNotNone(job)
+        self.assertEqual(api.list_calls, 2)
+
+    @patch.object(kubernetes_scheduler, "WATCH_MIN_INTERVAL_SECONDS", 0.1)
+    def test_informer_not_synced(self) -> None:
+        api = FakeJobsApi()
+        api.put("job1", "Running")
+        api.fail_list = True
+        scheduler = self._informer_scheduler(api)
+        with patch.object(kubernetes_scheduler, "INFORMER_SYNC_TIMEOUT_SECONDS", 0.1):
+            desc = scheduler.describe("default:job1")
+        self.assertIsNotNone(desc)
+        self.assertEqual(api.get_calls, 1)
+
+        # only the first use waits for the informer to sync
+        with patch.object(
+            kubernetes_scheduler.JobInformer, "wait_for_sync"
+        ) as wait_for_sync:
+            desc = scheduler.describe("default:job1")
+        self.assertIsNotNone(desc)
+        self.assertEqual(api.get_calls, 2)
+        wait_for_sync.assert_not_called()
+
+        # the informer is used once it synced in the background
+        informer = scheduler._informers["default"]
+        api.fail_list = False
+        self.assertTrue(informer.wait_for_sync(10))
+        scheduler.describe("default:job1")
+        self.assertEqual(api.get_calls, 2)
+
     @patch("kubernetes.client.CoreV1Api.read_namespaced_pod_log")
     def test_log_iter(self, read_namespaced_pod_log: MagicMock) -> None:
         scheduler = create_scheduler("test")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from torchx.schedulers.local_app_store import (
+    default_store_path,
+    ENV_TORCHX_LOCAL_APP_STORE,
+    LocalAppRecord,
+    LocalAppStore,
+)
+from torchx.specs.api import AppState
+
+
+def _record(app_id: str, session_name: str = "test_session") -> LocalAppRecord:
+    return LocalAppRecord(
+        app_id=app_id,
+        session_name=session_name,
+        log_dir=f"/tmp/{app_id}",
+        state=AppState.RUNNING,
+        roles={
+            "trainer": [
+                {
+                    "replica_id": 0,
+                    "pid": 123,
+                    "exitcode": None,
+                    "stdout": "<CONSOLE>",
+                    "stderr": "<CONSOLE>",
+                    "error_file": "<N/A>",
+                }
+            ]
+        },
+    )
+
+
+class LocalAppStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.test_dir = tempfile.mkdtemp(prefix="LocalAppStoreTest_")
+        self.store = LocalAppStore(os.path.join(self.test_dir, "apps.db"))
+
+    def tearDown(self) -> None:
+        self.store.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_put_get(self) -> None:
+        self.assertIsNone(self.store.get("foo"))
+        record = _record("foo")
+        self.store.put(record)
+        self.assertEqual(record, self.store.get("foo"))
+
+        record.state = AppState.SUCCEEDED
+        record.roles["trainer"][0]["exitcode"] = 0
+        self.store.put(record)
+        self.assertEqual(record, self.store.get("foo"))
+
+    def test_shared_between_stores(self) -> None:
+        self.store.put(_record("foo"))
+        other = LocalAppStore(self.store.path)
+        self.assertEqual(self.store.get("foo"), other.get("foo"))
+        other.close()
+
+    def test_list(self) -> None:
+        for app_id in ["foo", "bar", "baz"]:
+            self.store.put(_record(app_id))
+        self.store.put(_record("other", session_name="other_session"))
+        # foo is now the most recently updated
+        self.store.put(_record("foo"))
+
+        self.assertEqual(
+            ["bar", "baz", "foo"],
+            [r.app_id for r in self.store.list("test_session")],
+        )
+        self.assertEqual(
+            ["other"], [r.app_id for r in self.store.list("other_session")]
+        )
+
+    def test_delete(self) -> None:
+        self.store.put(_record("foo"))
+        self.store.put(_record("bar"))
+        self.store.delete(["foo"])
+        self.assertIsNone(self.store.get("foo"))
+        self.assertIsNotNone(self.store.get("bar"))
+
+    @patch("torchx.schedulers.local_app_store.MAX_RECORDS", 2)
+    def test_prune(self) -> None:
+        for app_id in ["foo", "bar", "baz"]:
+            self.store.put(_record(app_id))
+        self.assertEqual(
+            ["bar", "baz"], [r.app_id for r in self.store.list("test_session")]
+        )
+
+    def test_unavailable(self) -> None:
+        not_a_dir = os.path.join(self.test_dir, "file")
+        with open(not_a_dir, "w"):
+            pass
+
+        store = LocalAppStore(os.path.join(not_a_dir, "apps.db"))
+        store.put(_record("foo"))
+        self.assertIsNone(store.get("foo"))
+        self.assertEqual([], store.list("test_session"))
+        store.close()
+
+    def test_default_store_path(self) -> None:
+        with patch.dict(os.environ, {ENV_TORCHX_LOCAL_APP_STORE: "~/foo.db"}):
+            self.assertEqual(os.path.expanduser("~/foo.db"), default_store_path())
+        with patch.dict(os.environ, {ENV_TORCHX_LOCAL_APP_STORE: ""}):
+            self.assertEqual(
+                os.path.expanduser("~/.torchx/local_apps.db"), default_store_path()
+            )
@@ -23,7 +23,8 @@ from typing import Callable, Generator, Optional
 from unittest import mock
 from unittest.mock import MagicMock, patch
 
-from torchx.schedulers.api import DescribeAppResponse
+from torchx.schedulers.api import DescribeAppResponse, ListAppResponse
+from torchx.schedulers.local_app_store import ENV_TORCHX_LOCAL_APP_STORE
 from torchx.schedulers.local_scheduler import (
     _join_PATH,
     create_scheduler,
@@ -41,6 +42,21 @@ from torchx.util.types import none_throws
 from .test_util import write_shell_script
 
 
+_app_store_dir: str = ""
+
+
+def setUpModule() -> None:
+    # keep the apps launched by the tests out of the user's app store
+    global _app_store_dir
+    _app_store_dir = tempfile.mkdtemp(prefix="local_app_store_")
+    os.environ[ENV_TORCHX_LOCAL_APP_STORE] = join(_app_store_dir, "local_apps.db")
+
+
+def tearDownModule() -> None:
+    os.environ.pop(ENV_TORCHX_LOCAL_APP_STORE, None)
+    shutil.rmtree(_app_store_dir, ignore_errors=True)
+
+
 LOCAL_DIR_IMAGE_PROVIDER_FETCH = (
     "torchx.schedulers.local_scheduler.LocalDirectoryImageProvider.fetch"
 )
@@ -270,6 +286,58 @@ class LocalDirectorySchedulerTest(unittest.TestCase, LocalSchedulerTestUtil):
         self.assertTrue(os.path.exists(self.test_dir))
         self.assertFalse(self.scheduler._created_tmp_log_dir)
 
+    def test_submit_parallel_launch(self) -> None:
+        num_replicas = 20
+        role = Role(
+            "role1",
+            image=self.test_dir,
+            entrypoint="echo_stdout.sh",
+            args=[macros.replica_id],
+            num_replicas=num_replicas,
+        )
+        app = AppDef(name="test_app", roles=[role])
+        with patch("torchx.schedulers.local_scheduler.LAUNCH_PARALLELISM", 4):
+            app_id = self.scheduler.submit(app, cfg={"log_dir": self.test_dir})
+
+        replicas = self.scheduler._apps[app_id].role_replicas["role1"]
+        self.assertEqual(list(range(num_replicas)), [r.replica_id for r in replicas])
+        self.assertTrue(all(r.launch_secs > 0 for r in replicas))
+        self.assertEqual(AppState.SUCCEEDED, none_throws(self.wait(app_id)).state)
+        for replica_id in range(num_replicas):
+            with open(none_throws(replicas[replica_id].stdout).name) as f:
+                self.assertEqual(f"{replica_id}\n", f.read())
+
+    def test_submit_launch_failure(self) -> None:
+        role = Role(
+            "role1",
+            image=self.test_dir,
+            entrypoint="sleep.sh",
+            args=["600"],
+            num_replicas=4,
+        )
+        app = AppDef(name="test_app", roles=[role])
+        popen = self.scheduler._popen
+        launched = []
+
+        def popen_or_fail(
+            role_name: str, replica_id: int, *args: object, **kwargs: object
+        ) -> object:
+            if replica_id == 2:
+                raise OSError("failed to launch")
+            replica = popen(role_name, replica_id, *args, **kwargs)
+            launched.append(replica)
+            return replica
+
+        with patch.object(self.scheduler, "_popen", side_effect=popen_or_fail):
+            with self.assertRaisesRegex(OSError, "failed to launch"):
+                self.scheduler.submit(app, cfg={"log_dir": self.test_dir})
+
+        self.assertEqual(3, len(launched))
+        for replica in launched:
+            # the replicas that were launched are terminated
+            self.assertEqual(-signal.SIGTERM, replica.proc.wait(timeout=10))
+        self.assertEqual({}, self.scheduler._apps)
+
     def test_submit_cleanup(self) -> None:
         test_file_name = f"{macros.app_id}_{macros.replica_id}"
         role = Role(
@@ -736,9 +804,124 @@ class LocalDirectorySchedulerTest(unittest.TestCase, LocalSchedulerTestUtil):
         assert desc is not None
         self.assertEqual(AppState.CANCELLED, desc.state)
 
+    def test_watch(self) -> None:
+        role = Role(
+            "role1",
+            image=self.test_dir,
+            entrypoint="sleep.sh",
+            args=["1"],
+            num_replicas=2,
+        )
+        app = AppDef(name="test_app", roles=[role])
+        cfg = {"log_dir": self.test_dir}
+        self.assertEqual(list(self.scheduler.watch("test_app_0")), [])
+        app_id = self.scheduler.submit(app, cfg)
+        states = [desc.state for desc in self.scheduler.watch(app_id)]
+        self.assertEqual([AppState.RUNNING, AppState.SUCCEEDED], states)
+
+    def test_watch_timeout(self) -> None:
+        role = Role(
+            "role1",
+            image=self.test_dir,
+            entrypoint="sleep.sh",
+            args=["10"],
+            num_replicas=1,
+        )
+        app = AppDef(name="test_app", roles=[role])
+        cfg = {"log_dir": self.test_dir}
+        app_id = self.scheduler.submit(app, cfg)
+        watch = iter(self.scheduler.watch(app_id, max_interval=0.1))
+        self.assertEqual(AppState.RUNNING, next(watch).state)
+        self.scheduler.cancel(app_id)
+        self.assertEqual(AppState.CANCELLED, next(watch).state)
+        self.assertEqual([], list(watch))
+
     def test_list(self) -> None:
-        with self.assertRaisesRegex(Exception, "cannot be listed"):
-            self.scheduler.list()
+        role = Role("role1", image=self.test_dir, entrypoint="sleep.sh", args=["0"])
+        app = AppDef(name="test_app", roles=[role])
+        cfg = {"log_dir": self.test_dir}
+        app_ids = [self.scheduler.submit(app, cfg) for _ in range(2)]
+        for app_id in app_ids:
+            self.wait(app_id)
+
+        apps = self.scheduler.list()
+        for app_id in app_ids:
+            self.assertIn(ListAppResponse(app_id, AppState.SUCCEEDED), apps)
+
+        # apps of other sessions are not listed
+        other_session = LocalScheduler(
+            session_name="other_session",
+            image_provider_class=LocalDirectoryImageProvider,
+        )
+        self.assertEqual([], other_session.list())
+        other_session.close()
+
+    def test_other_process(self) -> None:
+        role = Role(
+            "role1",
+            image=self.test_dir,
+            entrypoint="echo_range.sh",
+            args=["3", "600"],
+            num_replicas=1,
+        )
+        app = AppDef(name="test_app", roles=[role])
+        cfg = {"log_dir": self.test_dir}
+        app_id = self.scheduler.submit(app, cfg)
+        pid = self.scheduler._apps[app_id].role_replicas["role1"][0].proc.pid
+
+        # a scheduler in another process only sees the app store
+        other = LocalScheduler(
+            session_name="test_session",
+            image_provider_class=LocalDirectoryImageProvider,
+        )
+        self.assertEqual(AppState.RUNNING, none_throws(other.describe(app_id)).state)
+        self.assertIn(ListAppResponse(app_id, AppState.RUNNING), other.list())
+        self.assertEqual("0\n", next(iter(other.log_iter(app_id, "role1"))))
+
+        other.cancel(app_id)
+        self.assertEqual(AppState.CANCELLED, none_throws(other.describe(app_id)).state)
+        self.scheduler._apps[app_id].wait(timeout=10)
+        self.assertFalse(pid_exists(pid))
+        other.close()
+
+    def test_other_process_pid_reused(self) -> None:
+        role = Role("role1", image=self.test_dir, entrypoint="sleep.sh", args=["600"])
+        app = AppDef(name="test_app", roles=[role])
+        app_id = self.scheduler.submit(app, {"log_dir": self.test_dir})
+
+        # pretend that the replica exited and another process got its pid
+        store = self.scheduler._get_app_store()
+        record = none_throws(store.get(app_id))
+        replica = record.roles["role1"][0]
+        self.assertIsNotNone(replica["start_time"])
+        replica["start_time"] -= 1
+        store.put(record)
+
+        other = LocalScheduler(
+            session_name="test_session",
+            image_provider_class=LocalDirectoryImageProvider,
+        )
+        self.assertEqual(AppState.UNKNOWN, none_throws(other.describe(app_id)).state)
+        other.cancel(app_id)
+        # the process that reuses the pid is not killed
+        self.assertTrue(pid_exists(replica["pid"]))
+        other.close()
+
+    def test_other_process_exited(self) -> None:
+        role = Role("role1", image=self.test_dir, entrypoint="fail.sh")
+        app = AppDef(name="test_app", roles=[role])
+        app_id = self.scheduler.submit(app, {"log_dir": self.test_dir})
+        self.scheduler._apps[app_id].wait(timeout=10)
+
+        # the launching scheduler never described the app but recorded
+        # the exit codes when it was closed
+        self.scheduler.close()
+        other = LocalScheduler(
+            session_name="test_session",
+            image_provider_class=LocalDirectoryImageProvider,
+        )
+        self.assertEqual(AppState.FAILED, none_throws(other.describe(app_id)).state)
+        other.close()
 
     def test_exists(self) -> None:
         role = Role(
@@ -820,13 +1003,41 @@ class LocalDirectorySchedulerTest(unittest.TestCase, LocalSchedulerTestUtil):
         assert resp2 is not None
         self.assertEqual(AppState.SUCCEEDED, resp2.state)
 
-        # app1 should've been evicted
-        self.assertIsNone(scheduler.describe(app_id1))
-        self.assertIsNone(self.wait(app_id1, scheduler))
+        # app1 should've been evicted from the cache but is still in the app store
+        self.assertNotIn(app_id1, scheduler._apps)
+        resp1 = scheduler.describe(app_id1)
+        assert resp1 is not None
+        self.assertEqual(AppState.SUCCEEDED, resp1.state)
 
         self.assertIsNotNone(scheduler.describe(app_id2))
         self.assertIsNotNone(self.wait(app_id2, scheduler))
 
+    def test_cache_evict_lru(self) -> None:
+        scheduler = LocalScheduler(
+            session_name="test_session",
+            cache_size=3,
+            image_provider_class=LocalDirectoryImageProvider,
+        )
+        role = Role("role1", image=self.test_dir, entrypoint="sleep.sh", args=["0"])
+        app = AppDef(name="test_app", roles=[role])
+        cfg = {"log_dir": self.test_dir}
+
+        app_ids = []
+        for _ in range(3):
+            app_id = scheduler.submit(app, cfg)
+            self.wait(app_id, scheduler)
+            app_ids.append(app_id)
+
+        # describing the first app makes the second one the least recently used
+        scheduler.describe(app_ids[0])
+        scheduler.submit(app, cfg)
+        self.assertIn(app_ids[0], scheduler._apps)
+        self.assertNotIn(app_ids[1], scheduler._apps)
+        self.assertIn(app_ids[2], scheduler._apps)
+        # stale heap entries are compacted
+        self.assertLessEqual(len(scheduler._lru), 2 * 3)
+        scheduler.close()
+
     def test_close(self) -> None:
         # 2 apps each with 4 replicas == 8 total pids
         # make sure they all exist after submission
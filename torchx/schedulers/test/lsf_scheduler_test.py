@@ -4,6 +4,7 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import time
 import unittest
 
 from unittest.mock import MagicMock, patch
@@ -21,6 +22,7 @@ from torchx.schedulers.lsf_scheduler import (
     get_docker_command,
     get_job_state,
     get_submit_script,
+    HOSTS_CACHE_TTL_SECONDS,
     LsfBsub,
     LsfOpts,
     LsfScheduler,
@@ -37,6 +39,7 @@ from torchx.specs import (
 )
 
 from torchx.util import shlex
+from torchx.util.types import none_throws
 
 
 def simple_role() -> Role:
@@ -527,6 +530,7 @@ dist_app-vdkcfm1p7lxcx EXIT 1
 
     @patch("subprocess.run")
     def test_cancel(self, run: MagicMock) -> None:
+        run.return_value.stdout = b"1234 1234-role-0 RUN - /some/path\n"
         scheduler = create_scheduler("foo")
         app_id = "1234"
         self.assertTrue(scheduler.exists(app_id))
@@ -544,6 +548,79 @@ dist_app-vdkcfm1p7lxcx EXIT 1
             ["bjobs", "-noheader", "-a", "-o", "proj stat exit_code"],
         )
 
+    @patch("subprocess.run")
+    def test_describe_many(self, run: MagicMock) -> None:
+        run.return_value.stdout = b"""app1 app1-trainer-0 DONE - /jobs/app1
+app1 app1-trainer-1 RUN - /jobs/app1
+app2 app2-trainer-0 EXIT 1 -
+app3 app3-trainer-0 RUN - -
+"""
+        scheduler = create_scheduler("foo")
+        descs = scheduler.describe_many(["app1", "app2", "app4"])
+        self.assertEqual(
+            {app_id: desc.state if desc else None for app_id, desc in descs.items()},
+            {"app1": AppState.RUNNING, "app2": AppState.FAILED, "app4": None},
+        )
+        self.assertEqual(none_throws(descs["app1"]).roles[0].num_replicas, 2)
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(
+            run.call_args[0][0],
+            ["bjobs", "-noheader", "-a", "-o", "proj name stat exit_code output_dir"],
+        )
+
+        scheduler.describe("app1")
+        self.assertEqual(
+            run.call_args[0][0],
+            [
+                "bjobs",
+                "-noheader",
+                "-a",
+                "-P",
+                "app1",
+                "-o",
+                "proj name stat exit_code output_dir",
+            ],
+        )
+        self.assertEqual(scheduler.describe_many([]), {})
+
+    @patch("torchx.schedulers.lsf_scheduler.LogIterator")
+    @patch("subprocess.run")
+    def test_log_iter_cached(self, run: MagicMock, LogIterator: MagicMock) -> None:
+        run.return_value.stdout = b"""app-id app-id-role-0 RUN - /some/path
+app-id app-id-role-1 RUN - /some/path
+"""
+        scheduler = create_scheduler("foo")
+        scheduler.describe("app-id")
+        for k in range(2):
+            list(scheduler.log_iter("app-id", "role", k=k))
+        # the output dirs are cached by describe
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(
+            [c.args[1] for c in LogIterator.call_args_list],
+            ["/some/path/app-id-role-0.out", "/some/path/app-id-role-1.out"],
+        )
+
+    @patch("subprocess.run")
+    def test_schedule_hosts_cached(self, run: MagicMock) -> None:
+        run.return_value.stdout = b"icgen2host-10-240-0-23 16 2\n"
+        scheduler = create_scheduler("foo")
+        for _ in range(2):
+            scheduler.schedule(scheduler.submit_dryrun(simple_app(), cfg={}))
+        self.assertEqual(
+            [c.args[0][0] for c in run.call_args_list],
+            ["bhosts", "/bin/bash", "/bin/bash"],
+        )
+
+        # bhosts is run again once the cached output expired
+        with patch(
+            "time.monotonic",
+            return_value=time.monotonic() + HOSTS_CACHE_TTL_SECONDS + 1,
+        ):
+            scheduler.schedule(scheduler.submit_dryrun(simple_app(), cfg={}))
+        self.assertEqual(
+            [c.args[0][0] for c in run.call_args_list[3:]], ["bhosts", "/bin/bash"]
+        )
+
     @patch("torchx.schedulers.lsf_scheduler.LogIterator")
     @patch("subprocess.run")
     def test_log_iter(self, run: MagicMock, LogIterator: MagicMock) -> None:
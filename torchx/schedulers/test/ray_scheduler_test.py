@@ -4,28 +4,60 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import asyncio
+import io
+import json
 import os
 import tempfile
-from contextlib import contextmanager
+import threading
+import zipfile
+from contextlib import contextmanager, redirect_stdout
 from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from shutil import copy2
-from typing import Any, cast, Iterable, Iterator, List, Optional, Type
+from typing import (
+    Any,
+    AsyncIterator,
+    cast,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from torchx.schedulers import get_scheduler_factories
-from torchx.schedulers.api import AppDryRunInfo, DescribeAppResponse, ListAppResponse
-from torchx.schedulers.ray.ray_common import RayActor
+from torchx.schedulers.api import (
+    AppDryRunInfo,
+    AppState,
+    DescribeAppResponse,
+    ListAppResponse,
+    Stream,
+)
+from torchx.schedulers.ray.ray_common import (
+    RayActor,
+    TORCHX_RAY_ACTORS,
+    TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT,
+)
 from torchx.schedulers.ray_scheduler import has_ray
 from torchx.specs import AppDef, Resource, Role, runopts
 
 if has_ray():
     import ray
+    import requests
     from ray.cluster_utils import Cluster
+    from ray.dashboard.modules.job.sdk import JobSubmissionClient
+    from ray.exceptions import RayActorError
     from ray.util.placement_group import remove_placement_group
     from torchx.schedulers.ray import ray_driver
     from torchx.schedulers.ray_scheduler import (
         _logger,
+        _package_uri,
+        _zip_package,
         RayJob,
         RayOpts,
         RayScheduler,
@@ -126,6 +158,9 @@ if has_ray():
                 Option("cluster_name", str),
                 Option("dashboard_address", str, default="127.0.0.1:8265"),
                 Option("requirements", str, is_required=False),
+                Option("placement_group_timeout", int, default=100),
+                Option("workspace_sync", bool, default=False),
+                Option("workspace_sync_checksum", bool, default=False),
             ]
 
             self.assertEqual(len(opts), len(expected_opts))
@@ -358,6 +393,377 @@ if has_ray():
             ):
                 self._scheduler._submit_dryrun(app, cfg={})
 
+        def test_replica_ids(self) -> None:
+            req = self._scheduler._submit_dryrun(self._app_def, cfg={})
+            job = req.request
+            self.assertEqual(
+                [(actor.name, actor.replica_id) for actor in job.actors],
+                [
+                    ("dummy_role1", 0),
+                    ("dummy_role1", 1),
+                    ("dummy_role1", 2),
+                    ("dummy_role2", 0),
+                ],
+            )
+
+        @contextmanager
+        def _mock_client(
+            self, streams: List[List[str]], statuses: Optional[List[str]] = None
+        ) -> Iterator[Any]:
+            """
+            Patches the JobSubmissionClient, every ``tail_job_logs`` call
+            streams the next list of chunks of ``streams``.
+            """
+            remaining = list(streams)
+
+            async def tail_job_logs(job_id: str) -> AsyncIterator[str]:
+                for chunk in remaining.pop(0):
+                    yield chunk
+
+            with patch(
+                "torchx.schedulers.ray_scheduler._PooledJobSubmissionClient"
+            ) as client_cls, patch(
+                "torchx.schedulers.ray_scheduler.LOG_TAIL_RECONNECT_INTERVAL", 0
+            ):
+                # drop the clients cached by the previous calls
+                self._scheduler._clients.clear()
+                client = client_cls.return_value
+                client.tail_job_logs = tail_job_logs
+                client.get_job_status.side_effect = statuses or ["SUCCEEDED"]
+                yield client
+
+        def test_log_iter(self) -> None:
+            with self._mock_client([]) as client:
+                client.get_job_logs.return_value = "foo\nbar\n"
+                logs = self._scheduler.log_iter("127.0.0.1:8265-app_id")
+                self.assertEqual(list(logs), ["foo\n", "bar\n"])
+                client.get_job_logs.assert_called_once_with("app_id")
+
+        def test_log_iter_tail(self) -> None:
+            with self._mock_client([["fo", "o\nba", "r\n", "baz"]]):
+                logs = self._scheduler.log_iter(
+                    "127.0.0.1:8265-app_id", should_tail=True
+                )
+                self.assertEqual(list(logs), ["foo\n", "bar\n", "baz"])
+
+        def test_log_iter_tail_reconnect(self) -> None:
+            # the second stream restarts from the beginning of the log
+            with self._mock_client(
+                [["foo\n", "ba"], ["foo\nbar\n", "baz\n"]],
+                statuses=["RUNNING", "SUCCEEDED"],
+            ) as client:
+                logs = self._scheduler.log_iter(
+                    "127.0.0.1:8265-app_id", should_tail=True
+                )
+                self.assertEqual(list(logs), ["foo\n", "bar\n", "baz\n"])
+                self.assertEqual(client.get_job_status.call_count, 2)
+
+        def test_log_iter_role(self) -> None:
+            lines = [
+                "\x1b[2m\x1b[36m(dummy_role1/0 pid=1, ip=10.0.0.1)\x1b[0m foo\n",
+                "(dummy_role1/1 pid=2, ip=10.0.0.1) bar\n",
+                "(dummy_role1/10 pid=3, ip=10.0.0.1) baz\n",
+                "driver\n",
+            ]
+            with self._mock_client([lines]):
+                logs = self._scheduler.log_iter(
+                    "127.0.0.1:8265-app_id",
+                    role_name="dummy_role1",
+                    k=1,
+                    should_tail=True,
+                )
+                self.assertEqual(list(logs), [lines[1]])
+
+            with self._mock_client([]) as client:
+                client.get_job_logs.return_value = "".join(lines)
+                logs = self._scheduler.log_iter(
+                    "127.0.0.1:8265-app_id", role_name="dummy_role1", k=0
+                )
+                self.assertEqual(list(logs), [lines[0]])
+                logs = self._scheduler.log_iter(
+                    "127.0.0.1:8265-app_id", role_name="ray", regex="ba"
+                )
+                self.assertEqual(list(logs), lines[1:3])
+
+        def test_log_iter_streams(self) -> None:
+            with self.assertRaisesRegex(ValueError, "only supports COMBINED"):
+                self._scheduler.log_iter("127.0.0.1:8265-app_id", streams=Stream.STDERR)
+
+        def _schedule(self, workspace: Dict[str, str], cfg: RayOpts) -> str:
+            # schedule() deletes the working dir, so each run gets a new copy
+            working_dir = tempfile.mkdtemp()
+            for name, content in workspace.items():
+                with open(os.path.join(working_dir, name), "w") as f:
+                    f.write(content)
+            app = AppDef(
+                name="app",
+                roles=[Role(name="role", image=working_dir, num_replicas=2)],
+            )
+            return self._scheduler.schedule(self._scheduler._submit_dryrun(app, cfg))
+
+        def test_schedule_reuses_package(self) -> None:
+            uploaded = {}
+
+            def upload_package(uri: str, path: str, is_file: bool) -> None:
+                with zipfile.ZipFile(path) as zf:
+                    uploaded[uri] = sorted(zf.namelist())
+
+            cfg = RayOpts({"dashboard_address": "127.0.0.1:8265"})
+            with self._mock_client([]) as client:
+                client._package_exists.side_effect = lambda uri: uri in uploaded
+                client._upload_package.side_effect = upload_package
+                client.submit_job.return_value = "job"
+
+                self._schedule({"main.py": "print(1)"}, cfg)
+                self._schedule({"main.py": "print(1)"}, cfg)
+                self.assertEqual(len(uploaded), 1)
+                uri, files = next(iter(uploaded.items()))
+                self.assertRegex(uri, r"^gcs://_ray_pkg_[0-9a-f]{32}\.zip$")
+                self.assertEqual(files, ["main.py", "ray_common.py", "ray_driver.py"])
+
+                runtime_envs = [
+                    call[1]["runtime_env"] for call in client.submit_job.call_args_list
+                ]
+                self.assertEqual(
+                    [runtime_env["working_dir"] for runtime_env in runtime_envs],
+                    [uri, uri],
+                )
+                # the actors of each job are passed in the env
+                env_vars = runtime_envs[1]["env_vars"]
+                actors = ray_driver.load_actors(env_vars[TORCHX_RAY_ACTORS])
+                self.assertEqual(env_vars[TORCHX_RAY_PLACEMENT_GROUP_TIMEOUT], "100")
+                self.assertEqual([actor.name for actor in actors], ["role", "role"])
+
+                self._schedule({"main.py": "print(2)"}, cfg)
+                self.assertEqual(len(uploaded), 2)
+
+        def test_package_uri(self) -> None:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                main = os.path.join(tmpdir, "main.py")
+                with open(main, "w") as f:
+                    f.write("print(1)")
+                uri = _package_uri(tmpdir)
+                self.assertEqual(uri, _package_uri(tmpdir))
+
+                os.chmod(main, 0o755)
+                self.assertNotEqual(uri, _package_uri(tmpdir))
+
+                # the files ignored by git are not packaged
+                with open(os.path.join(tmpdir, ".gitignore"), "w") as f:
+                    f.write("*.log\n")
+                uri = _package_uri(tmpdir)
+                with open(os.path.join(tmpdir, "out.log"), "w") as f:
+                    f.write("log")
+                self.assertEqual(uri, _package_uri(tmpdir))
+
+                with tempfile.TemporaryDirectory() as outdir:
+                    package = os.path.join(outdir, "package.zip")
+                    _zip_package(tmpdir, package)
+                    with zipfile.ZipFile(package) as zf:
+                        self.assertEqual(
+                            sorted(zf.namelist()), [".gitignore", "main.py"]
+                        )
+
+        @patch("torchx.schedulers.ray_scheduler.ACTORS_ENV_MAX_SIZE", 0)
+        def test_schedule_large_actors(self) -> None:
+            cfg = RayOpts({"dashboard_address": "127.0.0.1:8265"})
+            with self._mock_client([]) as client:
+                client.submit_job.return_value = "job"
+                self._schedule({"main.py": "print(1)"}, cfg)
+
+                client._upload_package.assert_not_called()
+                runtime_env = client.submit_job.call_args[1]["runtime_env"]
+                self.assertNotIn(TORCHX_RAY_ACTORS, runtime_env["env_vars"])
+                self.assertFalse(runtime_env["working_dir"].startswith("gcs://"))
+
+        def test_placement_group_timeout(self) -> None:
+            req = self._scheduler._submit_dryrun(self._app_def, cfg={})
+            self.assertEqual(req.request.placement_group_timeout, 100)
+            req = self._scheduler._submit_dryrun(
+                self._app_def, cfg={"placement_group_timeout": 600}
+            )
+            self.assertEqual(req.request.placement_group_timeout, 600)
+
+        def test_driver_timings(self) -> None:
+            async def tail_job_logs(job_id: str) -> AsyncIterator[str]:
+                yield "Entering main loop\n"
+                yield 'TORCHX_RAY_TIMINGS {"placement_group_ready": 1.5,'
+                yield ' "first_exec": 2.0}\nworker output\n'
+                # the job keeps running
+                await asyncio.sleep(60)
+
+            with self._mock_client([]) as client:
+                client.tail_job_logs = tail_job_logs
+                self.assertEqual(
+                    self._scheduler.driver_timings("127.0.0.1:8265-app_id"),
+                    {"placement_group_ready": 1.5, "first_exec": 2.0},
+                )
+                client.get_job_logs.assert_not_called()
+
+        def test_driver_timings_not_logged(self) -> None:
+            async def tail_job_logs(job_id: str) -> AsyncIterator[str]:
+                yield "Waiting for minimum placement group to start.\n"
+                await asyncio.sleep(1)
+
+            with self._mock_client([]) as client, patch(
+                "torchx.schedulers.ray_scheduler.DRIVER_TIMINGS_IDLE_TIMEOUT", 0.1
+            ):
+                client.tail_job_logs = tail_job_logs
+                self.assertIsNone(
+                    self._scheduler.driver_timings("127.0.0.1:8265-app_id")
+                )
+
+            with self._mock_client([["done\n"]]):
+                self.assertIsNone(
+                    self._scheduler.driver_timings("127.0.0.1:8265-app_id")
+                )
+
+        @contextmanager
+        def _dashboard(
+            self, jobs: Dict[str, str]
+        ) -> Iterator[Tuple[str, Dict[str, int]]]:
+            """
+            Serves a stub Ray dashboard with the ``jobs`` (submission id to
+            status) on a local port. Yields its address and the number of
+            connections and version handshakes made to it.
+            """
+            counts = {"connections": 0, "handshakes": 0}
+            details = [
+                {
+                    "type": "SUBMISSION",
+                    "entrypoint": "python3 ray_driver.py",
+                    "submission_id": job_id,
+                    "status": status,
+                }
+                for job_id, status in jobs.items()
+            ]
+
+            class Handler(BaseHTTPRequestHandler):
+                protocol_version = "HTTP/1.1"
+
+                def setup(self) -> None:
+                    super().setup()
+                    counts["connections"] += 1
+
+                def do_GET(self) -> None:
+                    if self.path == "/api/version":
+                        counts["handshakes"] += 1
+                        body: object = {"ray_version": ray.__version__}
+                    elif self.path == "/api/jobs/":
+                        body = details
+                    else:
+                        job_id = self.path[len("/api/jobs/") :]
+                        body = next(d for d in details if d["submission_id"] == job_id)
+                    data = json.dumps(body).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+
+                def log_message(self, *args: object) -> None:
+                    pass
+
+            server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                yield f"127.0.0.1:{server.server_address[1]}", counts
+            finally:
+                server.shutdown()
+                server.server_close()
+
+        def test_client_reused(self) -> None:
+            with self._dashboard({"job1": "RUNNING", "job2": "SUCCEEDED"}) as (
+                addr,
+                counts,
+            ):
+                for _ in range(5):
+                    desc = self._scheduler.describe(f"{addr}-job1")
+                    assert desc is not None
+                    self.assertEqual(desc.state, AppState.RUNNING)
+                # the client checks the dashboard version twice on creation
+                self.assertEqual(counts["handshakes"], 2)
+                self.assertEqual(counts["connections"], 1)
+
+        @patch("torchx.schedulers.ray_scheduler.CLIENT_HEALTH_CHECK_INTERVAL", -1)
+        def test_client_health_check(self) -> None:
+            with self._dashboard({"job1": "RUNNING"}) as (addr, counts):
+                for _ in range(3):
+                    self._scheduler.describe(f"{addr}-job1")
+                # every reuse after the first call pings the dashboard
+                self.assertEqual(counts["handshakes"], 4)
+                self.assertEqual(counts["connections"], 1)
+
+                client = self._scheduler._clients[f"http://{addr}"]
+                with patch.object(
+                    client._session,
+                    "request",
+                    side_effect=requests.exceptions.ConnectionError(),
+                ):
+                    self.assertFalse(client.check_health())
+
+                # the unhealthy client is replaced
+                self._scheduler.describe(f"{addr}-job1")
+                self.assertIsNot(self._scheduler._clients[f"http://{addr}"], client)
+                self.assertEqual(counts["handshakes"], 6)
+                self.assertEqual(counts["connections"], 2)
+
+        @patch("torchx.schedulers.ray_scheduler.CLIENT_HEALTH_CHECK_INTERVAL", -1)
+        def test_client_health_check_unlocked(self) -> None:
+            with self._dashboard({"job1": "RUNNING"}) as (addr, _):
+                client = self._scheduler._get_client(f"http://{addr}")
+                check_health = client.check_health
+
+                def check_health_unlocked() -> bool:
+                    # the other dashboards stay reachable while pinging
+                    self.assertFalse(self._scheduler._clients_lock.locked())
+                    return check_health()
+
+                with patch.object(
+                    client, "check_health", side_effect=check_health_unlocked
+                ) as mock_check_health:
+                    self.assertIs(self._scheduler._get_client(f"http://{addr}"), client)
+                    mock_check_health.assert_called_once()
+
+        def test_client_verify(self) -> None:
+            with self._dashboard({"job1": "RUNNING"}) as (addr, _):
+                client = self._scheduler._get_client(f"http://{addr}")
+                client._verify = False
+                with patch.object(
+                    client._session, "request", wraps=client._session.request
+                ) as request:
+                    client.get_job_status("job1")
+                    self.assertFalse(request.call_args[1]["verify"])
+
+        def test_describe_many(self) -> None:
+            with self._dashboard({"job1": "RUNNING", "job2": "SUCCEEDED"}) as (
+                addr,
+                counts,
+            ):
+                app_ids = [f"{addr}-job1", f"{addr}-job2", f"{addr}-job3"]
+                with patch.object(
+                    JobSubmissionClient,
+                    "list_jobs",
+                    autospec=True,
+                    side_effect=JobSubmissionClient.list_jobs,
+                ) as list_jobs:
+                    descs = self._scheduler.describe_many(app_ids)
+                    self.assertEqual(list_jobs.call_count, 1)
+                states = {
+                    app_id: desc.state if desc else None
+                    for app_id, desc in descs.items()
+                }
+                self.assertEqual(
+                    states,
+                    {
+                        app_ids[0]: AppState.RUNNING,
+                        app_ids[1]: AppState.SUCCEEDED,
+                        app_ids[2]: None,
+                    },
+                )
+                self.assertEqual(counts["handshakes"], 2)
+
     class RayClusterSetup:
         _instance = None  # pyre-ignore
         _cluster = None  # pyre-ignore
@@ -575,6 +981,143 @@ if has_ray():
 
             ray_cluster_setup.decrement_reference()
 
+        @contextmanager
+        def _fake_actors(
+            self, addresses: List[str], errors: List[Optional[Exception]]
+        ) -> Iterator[List[Any]]:
+            """
+            Replaces the command actors and ``ray.wait``/``ray.get`` with fakes.
+            The i-th created actor runs on ``addresses[i]`` and its command
+            raises ``errors[i]`` if set.
+            """
+            created = []
+
+            class Ref:
+                def __init__(self, value: object) -> None:
+                    self.value = value
+
+            def remote(cmd: List[str], env: Dict[str, str], name: str) -> Any:
+                i = len(created)
+                actor = MagicMock()
+                actor._actor_id.hex.return_value = f"actor{i}"
+                actor.schedule.remote.side_effect = lambda actor_id: Ref(
+                    ray_driver.CommandActorScheduled(actor_id)
+                )
+                actor.get_actor_address_and_port.remote.return_value = Ref(
+                    (addresses[i], 29500)
+                )
+                actor.exec_module.remote.side_effect = lambda addr, port, actor_id: Ref(
+                    errors[i] or ray_driver.TaskCompleted(actor_id)
+                )
+                created.append(actor)
+                return actor
+
+            def get(ref: Ref) -> object:
+                if isinstance(ref.value, Exception):
+                    raise ref.value
+                return ref.value
+
+            with patch.object(ray_driver, "CommandActor") as command_actor, patch(
+                "ray.wait",
+                side_effect=lambda refs, num_returns=1, timeout=None: (
+                    refs[:num_returns],
+                    refs[num_returns:],
+                ),
+            ), patch("ray.get", side_effect=get), patch("ray.kill"):
+                command_actor.options.return_value.remote.side_effect = remote
+                yield created
+
+        def test_ray_driver_recovery(self) -> None:
+            actor = RayActor(name="trainer", command=["python"], max_retries=1)
+            driver = ray_driver.RayDriver([actor])
+            driver.placement_groups = [MagicMock()]
+            stdout = io.StringIO()
+            with self._fake_actors(
+                ["10.0.0.1", "10.0.0.2"], [RayActorError(), None]
+            ) as created, redirect_stdout(stdout):
+                driver.place_command_actors()
+                driver.run()
+
+            self.assertEqual(len(created), 2)
+            self.assertEqual(driver.metrics.restarts, {"trainer/0": 1})
+            self.assertEqual(len(driver.metrics.placement_latencies["trainer/0"]), 2)
+            # the recreated actor is elected as rank 0
+            self.assertEqual(driver.master_node_id, "actor1")
+            self.assertEqual(driver.rank_0_address, "10.0.0.2")
+            self.assertEqual(driver.command_actors_count, 0)
+            self.assertEqual(driver.actor_info_of_id, {})
+            self.assertEqual(
+                list(driver.timings.keys()),
+                ["actor_scheduled", "rank0_elected", "first_exec"],
+            )
+            # printed once, when the command is first executed
+            self.assertEqual(
+                stdout.getvalue(), f"TORCHX_RAY_TIMINGS {json.dumps(driver.timings)}\n"
+            )
+
+        def test_ray_driver_recovery_rank_0(self) -> None:
+            actors = [
+                RayActor(
+                    name="trainer", replica_id=i, command=["python"], max_retries=1
+                )
+                for i in range(2)
+            ]
+            driver = ray_driver.RayDriver(actors)
+            driver.placement_groups = [MagicMock()]
+            with self._fake_actors(
+                ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"],
+                [RayActorError(), None, None, None],
+            ) as created:
+                driver.place_command_actors()
+                driver.run()
+                # trainer/1 was running against the dead rank 0 so it is
+                # killed and recreated along with trainer/0
+                ray.kill.assert_called_once_with(created[1])
+
+            self.assertEqual(len(created), 4)
+            self.assertEqual(driver.metrics.restarts, {"trainer/0": 1})
+            self.assertEqual(driver.master_node_id, "actor2")
+            created[1].exec_module.remote.assert_called_once_with(
+                "10.0.0.1", 29500, "actor1"
+            )
+            created[3].exec_module.remote.assert_called_once_with(
+                "10.0.0.3", 29500, "actor3"
+            )
+            self.assertEqual(driver.command_actors_count, 0)
+            self.assertEqual(driver.actor_info_of_id, {})
+
+        def test_ray_driver_recovery_max_retries(self) -> None:
+            actors = [
+                RayActor(name="trainer", replica_id=i, command=["python"])
+                for i in range(2)
+            ]
+            driver = ray_driver.RayDriver(actors)
+            driver.placement_groups = [MagicMock()]
+            with self._fake_actors(
+                ["10.0.0.1", "10.0.0.2"], [RayActorError(), None]
+            ), self.assertRaisesRegex(RuntimeError, "trainer/0 died after 0 restarts"):
+                driver.place_command_actors()
+                driver.run()
+            self.assertEqual(driver.metrics.restarts, {})
+
+        def test_ray_driver_placement_groups(self) -> None:
+            actors = [
+                RayActor(
+                    name="trainer", replica_id=i, command=["python"], min_replicas=1
+                )
+                for i in range(3)
+            ]
+            driver = ray_driver.RayDriver(actors, placement_group_timeout=5)
+            with patch.object(ray_driver, "create_placement_group_async") as create:
+                driver.init_placement_groups()
+            # all the groups are created before waiting for the first one
+            self.assertEqual(
+                [call[0][0] for call in create.call_args_list],
+                [actors[0:1], actors[1:2], actors[2:3]],
+            )
+            driver.placement_groups[0].wait.assert_called_once_with(5)
+            self.assertEqual(list(driver.timings.keys()), ["placement_group_ready"])
+
     class RayIntegrationTest(TestCase):
         def test_ray_cluster(self) -> None:
             ray_cluster_setup = RayClusterSetup()
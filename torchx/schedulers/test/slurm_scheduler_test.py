@@ -5,27 +5,38 @@
 # LICENSE file in the root directory of this source tree.
 
 import datetime
+import io
 import os
 import subprocess
 import tempfile
+import time
 import unittest
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, List
 from unittest.mock import call, MagicMock, patch
 
 import torchx
 from torchx import specs
 from torchx.schedulers.api import DescribeAppResponse, ListAppResponse, Stream
+from torchx.schedulers import slurm_scheduler
 from torchx.schedulers.slurm_scheduler import (
-    _get_job_dirs,
+    _cluster_name,
+    _get_job_dir,
+    _Partition,
     _save_job_dir,
     create_scheduler,
+    LIST_WINDOW_OVERLAP_SECONDS,
+    SACCT_TIME_FORMAT,
+    SLURM_JOB_DIRS,
+    SLURM_JOB_DIRS_DB,
+    SLURM_JOB_DIRS_RETENTION_DAYS,
     SlurmBatchRequest,
     SlurmOpts,
     SlurmReplicaRequest,
     SlurmScheduler,
 )
 from torchx.specs import AppState
+from torchx.util.types import none_throws
 
 
 @contextmanager
@@ -39,6 +50,21 @@ def tmp_cwd() -> Generator[None, None, None]:
             os.chdir(cwd)
 
 
+def sacct_popen(*outputs: str, returncode: int = 0) -> List[MagicMock]:
+    """
+    Returns mocks of the ``subprocess.Popen`` calls of ``sacct`` that output
+    ``outputs``.
+    """
+    procs = []
+    for output in outputs:
+        proc = MagicMock()
+        proc.__enter__.return_value = proc
+        proc.stdout = io.StringIO(output)
+        proc.returncode = returncode
+        procs.append(proc)
+    return procs
+
+
 def simple_role() -> specs.Role:
     return specs.Role(
         name="foo",
@@ -247,11 +273,11 @@ fi
         )
 
     @patch(
-        "torchx.schedulers.slurm_scheduler.SlurmScheduler._partition_memmb",
-        return_value=2048,
+        "torchx.schedulers.slurm_scheduler.SlurmScheduler._get_partitions",
+        return_value={},
     )
     @patch("subprocess.run")
-    def test_run_multi_role(self, run: MagicMock, partition_memmb: MagicMock) -> None:
+    def test_run_multi_role(self, run: MagicMock, get_partitions: MagicMock) -> None:
         run.return_value.stdout = b"1234"
         scheduler = create_scheduler("foo")
         app = specs.AppDef(
@@ -397,22 +423,129 @@ JobID|JobName|Partition|Account|AllocCPUS|State|ExitCode
         self.assertEqual(out.state, specs.AppState.RUNNING)
 
     @patch("subprocess.run")
-    def test_list(self, run: MagicMock) -> None:
-        run.return_value.stdout = b"""{\n   "meta": {\n   },\n   "errors": [\n   ],\n   "jobs": [
-\n     {\n       "account": null,\n       "job_id": 123,\n       "name": "main-0",
-\n       "state": {\n   "current": "COMPLETED",\n   "reason": "None"},
-\n       "working_directory": "\\/home\\/ec2-user\\/tests\\/runner-1234\\/job"\n     },
-\n     {\n       "account": null,\n       "job_id": 124,\n       "name": "main-0",
-\n       "state": {\n   "current": "CANCELLED",\n   "reason": "None"},
-\n       "working_directory": "\\/home\\/ec2-user\\/tests\\/runner-1234\\/job"\n     }\n   ]\n }"""
+    def test_describe_many(self, run: MagicMock) -> None:
+        run.return_value.stdout = b"""
+JobID|JobName|Partition|Account|AllocCPUS|State|ExitCode
+1853+0|echo-0|compute||1|COMPLETED|0:0
+1853+0.batch|batch|||1|COMPLETED|0:0
+1853+0.0|echo|||1|COMPLETED|0:0
+1853+1|echo-1|compute||1|COMPLETED|0:0
+1853+1.0|echo|||1|COMPLETED|0:0
+1902|sh-0|compute||1|FAILED|2:0
+1902.batch|batch|||1|FAILED|2:0
+1902.0|sh|||1|FAILED|2:0
+""".strip()
+
         scheduler = create_scheduler("foo")
+        out = scheduler.describe_many(["1853", "1902", "1999"])
+
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(
+            run.call_args,
+            call(
+                ["sacct", "--parsable2", "-j", "1853,1902,1999"],
+                stdout=subprocess.PIPE,
+                check=True,
+            ),
+        )
+        self.assertEqual(list(out.keys()), ["1853", "1902", "1999"])
+        self.assertEqual(none_throws(out["1853"]).state, specs.AppState.SUCCEEDED)
+        self.assertEqual(
+            none_throws(out["1853"]).roles,
+            [specs.Role(name="echo", image="", num_replicas=2)],
+        )
+        self.assertEqual(none_throws(out["1902"]).state, specs.AppState.FAILED)
+        self.assertIsNone(out["1999"])
+
+    @patch("subprocess.Popen")
+    def test_list(self, popen: MagicMock) -> None:
+        popen.side_effect = sacct_popen(
+            "123|COMPLETED\n124|CANCELLED by 1000\n125+0|RUNNING\n125+1|PENDING\n"
+        )
         expected_apps = [
             ListAppResponse(app_id="123", state=AppState.SUCCEEDED),
             ListAppResponse(app_id="124", state=AppState.CANCELLED),
+            ListAppResponse(app_id="125", state=AppState.PENDING),
         ]
-        apps = scheduler.list()
-        self.assertIsNotNone(apps)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            scheduler = SlurmScheduler(
+                "foo", list_cache_path=os.path.join(tmpdir, "cache.json")
+            )
+            apps = scheduler.list()
         self.assertEqual(apps, expected_apps)
+        (cmd,), _ = popen.call_args
+        self.assertEqual(
+            cmd,
+            [
+                "sacct",
+                "--parsable2",
+                "--noheader",
+                "--allocations",
+                "--format=JobID,State",
+                "--starttime=1970-01-01T00:00:01",
+            ],
+        )
+
+    @patch("subprocess.Popen")
+    def test_list_cached(self, popen: MagicMock) -> None:
+        popen.side_effect = sacct_popen(
+            "123|COMPLETED\n124|RUNNING\n",
+            "124|FAILED\n125|PENDING\n",
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache.json")
+            now = time.time()
+            with patch("torchx.schedulers.slurm_scheduler.time.time", return_value=now):
+                apps = SlurmScheduler("foo", list_cache_path=path).list()
+            self.assertEqual(
+                apps,
+                [
+                    ListAppResponse(app_id="123", state=AppState.SUCCEEDED),
+                    ListAppResponse(app_id="124", state=AppState.RUNNING),
+                ],
+            )
+
+            # a new scheduler only queries the jobs active since the previous
+            # call, finished jobs are served from the cache
+            apps = SlurmScheduler("foo", list_cache_path=path).list()
+            self.assertEqual(
+                apps,
+                [
+                    ListAppResponse(app_id="123", state=AppState.SUCCEEDED),
+                    ListAppResponse(app_id="124", state=AppState.FAILED),
+                    ListAppResponse(app_id="125", state=AppState.PENDING),
+                ],
+            )
+        (cmd,), _ = popen.call_args
+        since = datetime.datetime.fromtimestamp(now - LIST_WINDOW_OVERLAP_SECONDS)
+        self.assertEqual(cmd[-1], f"--starttime={since.strftime(SACCT_TIME_FORMAT)}")
+
+    @patch("subprocess.Popen")
+    def test_list_filters(self, popen: MagicMock) -> None:
+        popen.side_effect = sacct_popen("123|RUNNING\n")
+        scheduler = create_scheduler("foo")
+        apps = scheduler.list(
+            since=datetime.datetime(2023, 1, 2, 3, 4, 5),
+            until=datetime.datetime(2023, 1, 3),
+            states=[AppState.RUNNING],
+        )
+        self.assertEqual(apps, [ListAppResponse(app_id="123", state=AppState.RUNNING)])
+        (cmd,), _ = popen.call_args
+        self.assertEqual(
+            cmd[-3:],
+            [
+                "--starttime=2023-01-02T03:04:05",
+                "--endtime=2023-01-03T00:00:00",
+                "--state=RUNNING",
+            ],
+        )
+
+    @patch("subprocess.Popen")
+    def test_list_failure(self, popen: MagicMock) -> None:
+        popen.side_effect = sacct_popen("", returncode=1)
+        scheduler = SlurmScheduler("foo")
+        with self.assertRaises(subprocess.CalledProcessError):
+            scheduler.list()
 
     @patch("subprocess.run")
     def test_log_iter(self, run: MagicMock) -> None:
@@ -465,25 +598,94 @@ JobID|JobName|Partition|Account|AllocCPUS|State|ExitCode
         with self.assertRaises(ValueError):
             scheduler.log_iter("54", "echo", 1, streams=Stream.COMBINED)
 
+    def test_job_dirs(self) -> None:
+        with tmp_cwd():
+            self.assertIsNone(_get_job_dir("1"))
+            # nothing is created until a job dir is saved
+            self.assertFalse(os.path.exists(SLURM_JOB_DIRS_DB))
+
+            _save_job_dir("1", "dir1")
+            _save_job_dir("2", "dir2")
+            _save_job_dir("1", "dir3")
+            self.assertEqual(_get_job_dir("1"), "dir3")
+            self.assertEqual(_get_job_dir("2"), "dir2")
+            self.assertIsNone(_get_job_dir("3"))
+
+            # job dirs older than the retention are pruned on save
+            now = time.time()
+            with patch(
+                "torchx.schedulers.slurm_scheduler.time.time",
+                return_value=now + (SLURM_JOB_DIRS_RETENTION_DAYS + 1) * 24 * 60 * 60,
+            ):
+                _save_job_dir("4", "dir4")
+            self.assertIsNone(_get_job_dir("1"))
+            self.assertEqual(_get_job_dir("4"), "dir4")
+
+    def test_job_dirs_migration(self) -> None:
+        with tmp_cwd():
+            with open(SLURM_JOB_DIRS, "wt") as f:
+                f.write("1 = dir1\nbad line\n2 = dir2\n1 = dir3\n3 =")
+            self.assertEqual(_get_job_dir("1"), "dir3")
+            self.assertEqual(_get_job_dir("2"), "dir2")
+            self.assertIsNone(_get_job_dir("3"))
+            self.assertFalse(os.path.exists(SLURM_JOB_DIRS))
+            self.assertTrue(os.path.exists(f"{SLURM_JOB_DIRS}.migrated"))
+
+            # entries appended to the flat file (e.g. by older versions of
+            # torchx) are migrated on next use
+            with open(SLURM_JOB_DIRS, "wt") as f:
+                f.write("2 = dir4\n")
+            _save_job_dir("5", "dir5")
+            self.assertEqual(_get_job_dir("2"), "dir4")
+            self.assertEqual(_get_job_dir("5"), "dir5")
+            self.assertFalse(os.path.exists(SLURM_JOB_DIRS))
+
     @patch("subprocess.run")
     def test_dryrun_nomem(self, run: MagicMock) -> None:
         run.return_value.returncode = 0
-
-        scheduler = create_scheduler("foo")
         app = mem_app()
 
-        run.return_value.stdout = b"PARTITION,MEMORY\nfoo*,5000"
-        info = scheduler.submit_dryrun(app, cfg={})
+        run.return_value.stdout = b"PARTITION|MEMORY\nfoo*|5000"
+        info = SlurmScheduler("foo").submit_dryrun(app, cfg={})
         self.assertIn("mem", info.request.replicas["foo-0"].sbatch_opts)
 
-        run.return_value.stdout = b"PARTITION,MEMORY\nfoo*,1"
-        info = scheduler.submit_dryrun(app, cfg={})
+        run.return_value.stdout = b"PARTITION|MEMORY\nfoo*|1"
+        info = SlurmScheduler("foo").submit_dryrun(app, cfg={})
         self.assertNotIn("mem", info.request.replicas["foo-0"].sbatch_opts)
 
         run.return_value.stdout = b""
-        info = scheduler.submit_dryrun(app, cfg={})
+        info = SlurmScheduler("foo").submit_dryrun(app, cfg={})
         self.assertIn("mem", info.request.replicas["foo-0"].sbatch_opts)
 
+    @patch("subprocess.run")
+    def test_dryrun_partition_resources(self, run: MagicMock) -> None:
+        run.return_value.returncode = 0
+        run.return_value.stdout = b"""PARTITION|MEMORY|CPUS|GRES|NODES
+compute*|2000|8|gpu:a100:2(S:0-1)|1
+"""
+        scheduler = SlurmScheduler("foo")
+        app = mem_app()
+        app.roles[0].num_replicas = 1
+        app.roles[0].resource = specs.Resource(cpu=8, gpu=2, memMB=2000)
+        scheduler.submit_dryrun(app, cfg={})
+
+        for resource in [
+            specs.Resource(cpu=16, gpu=2, memMB=2000),
+            specs.Resource(cpu=8, gpu=4, memMB=2000),
+            specs.Resource(cpu=8, gpu=2, memMB=4000),
+        ]:
+            app.roles[0].resource = resource
+            with self.assertRaisesRegex(ValueError, "partition `compute`"):
+                scheduler.submit_dryrun(app, cfg={})
+
+        # the replicas may share the nodes of the partition
+        app.roles[0].resource = specs.Resource(cpu=1, gpu=0, memMB=1000)
+        app.roles[0].num_replicas = 2
+        scheduler.submit_dryrun(app, cfg={})
+
+        # sinfo is only run once per scheduler
+        self.assertEqual(run.call_count, 1)
+
     def test_dryrun_comment(self) -> None:
         scheduler = create_scheduler("foo")
         app = simple_app()
@@ -518,12 +720,12 @@ JobID|JobName|Partition|Account|AllocCPUS|State|ExitCode
         )
 
     @patch(
-        "torchx.schedulers.slurm_scheduler.SlurmScheduler._partition_memmb",
-        return_value=2048,
+        "torchx.schedulers.slurm_scheduler.SlurmScheduler._get_partitions",
+        return_value={},
     )
     @patch("subprocess.run")
     def test_run_workspace_job_dir(
-        self, run: MagicMock, partition_memmb: MagicMock
+        self, run: MagicMock, get_partitions: MagicMock
     ) -> None:
         with tmp_cwd():
             run.return_value.stdout = b"1234"
@@ -535,7 +737,7 @@ JobID|JobName|Partition|Account|AllocCPUS|State|ExitCode
                 },
                 workspace=".",
             )
-            self.assertIn(("1234", "dir"), _get_job_dirs().items())
+            self.assertEqual(_get_job_dir("1234"), "dir")
 
         self.assertEqual(run.call_count, 1)
         args, kwargs = run.call_args
@@ -551,25 +753,95 @@ JobID|JobName|Partition|Account|AllocCPUS|State|ExitCode
         )
 
     @patch("subprocess.run")
-    def test_partition_memmb(self, run: MagicMock) -> None:
-        scheduler = create_scheduler("foo")
-
+    def test_get_partition(self, run: MagicMock) -> None:
         ret = run.return_value
         ret.returncode = 0
         ret.stdout = b"""
-PARTITION,MEMORY
-scavenge,500000+
-compute*,1
+PARTITION|MEMORY|CPUS|GRES|NODES
+scavenge|500000+|96|gpu:8,mps:400|4
+scavenge|250000|48|gpu:4|10
+compute*|1|2|(null)|1
 """
-        self.assertEqual(scheduler._partition_memmb(None), 1)
-        self.assertEqual(scheduler._partition_memmb("compute"), 1)
-        self.assertEqual(scheduler._partition_memmb("nonexistant"), None)
-        self.assertEqual(scheduler._partition_memmb("scavenge"), 500000)
+        scheduler = SlurmScheduler("foo")
+        self.assertEqual(
+            scheduler._get_partition(None),
+            _Partition(name="compute", default=True, memMB=1, cpus=2),
+        )
+        self.assertEqual(
+            scheduler._get_partition("scavenge"),
+            _Partition(name="scavenge", memMB=500000, cpus=96, gpus=8),
+        )
+        self.assertIsNone(scheduler._get_partition("nonexistant"))
 
         ret.stdout = b"""
-PARTITION,MEMORY
+PARTITION|MEMORY|CPUS|GRES|NODES
+"""
+        self.assertIsNone(SlurmScheduler("foo")._get_partition(None))
+
+        ret.returncode = 1
+        self.assertIsNone(SlurmScheduler("foo")._get_partition(None))
+
+        run.side_effect = FileNotFoundError()
+        self.assertIsNone(SlurmScheduler("foo")._get_partition(None))
+
+    @patch.dict(os.environ, {"SLURM_CLUSTER_NAME": "foo"})
+    @patch("subprocess.run")
+    def test_partition_cache(self, run: MagicMock) -> None:
+        run.return_value.returncode = 0
+        run.return_value.stdout = b"PARTITION|MEMORY|NODES\ncompute*|2000|1"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "partitions.json")
+            scheduler = SlurmScheduler("foo", partition_cache_path=path)
+            self.assertEqual(none_throws(scheduler._get_partition(None)).memMB, 2000)
+            self.assertEqual(run.call_count, 1)
+
+            # loaded from the cache by new schedulers
+            scheduler = SlurmScheduler("foo", partition_cache_path=path)
+            self.assertEqual(none_throws(scheduler._get_partition(None)).memMB, 2000)
+            self.assertEqual(run.call_count, 1)
+
+            # stale partitions are served while being refreshed in the background
+            run.return_value.stdout = b"PARTITION|MEMORY|NODES\ncompute*|4000|1"
+            with patch.object(slurm_scheduler, "PARTITION_CACHE_TTL_SECONDS", -1):
+                scheduler = SlurmScheduler("foo", partition_cache_path=path)
+                self.assertEqual(
+                    none_throws(scheduler._get_partition(None)).memMB, 2000
+                )
+                none_throws(scheduler._partitions_refresh).join()
+            self.assertEqual(none_throws(scheduler._get_partition(None)).memMB, 4000)
+            self.assertEqual(run.call_count, 2)
+
+            scheduler = SlurmScheduler("foo", partition_cache_path=path)
+            self.assertEqual(none_throws(scheduler._get_partition(None)).memMB, 4000)
+
+            # the partitions of other clusters are cached separately
+            run.return_value.stdout = b"PARTITION|MEMORY|NODES\ncompute*|8000|1"
+            with patch.dict(os.environ, {"SLURM_CLUSTER_NAME": "bar"}):
+                scheduler = SlurmScheduler("foo", partition_cache_path=path)
+                self.assertEqual(
+                    none_throws(scheduler._get_partition(None)).memMB, 8000
+                )
+            self.assertEqual(run.call_count, 3)
+            scheduler = SlurmScheduler("foo", partition_cache_path=path)
+            self.assertEqual(none_throws(scheduler._get_partition(None)).memMB, 4000)
+
+    @patch("subprocess.run")
+    def test_cluster_name(self, run: MagicMock) -> None:
+        run.return_value.returncode = 0
+        run.return_value.stdout = b"""
+Configuration data as of 2022-10-18T10:00:00
+AccountingStorageBackupHost = (null)
+ClusterName             = bubblegum
 """
-        self.assertEqual(scheduler._partition_memmb(None), None)
+        with patch.dict(os.environ, {"SLURM_CLUSTER_NAME": "foo"}):
+            self.assertEqual("foo", _cluster_name())
+        with patch.dict(os.environ):
+            os.environ.pop("SLURM_CLUSTER_NAME", None)
+            self.assertEqual("bubblegum", _cluster_name())
+            run.return_value.returncode = 1
+            self.assertEqual("", _cluster_name())
+            run.side_effect = FileNotFoundError()
+            self.assertEqual("", _cluster_name())
 
     def _run_req(
         self, req: SlurmBatchRequest, srun_exit: int, scontrol_exit: int
@@ -9,9 +9,12 @@ import io
 import os.path
 import shutil
 import tempfile
+import threading
+import time
 import unittest
+from unittest.mock import patch
 
-from torchx.schedulers.streams import Tee
+from torchx.schedulers.streams import FileWatcher, Tee
 
 
 class TeeTest(unittest.TestCase):
@@ -39,3 +42,66 @@ class TeeTest(unittest.TestCase):
 
         with open(ab_path, "rb") as f:
             self.assertCountEqual(f.read(), b"1234")
+
+
+class FileWatcherTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.test_dir = tempfile.mkdtemp(prefix="torchx_file_watcher_test")
+        self.path = os.path.join(self.test_dir, "a")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.test_dir)
+
+    def test_watch_wakes_on_write(self) -> None:
+        watcher = FileWatcher()
+        watch = watcher.watch(self.path)
+        try:
+            if watch.poll:
+                self.skipTest("inotify is not available")
+            # nothing written yet
+            self.assertFalse(watch.wait(0.05))
+
+            def writer() -> None:
+                with open(self.path, "wb") as f:
+                    f.write(b"foo")
+
+            start = time.monotonic()
+            t = threading.Thread(target=writer)
+            t.start()
+            self.assertTrue(watch.wait(10))
+            self.assertLess(time.monotonic() - start, 5)
+            t.join()
+        finally:
+            watch.close()
+        self.assertEqual({}, watcher._watches)
+
+    def test_watch_ignores_other_files(self) -> None:
+        watcher = FileWatcher()
+        watch = watcher.watch(self.path)
+        try:
+            if watch.poll:
+                self.skipTest("inotify is not available")
+            with open(os.path.join(self.test_dir, "b"), "wb") as f:
+                f.write(b"foo")
+            self.assertFalse(watch.wait(0.2))
+        finally:
+            watch.close()
+
+    def test_watch_missing_dir_polls(self) -> None:
+        watcher = FileWatcher(poll_interval=0.01)
+        watch = watcher.watch(os.path.join(self.test_dir, "missing", "a"))
+        self.assertTrue(watch.poll)
+        self.assertTrue(watch.wait(10))
+        watch.close()
+
+    def test_notify(self) -> None:
+        watch = FileWatcher().watch(self.path)
+        watch.notify()
+        self.assertTrue(watch.wait(0))
+        watch.close()
+
+    def test_network_fs_polls(self) -> None:
+        with patch("torchx.schedulers.streams._mount_fs_type", return_value="nfs4"):
+            watch = FileWatcher().watch(self.path)
+        self.assertTrue(watch.poll)
+        watch.close()
@@ -17,6 +17,7 @@ import torchx.specs.finder as finder
 from importlib_metadata import EntryPoints
 from torchx.runner import get_runner
 from torchx.runtime.tracking import FsspecResultTracker
+from torchx.schedulers.local_app_store import ENV_TORCHX_LOCAL_APP_STORE
 from torchx.specs.api import AppDef, AppState, Role
 from torchx.specs.finder import (
     _load_components,
@@ -33,6 +34,23 @@ from torchx.util.types import none_throws
 _METADATA_EPS: str = "torchx.util.entrypoints.metadata.entry_points"
 
 
+_app_store_dir: str = ""
+
+
+def setUpModule() -> None:
+    # keep the apps launched by the tests out of the user's app store
+    global _app_store_dir
+    _app_store_dir = tempfile.mkdtemp(prefix="local_app_store_")
+    os.environ[ENV_TORCHX_LOCAL_APP_STORE] = os.path.join(
+        _app_store_dir, "local_apps.db"
+    )
+
+
+def tearDownModule() -> None:
+    os.environ.pop(ENV_TORCHX_LOCAL_APP_STORE, None)
+    shutil.rmtree(_app_store_dir, ignore_errors=True)
+
+
 def _test_component(name: str, role_name: str = "worker") -> AppDef:
     """
     Test component
@@ -258,6 +276,7 @@ class GetBuiltinSourceTest(unittest.TestCase):
             f.write(echo_src)
 
         runner = get_runner()
+        self.addCleanup(runner.close)
         app_handle = runner.run_component(
             scheduler="local_cwd",
             component=f"{str(echo_copy)}:echo",
@@ -279,6 +298,7 @@ class GetBuiltinSourceTest(unittest.TestCase):
             f.write(booth_src)
 
         runner = get_runner()
+        self.addCleanup(runner.close)
 
         trial_idx = 0
         tracker_base = str(self.test_dir / "tracking")
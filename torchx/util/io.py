@@ -4,12 +4,18 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import json
+import logging
+import os
 from os import path
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 
 from torchx.util import entrypoints
 
+log: logging.Logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 COMPONENTS_DIR: Path = Path("torchx/components")
 
@@ -53,3 +59,36 @@ def read_conf_file(conf_file: str) -> str:
             f"{conf_file} does not exist and is not a builtin."
             " For a list of available builtins run `torchx builtins`"
         )
+
+
+def load_json(path: str, parse: Callable[[Any], T], what: str) -> Optional[T]:
+    """
+    Returns ``parse`` applied to the JSON object stored in ``path``. Returns
+    ``None`` if the file does not exist or is invalid (logging a warning that
+    names ``what`` the file is).
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return parse(json.load(f))
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+        log.warning(f"Ignoring invalid {what}: {path}: {e}")
+        return None
+
+
+def save_json(path: str, obj: object, what: str) -> None:
+    """
+    Writes ``obj`` as JSON to ``path``, creating the parent dirs if needed.
+    The file is replaced atomically so that concurrent readers never see a
+    partial file. Failures are logged as a warning that names ``what`` the
+    file is since the files written this way are caches that can be rebuilt.
+    """
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(obj, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log.warning(f"Unable to save the {what}: {path}: {e}")
@@ -0,0 +1,41 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from torchx.util.cache import TTLCache
+
+
+class TTLCacheTest(unittest.TestCase):
+    @patch("torchx.util.cache.time.monotonic")
+    def test_expiry(self, monotonic: MagicMock) -> None:
+        monotonic.return_value = 100
+        cache = TTLCache(ttl=10)
+        cache.put("foo", 1)
+        self.assertEqual(1, cache.get("foo"))
+
+        monotonic.return_value = 109
+        self.assertEqual(1, cache.get("foo"))
+        # putting again extends the expiry
+        cache.put("bar", 2)
+
+        monotonic.return_value = 110
+        self.assertIsNone(cache.get("foo"))
+        self.assertEqual(1, len(cache))
+        self.assertEqual(2, cache.get("bar"))
+
+    def test_maxsize(self) -> None:
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.put("foo", 1)
+        cache.put("bar", 2)
+        cache.put("foo", 3)
+        cache.put("baz", 4)
+        # bar is the least recently put
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("bar"))
+        self.assertEqual(3, cache.get("foo"))
+        self.assertEqual(4, cache.get("baz"))
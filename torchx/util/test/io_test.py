@@ -0,0 +1,42 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import tempfile
+import unittest
+
+from torchx.util.io import load_json, save_json
+
+
+class JsonTest(unittest.TestCase):
+    def test_save_load(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "nested", "cache.json")
+            self.assertIsNone(load_json(path, dict, "cache"))
+
+            save_json(path, {"foo": 1}, "cache")
+            self.assertEqual({"foo": 1}, load_json(path, dict, "cache"))
+            self.assertEqual(["cache.json"], os.listdir(os.path.dirname(path)))
+
+    def test_load_invalid(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache.json")
+            with open(path, "w") as f:
+                f.write("{invalid")
+            with self.assertLogs("torchx.util.io", "WARNING"):
+                self.assertIsNone(load_json(path, dict, "cache"))
+
+            save_json(path, [1, 2], "cache")
+            with self.assertLogs("torchx.util.io", "WARNING"):
+                self.assertIsNone(load_json(path, lambda c: c["foo"], "cache"))
+
+    def test_save_error(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # the parent "dir" is a file
+            parent = os.path.join(tmpdir, "file")
+            open(parent, "w").close()
+            with self.assertLogs("torchx.util.io", "WARNING"):
+                save_json(os.path.join(parent, "cache.json"), {}, "cache")
@@ -6,8 +6,23 @@
 
 import abc
 import fnmatch
+import hashlib
 import posixpath
-from typing import Generic, Iterable, Mapping, Tuple, TYPE_CHECKING, TypeVar
+import re
+from datetime import datetime
+from typing import (
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+    TypeVar,
+)
 
 from torchx.specs import AppDef, CfgVal, Role, runopts
 
@@ -15,6 +30,7 @@ if TYPE_CHECKING:
     from fsspec import AbstractFileSystem
 
 TORCHX_IGNORE = ".torchxignore"
+DIGEST_CHUNK_SIZE: int = 1024 * 1024
 
 T = TypeVar("T")
 
@@ -75,20 +91,90 @@ class WorkspaceMixin(abc.ABC, Generic[T]):
         raise NotImplementedError("push is not implemented")
 
 
-def _ignore(s: str, patterns: Iterable[str]) -> Tuple[int, bool]:
-    last_matching_pattern = -1
-    match = False
-    if s in (".", "Dockerfile.torchx"):
-        return last_matching_pattern, match
-    s = posixpath.normpath(s)
-    for i, pattern in enumerate(patterns):
-        if pattern.startswith("!") and fnmatch.fnmatch(s, pattern[1:]):
-            match = False
-            last_matching_pattern = i
-        elif fnmatch.fnmatch(s, pattern):
-            match = True
-            last_matching_pattern = i
-    return last_matching_pattern, match
+class _IgnoreMatcher:
+    """
+    Matches paths against a subset of the ignore patterns compiled into a
+    single regex. The patterns are tried from the last to the first so that
+    the first alternative that matches is the last matching pattern.
+    """
+
+    def __init__(self, patterns: Sequence[str], indices: Sequence[int]) -> None:
+        self._negated: Dict[str, bool] = {}
+        alternatives = []
+        for i in reversed(indices):
+            pattern = patterns[i]
+            negated = pattern.startswith("!")
+            if negated:
+                pattern = pattern[1:]
+            self._negated[f"p{i}"] = negated
+            alternatives.append(f"(?P<p{i}>{fnmatch.translate(pattern)})")
+        self._regex: Optional[Pattern[str]] = (
+            re.compile("|".join(alternatives)) if alternatives else None
+        )
+
+    def __call__(self, path: str) -> Tuple[int, bool]:
+        """
+        Returns the index of the last pattern matching ``path`` (-1 if none)
+        and whether ``path`` is ignored.
+        """
+        if path in (".", "Dockerfile.torchx") or self._regex is None:
+            return -1, False
+        m = self._regex.match(posixpath.normpath(path))
+        if m is None or m.lastgroup is None:
+            return -1, False
+        return int(m.lastgroup[1:]), not self._negated[m.lastgroup]
+
+
+class _IgnorePatterns:
+    """
+    Ignore patterns (``.dockerignore`` syntax) compiled into matchers. The
+    matcher of a directory only includes the patterns that can match paths
+    under it: a pattern whose literal prefix (up to the first wildcard) is
+    not a prefix of the directory path (or vice versa) is left out, so the
+    subtrees that no pattern can match skip the matching entirely.
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self.patterns: List[str] = list(patterns)
+        self._prefixes: List[str] = [
+            re.split(r"[*?\[]", p[1:] if p.startswith("!") else p, maxsplit=1)[0]
+            for p in self.patterns
+        ]
+        self._matchers: Dict[Tuple[int, ...], _IgnoreMatcher] = {}
+        # (dir, start) -> indices of the patterns that can match under dir
+        self._dir_patterns: Dict[Tuple[str, int], Tuple[int, ...]] = {}
+
+    def matcher(self, dir: str, start: int = 0) -> _IgnoreMatcher:
+        """
+        Returns the matcher of the paths under ``dir`` (relative to the
+        workspace) that uses the patterns from index ``start`` onwards.
+        """
+        indices = self._patterns_under(posixpath.normpath(dir), start)
+        matcher = self._matchers.get(indices)
+        if matcher is None:
+            matcher = _IgnoreMatcher(self.patterns, indices)
+            self._matchers[indices] = matcher
+        return matcher
+
+    def _patterns_under(self, dir: str, start: int) -> Tuple[int, ...]:
+        indices = self._dir_patterns.get((dir, start))
+        if indices is not None:
+            return indices
+
+        if dir == ".":
+            indices = tuple(range(start, len(self.patterns)))
+        else:
+            # the patterns of a dir are a subset of the patterns of its parent
+            parent = self._patterns_under(posixpath.dirname(dir) or ".", start)
+            dir_prefix = dir + "/"
+            indices = tuple(
+                i
+                for i in parent
+                if self._prefixes[i].startswith(dir_prefix)
+                or dir_prefix.startswith(self._prefixes[i])
+            )
+        self._dir_patterns[(dir, start)] = indices
+        return indices
 
 
 def walk_workspace(
@@ -114,6 +200,7 @@ def walk_workspace(
                 continue
             ignore_patterns.append(line)
 
+    patterns = _IgnorePatterns(ignore_patterns)
     paths_to_walk = [(0, path)]
     while paths_to_walk:
         first_pattern_to_use, current_path = paths_to_walk.pop()
@@ -121,26 +208,48 @@ def walk_workspace(
             assert isinstance(dir, str), "path must be str"
             relpath = posixpath.relpath(dir, path)
 
-            if _ignore(relpath, ignore_patterns[first_pattern_to_use:])[1]:
+            # the dir itself is matched with the patterns of its parent
+            parent = posixpath.dirname(relpath) if relpath != "." else "."
+            if patterns.matcher(parent or ".", first_pattern_to_use)(relpath)[1]:
                 continue
+            ignore = patterns.matcher(relpath, first_pattern_to_use)
             filtered_dirs = []
-            last_matching_pattern_index = []
+            first_pattern_index = []
             for d in dirs:
-                index, match = _ignore(
-                    posixpath.join(relpath, d), ignore_patterns[first_pattern_to_use:]
-                )
+                index, match = ignore(posixpath.join(relpath, d))
                 if not match:
                     filtered_dirs.append(d)
-                    last_matching_pattern_index.append(first_pattern_to_use + index)
+                    # the patterns up to the last one matching the dir
+                    # (i.e. that included it) are not applied to its contents
+                    first_pattern_index.append(
+                        index + 1 if index >= 0 else first_pattern_to_use
+                    )
             dirs = filtered_dirs
             files = {
                 file: info
                 for file, info in files.items()
-                if not _ignore(
-                    posixpath.join(relpath, file) if relpath != "." else file,
-                    ignore_patterns[first_pattern_to_use:],
+                if not ignore(
+                    posixpath.join(relpath, file) if relpath != "." else file
                 )[1]
             }
             yield dir, dirs, files
-            for i, d in zip(last_matching_pattern_index, dirs):
-                paths_to_walk.append((i + 1, posixpath.join(dir, d)))
+            for i, d in zip(first_pattern_index, dirs):
+                paths_to_walk.append((i, posixpath.join(dir, d)))
+
+
+def _mtime(info: Mapping[str, object]) -> Optional[float]:
+    # local filesystems report ``mtime``, the memory filesystem only ``created``
+    mtime = info.get("mtime", info.get("created"))
+    if isinstance(mtime, datetime):
+        return mtime.timestamp()
+    if isinstance(mtime, (int, float)):
+        return float(mtime)
+    return None
+
+
+def _digest_file(fs: "AbstractFileSystem", name: str) -> str:
+    digest = hashlib.sha256()
+    with fs.open(name, "rb") as f:
+        for chunk in iter(lambda: f.read(DIGEST_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
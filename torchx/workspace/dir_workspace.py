@@ -5,18 +5,71 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import json
+import logging
 import os
 import posixpath
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from tempfile import mkdtemp
-from typing import Mapping
+from typing import Dict, List, Mapping, Optional, Tuple
 
 import fsspec
-from torchx.specs import CfgVal, Role
-from torchx.workspace.api import walk_workspace, WorkspaceMixin
+from torchx.specs import CfgVal, Role, runopts
+from torchx.util.io import load_json, save_json
+from torchx.workspace.api import _digest_file, _mtime, walk_workspace, WorkspaceMixin
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# manifest of the synced workspace files, written into the job dir
+WORKSPACE_MANIFEST = ".torchxworkspace.json"
+# last job dir each workspace was synced to, the unchanged files of the next
+# sync are linked from it
+LAST_JOB_DIRS: str = os.path.join("~", ".torchx", "dir_workspaces.json")
+LAST_JOB_DIRS_MAX_ENTRIES = 32
+# number of files copied or linked concurrently
+SYNC_PARALLELISM = 8
+
+# linux ioctl that clones (reflinks) a file on copy-on-write filesystems
+_FICLONE = 0x40049409
+
+
+@dataclass
+class _SyncStats:
+    copied_files: int = 0
+    copied_bytes: int = 0
+    # unchanged files linked from the previous job dir or kept in place
+    skipped_files: int = 0
+    skipped_bytes: int = 0
+    removed_files: int = 0
+
+
+def _sync_opts() -> runopts:
+    opts = runopts()
+    opts.add(
+        "workspace_sync",
+        type_=bool,
+        default=False,
+        help="incrementally sync the workspace: unchanged files are reflinked or hard"
+        " linked from the previous job dir of the workspace (or kept if ``job_dir``"
+        " was synced before) and only changed files are copied. Jobs must not"
+        " modify the workspace files in place",
+    )
+    opts.add(
+        "workspace_sync_checksum",
+        type_=bool,
+        default=False,
+        help="with ``workspace_sync``, compare the sha256 of the files instead of"
+        " their mtime to find the unchanged files",
+    )
+    return opts
 
 
 class TmpDirWorkspaceMixin(WorkspaceMixin[None]):
+    def workspace_opts(self) -> runopts:
+        return _sync_opts()
+
     def build_workspace_and_update_role(
         self, role: Role, workspace: str, cfg: Mapping[str, CfgVal]
     ) -> None:
@@ -27,11 +80,21 @@ class TmpDirWorkspaceMixin(WorkspaceMixin[None]):
         Any files listed in the ``.torchxignore`` folder will be skipped.
         """
         job_dir = mkdtemp(prefix="torchx_workspace")
-        _copy_to_dir(workspace, job_dir)
+        if cfg.get("workspace_sync"):
+            _sync_to_dir(
+                workspace,
+                job_dir,
+                checksum=bool(cfg.get("workspace_sync_checksum")),
+            )
+        else:
+            _copy_to_dir(workspace, job_dir)
         role.image = job_dir
 
 
 class DirWorkspaceMixin(WorkspaceMixin[None]):
+    def workspace_opts(self) -> runopts:
+        return _sync_opts()
+
     def build_workspace_and_update_role(
         self, role: Role, workspace: str, cfg: Mapping[str, CfgVal]
     ) -> None:
@@ -39,6 +102,10 @@ class DirWorkspaceMixin(WorkspaceMixin[None]):
         Creates a new directory specified by ``job_dir`` from the workspace. Role
         image fields will be set to the ``job_dir``.
 
+        With ``workspace_sync`` the ``job_dir`` may also be a directory that
+        the workspace was synced to before, in which case it is updated in
+        place.
+
         Any files listed in the ``.torchxignore`` folder will be skipped.
         """
         job_dir = cfg.get("job_dir")
@@ -46,8 +113,22 @@ class DirWorkspaceMixin(WorkspaceMixin[None]):
             return
         assert isinstance(job_dir, str), "job_dir must be str"
 
-        os.mkdir(job_dir)
-        _copy_to_dir(workspace, job_dir)
+        if cfg.get("workspace_sync"):
+            if os.path.exists(job_dir) and not os.path.isfile(
+                os.path.join(job_dir, WORKSPACE_MANIFEST)
+            ):
+                raise FileExistsError(
+                    f"job_dir `{job_dir}` exists and was not synced from a workspace"
+                )
+            os.makedirs(job_dir, exist_ok=True)
+            _sync_to_dir(
+                workspace,
+                job_dir,
+                checksum=bool(cfg.get("workspace_sync_checksum")),
+            )
+        else:
+            os.mkdir(job_dir)
+            _copy_to_dir(workspace, job_dir)
         role.image = job_dir
 
 
@@ -65,3 +146,169 @@ def _copy_to_dir(workspace: str, target: str) -> None:
             )
             with fs.open(info["name"], "rb") as src, fsspec.open(filepath, "wb") as dst:
                 shutil.copyfileobj(src, dst)
+
+
+def _sync_to_dir(workspace: str, target: str, checksum: bool = False) -> _SyncStats:
+    """
+    Syncs the workspace into the local ``target`` dir. A file is unchanged
+    if its size and mtime (or sha256 if ``checksum``) match the manifest of
+    the previous sync: the ``target`` itself if it was synced before,
+    otherwise the last job dir the workspace was synced to. Unchanged files
+    are kept in place or linked from the previous job dir, the other files
+    are copied concurrently.
+    """
+    fs, path = fsspec.core.url_to_fs(workspace)
+    assert isinstance(path, str), "path must be str"
+    workspace_key = fs.unstrip_protocol(path)
+
+    prev_dir = target
+    prev_manifest = _read_manifest(target)
+    if prev_manifest is None:
+        last_job_dir = _load_last_job_dirs().get(workspace_key)
+        prev_manifest = _read_manifest(last_job_dir) if last_job_dir else None
+        prev_dir = last_job_dir or target
+    in_place = prev_dir == target
+
+    manifest: Dict[str, List[object]] = {}
+    copies: List[Tuple[str, str]] = []
+    links: List[str] = []
+    stats = _SyncStats()
+    for dir, _, files in walk_workspace(fs, path):
+        assert isinstance(dir, str), "path must be str"
+        relpath = posixpath.relpath(dir, path)
+        os.makedirs(os.path.join(target, relpath), exist_ok=True)
+        for file, info in files.items():
+            filepath = posixpath.join(relpath, file) if relpath != "." else file
+            size = info["size"]
+            assert isinstance(size, int), "size must be an int"
+            name = info["name"]
+            assert isinstance(name, str), "name must be str"
+            entry = [size, _mtime(info), _digest_file(fs, name) if checksum else None]
+            manifest[filepath] = entry
+
+            prev = (prev_manifest or {}).get(filepath)
+            if prev and _unchanged(prev, entry, os.path.join(prev_dir, filepath)):
+                stats.skipped_files += 1
+                stats.skipped_bytes += size
+                if not in_place:
+                    links.append(filepath)
+            else:
+                stats.copied_files += 1
+                stats.copied_bytes += size
+                copies.append((name, filepath))
+
+    with ThreadPoolExecutor(max_workers=SYNC_PARALLELISM) as executor:
+        futures = [
+            executor.submit(_copy_file, fs, name, os.path.join(target, filepath))
+            for name, filepath in copies
+        ] + [
+            executor.submit(
+                _link_file,
+                os.path.join(prev_dir, filepath),
+                os.path.join(target, filepath),
+            )
+            for filepath in links
+        ]
+        for future in futures:
+            future.result()
+
+    if in_place and prev_manifest:
+        # only remove the files that were synced, not the job outputs
+        for filepath in prev_manifest.keys() - manifest.keys():
+            try:
+                os.remove(os.path.join(target, filepath))
+                stats.removed_files += 1
+            except FileNotFoundError:
+                pass
+
+    _write_manifest(target, manifest)
+    _save_last_job_dir(workspace_key, target)
+    log.info(
+        f"Synced workspace `{workspace}` to `{target}`:"
+        f" copied {stats.copied_files} files ({stats.copied_bytes} bytes),"
+        f" skipped {stats.skipped_files} unchanged files ({stats.skipped_bytes} bytes)"
+        + (f" from `{prev_dir}`" if not in_place else "")
+        + (f", removed {stats.removed_files} files" if stats.removed_files else "")
+    )
+    return stats
+
+
+def _unchanged(prev: List[object], entry: List[object], prev_path: str) -> bool:
+    size, mtime, digest = entry
+    if prev[0] != size or not os.path.isfile(prev_path):
+        return False
+    if digest is not None:
+        # the previous sync may not have computed the checksum
+        prev_digest = prev[2] or _digest_file(fsspec.filesystem("file"), prev_path)
+        return prev_digest == digest
+    return mtime is not None and prev[1] == mtime
+
+
+def _copy_file(fs: fsspec.AbstractFileSystem, name: str, dst: str) -> None:
+    # copy then rename so that a file linked into other job dirs is not modified
+    tmp_dst = f"{dst}.torchxtmp"
+    with fs.open(name, "rb") as src, open(tmp_dst, "wb") as f:
+        shutil.copyfileobj(src, f)
+    os.replace(tmp_dst, dst)
+
+
+def _link_file(src: str, dst: str) -> None:
+    """
+    Reflinks ``src`` to ``dst`` if the filesystem supports it, otherwise hard
+    links it (or copies it if that fails too, e.g. across filesystems).
+    """
+    tmp_dst = f"{dst}.torchxtmp"
+    if os.path.lexists(tmp_dst):
+        os.remove(tmp_dst)
+    try:
+        import fcntl
+
+        with open(src, "rb") as s, open(tmp_dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    except (ImportError, OSError):
+        if os.path.lexists(tmp_dst):
+            os.remove(tmp_dst)
+        try:
+            os.link(src, tmp_dst)
+        except OSError:
+            shutil.copyfile(src, tmp_dst)
+    os.replace(tmp_dst, dst)
+
+
+def _read_manifest(job_dir: str) -> Optional[Dict[str, List[object]]]:
+    path = os.path.join(job_dir, WORKSPACE_MANIFEST)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning(f"Ignoring invalid workspace manifest: {path}: {e}")
+        return None
+
+
+def _write_manifest(job_dir: str, manifest: Dict[str, List[object]]) -> None:
+    path = os.path.join(job_dir, WORKSPACE_MANIFEST)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def _load_last_job_dirs() -> Dict[str, str]:
+    last_job_dirs = load_json(
+        os.path.expanduser(LAST_JOB_DIRS), dict, "workspace job dirs"
+    )
+    return last_job_dirs or {}
+
+
+def _save_last_job_dir(workspace: str, job_dir: str) -> None:
+    last_job_dirs = _load_last_job_dirs()
+    # most recently synced last
+    last_job_dirs.pop(workspace, None)
+    last_job_dirs[workspace] = os.path.abspath(job_dir)
+    save_json(
+        os.path.expanduser(LAST_JOB_DIRS),
+        dict(list(last_job_dirs.items())[-LAST_JOB_DIRS_MAX_ENTRIES:]),
+        "workspace job dirs",
+    )
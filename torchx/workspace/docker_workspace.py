@@ -4,23 +4,51 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import hashlib
 import io
+import json
 import logging
+import os
 import posixpath
 import stat
 import sys
 import tarfile
-import tempfile
-from typing import Dict, IO, Iterable, Mapping, Optional, TextIO, Tuple, TYPE_CHECKING
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    TextIO,
+    Tuple,
+    TYPE_CHECKING,
+)
 
 import fsspec
 
 import torchx
 from torchx.specs import AppDef, CfgVal, Role, runopts
-from torchx.workspace.api import walk_workspace, WorkspaceMixin
+from torchx.util.io import load_json, save_json
+from torchx.workspace.api import (
+    _digest_file,
+    _mtime,
+    walk_workspace,
+    WorkspaceMixin,
+)
 
 if TYPE_CHECKING:
     from docker import DockerClient
+    from fsspec import AbstractFileSystem
 
 log: logging.Logger = logging.getLogger(__name__)
 
@@ -34,6 +62,52 @@ FROM $IMAGE
 COPY . .
 """
 
+# env var that overrides the location of the workspace build cache
+ENV_TORCHX_WORKSPACE_CACHE = "TORCHX_WORKSPACE_CACHE"
+DEFAULT_WORKSPACE_CACHE: str = os.path.join("~", ".torchx", "docker_workspaces.json")
+# max number of workspaces kept in the build cache, the least recently used
+# workspaces are dropped first
+WORKSPACE_CACHE_MAX_ENTRIES = 32
+# max number of incremental builds layered on top of a full build before the
+# image is rebuilt from scratch (bounds the number of image layers)
+MAX_INCREMENTAL_BUILDS = 8
+# number of workspace files hashed concurrently
+DIGEST_PARALLELISM = 8
+
+# number of workspace files read concurrently while writing the build context
+CONTEXT_READ_PARALLELISM = 8
+# max bytes of file contents read ahead of the build context writer
+CONTEXT_READ_AHEAD_BYTES: int = 64 * 1024 * 1024
+# larger files are streamed into the build context instead of read ahead
+CONTEXT_READ_AHEAD_MAX_FILE_SIZE: int = 8 * 1024 * 1024
+# size of the chunks the build context is sent to docker in
+CONTEXT_CHUNK_SIZE: int = 64 * 1024
+# size of the blocks of the build context that are gzipped concurrently
+CONTEXT_GZIP_BLOCK_SIZE: int = 1024 * 1024
+CONTEXT_GZIP_PARALLELISM = 4
+
+
+@dataclass
+class _WorkspaceBuild:
+    """
+    The last image built from a workspace.
+    """
+
+    # id of the base image the workspace was built on
+    base: str
+    # id of the built image
+    image: str
+    # number of incremental builds on top of the last full build
+    depth: int = 0
+    # workspace relative path -> [size, mtime, mode, sha256 of the contents]
+    files: Dict[str, List[object]] = field(default_factory=dict)
+    last_used: float = 0
+
+
+def default_workspace_cache_path() -> str:
+    path = os.getenv(ENV_TORCHX_WORKSPACE_CACHE) or DEFAULT_WORKSPACE_CACHE
+    return os.path.expanduser(path)
+
 
 class DockerWorkspaceMixin(WorkspaceMixin[Dict[str, Tuple[str, str]]]):
     """
@@ -57,6 +131,20 @@ class DockerWorkspaceMixin(WorkspaceMixin[Dict[str, Tuple[str, str]]]):
     To exclude files from the build context you can use the standard
     `.dockerignore` file.
 
+    The build context is streamed to docker while it is being written, with
+    the workspace files read concurrently ahead of the writer. For remote
+    docker daemons the context can be gzipped with ``gzip_context=True``.
+
+    Builds are cached: the built image is labeled with a hash of the
+    workspace files (path, mode and contents) and of the base image id. When
+    an image with the same hash exists the build is skipped. Otherwise, if
+    the workspace uses the default ``Dockerfile.torchx`` and no files were
+    deleted since the last build, only the changed files are copied on top
+    of the previously built image. File contents are only re-hashed when
+    their size or mtime changed, the hashes are kept in
+    ``~/.torchx/docker_workspaces.json`` (override with
+    ``$TORCHX_WORKSPACE_CACHE``).
+
     See more:
 
     * https://docs.docker.com/engine/reference/commandline/login/
@@ -64,15 +152,20 @@ class DockerWorkspaceMixin(WorkspaceMixin[Dict[str, Tuple[str, str]]]):
     """
 
     LABEL_VERSION: str = "torchx.pytorch.org/version"
+    LABEL_WORKSPACE_HASH: str = "torchx.pytorch.org/workspace-hash"
 
     def __init__(
         self,
         *args: object,
         docker_client: Optional["DockerClient"] = None,
+        workspace_cache_path: Optional[str] = None,
         **kwargs: object,
     ) -> None:
         super().__init__(*args, **kwargs)
         self.__docker_client = docker_client
+        self._workspace_cache_path: str = (
+            workspace_cache_path or default_workspace_cache_path()
+        )
 
     @property
     def _docker_client(self) -> "DockerClient":
@@ -91,6 +184,12 @@ class DockerWorkspaceMixin(WorkspaceMixin[Dict[str, Tuple[str, str]]]):
             type_=str,
             help="(remote jobs) the image repository to use when pushing patched images, must have push access. Ex: example.com/your/container",
         )
+        opts.add(
+            "gzip_context",
+            type_=bool,
+            default=False,
+            help="gzip the workspace build context sent to docker, speeds up builds on remote docker daemons",
+        )
         return opts
 
     def build_workspace_and_update_role(
@@ -105,34 +204,139 @@ class DockerWorkspaceMixin(WorkspaceMixin[Dict[str, Tuple[str, str]]]):
             workspace: a fsspec path to a directory with contents to be overlaid
         """
 
-        context = _build_context(role.image, workspace)
+        fs, path = fsspec.core.url_to_fs(workspace)
+        log.info(f"Workspace `{workspace}` resolved to filesystem path `{path}`")
+        assert isinstance(path, str), "path must be str"
+        files = dict(_walk_files(fs, path))
+        gzip = bool(cfg.get("gzip_context"))
 
         try:
-            try:
-                self._docker_client.images.pull(role.image)
-            except Exception as e:
-                log.warning(
-                    f"failed to pull image {role.image}, falling back to local: {e}"
+            self._docker_client.images.pull(role.image)
+        except Exception as e:
+            log.warning(
+                f"failed to pull image {role.image}, falling back to local: {e}"
+            )
+        base = self._image_id(role.image) or role.image
+
+        cache = self._load_workspace_cache()
+        cache_key = fs.unstrip_protocol(path)
+        prev = cache.get(cache_key)
+        manifest = _digest_files(fs, files, prev.files if prev else {})
+        build_hash = _build_hash(base, workspace, manifest)
+
+        image_id = self._find_workspace_image(build_hash)
+        if image_id:
+            log.info(f"Workspace is unchanged, reusing image {image_id}")
+            depth = prev.depth if prev and prev.image == image_id else 0
+        else:
+            # incremental builds copy the changed files on top of the previous
+            # image, this is only valid for the default Dockerfile (a custom one
+            # may depend on any file) and if no files were removed
+            if (
+                prev
+                and prev.base == base
+                and prev.depth < MAX_INCREMENTAL_BUILDS
+                and TORCHX_DOCKERFILE not in files
+                and prev.files.keys() <= manifest.keys()
+                and self._image_id(prev.image)
+            ):
+                changed = {
+                    f: info
+                    for f, info in files.items()
+                    if f not in prev.files or prev.files[f][2:] != manifest[f][2:]
+                }
+                log.info(
+                    f"Building workspace docker image with {len(changed)} changed"
+                    f" file(s) on top of {prev.image}"
+                )
+                image_id = self._build_image(
+                    fs, changed, prev.image, workspace, build_hash, gzip
                 )
-            log.info("Building workspace docker image (this may take a while)...")
-            image, _ = self._docker_client.images.build(
+                depth = prev.depth + 1
+            else:
+                log.info("Building workspace docker image (this may take a while)...")
+                image_id = self._build_image(
+                    fs, files, role.image, workspace, build_hash, gzip
+                )
+                depth = 0
+
+        cache[cache_key] = _WorkspaceBuild(
+            base=base,
+            image=image_id,
+            depth=depth,
+            files=manifest,
+            last_used=time.time(),
+        )
+        self._save_workspace_cache(cache)
+        role.image = image_id
+
+    def _build_image(
+        self,
+        fs: "AbstractFileSystem",
+        files: Mapping[str, Mapping[str, object]],
+        image: str,
+        workspace: str,
+        build_hash: str,
+        gzip: bool = False,
+    ) -> str:
+        context = _build_context(image, workspace, fs=fs, files=files, gzip=gzip)
+        try:
+            built, _ = self._docker_client.images.build(
                 fileobj=context,
                 custom_context=True,
+                encoding="gzip" if gzip else None,
                 dockerfile=TORCHX_DOCKERFILE,
                 buildargs={
-                    "IMAGE": role.image,
+                    "IMAGE": image,
                     "WORKSPACE": workspace,
                 },
                 pull=False,
                 rm=True,
                 labels={
                     self.LABEL_VERSION: torchx.__version__,
+                    self.LABEL_WORKSPACE_HASH: build_hash,
                 },
             )
-            role.image = image.id
+            return built.id
         finally:
             context.close()
 
+    def _image_id(self, image: str) -> Optional[str]:
+        """
+        Returns the id of the local ``image``, ``None`` if it does not exist.
+        """
+        try:
+            return self._docker_client.images.get(image).id
+        except Exception:
+            return None
+
+    def _find_workspace_image(self, build_hash: str) -> Optional[str]:
+        images = self._docker_client.images.list(
+            filters={"label": f"{self.LABEL_WORKSPACE_HASH}={build_hash}"}
+        )
+        return images[0].id if images else None
+
+    def _load_workspace_cache(self) -> Dict[str, _WorkspaceBuild]:
+        cache = load_json(
+            self._workspace_cache_path,
+            lambda c: {
+                workspace: _WorkspaceBuild(**build) for workspace, build in c.items()
+            },
+            "workspace cache",
+        )
+        return cache or {}
+
+    def _save_workspace_cache(self, cache: Dict[str, _WorkspaceBuild]) -> None:
+        builds = sorted(cache.items(), key=lambda b: b[1].last_used, reverse=True)
+        save_json(
+            self._workspace_cache_path,
+            {
+                workspace: asdict(build)
+                for workspace, build in builds[:WORKSPACE_CACHE_MAX_ENTRIES]
+            },
+            "workspace cache",
+        )
+
     def dryrun_push_images(
         self, app: AppDef, cfg: Mapping[str, CfgVal]
     ) -> Dict[str, Tuple[str, str]]:
@@ -233,44 +437,262 @@ def print_push_events(
             stream.write(f"{HEADER}{status}\n")
 
 
-def _build_context(img: str, workspace: str) -> IO[bytes]:
-    # f is closed by parent, NamedTemporaryFile auto closes on GC
-    f = tempfile.NamedTemporaryFile(  # noqa P201
-        prefix="torchx-context",
-        suffix=".tar",
-    )
-
-    with tarfile.open(fileobj=f, mode="w") as tf:
-        _copy_to_tarfile(workspace, tf)
-        if TORCHX_DOCKERFILE not in tf.getnames():
-            info = tarfile.TarInfo(TORCHX_DOCKERFILE)
-            info.size = len(DEFAULT_DOCKERFILE)
-            tf.addfile(info, io.BytesIO(DEFAULT_DOCKERFILE))
-    f.seek(0)
-    return f
-
-
-def _copy_to_tarfile(workspace: str, tf: tarfile.TarFile) -> None:
-    fs, path = fsspec.core.url_to_fs(workspace)
-    log.info(f"Workspace `{workspace}` resolved to filesystem path `{path}`")
-    assert isinstance(path, str), "path must be str"
-
+def _walk_files(
+    fs: "AbstractFileSystem", path: str
+) -> Iterator[Tuple[str, Mapping[str, object]]]:
+    """
+    Yields the workspace relative path and the fsspec info of the files in
+    the workspace that are not excluded by ``.dockerignore``.
+    """
     for dir, dirs, files in walk_workspace(fs, path, ".dockerignore"):
         assert isinstance(dir, str), "path must be str"
         relpath = posixpath.relpath(dir, path)
         for file, info in files.items():
-            with fs.open(info["name"], "rb") as f:
-                filepath = posixpath.join(relpath, file) if relpath != "." else file
-                tinfo = tarfile.TarInfo(filepath)
-                size = info["size"]
-                assert isinstance(size, int), "size must be an int"
-                tinfo.size = size
-
-                # preserve unix mode for supported filesystems; fsspec.filesystem("memory") for example does not support
-                # unix file mode, hence conditional check here
-                if "mode" in info:
-                    mode = info["mode"]
-                    assert isinstance(mode, int), "mode must be an int"
-                    tinfo.mode = stat.S_IMODE(mode)
+            yield posixpath.join(relpath, file) if relpath != "." else file, info
+
+
+def _digest_files(
+    fs: "AbstractFileSystem",
+    files: Mapping[str, Mapping[str, object]],
+    prev: Mapping[str, List[object]],
+) -> Dict[str, List[object]]:
+    """
+    Returns the ``[size, mtime, mode, sha256]`` of the ``files``. The contents
+    are only hashed when the size or mtime differs from the ``prev`` entry
+    (or the filesystem does not report mtimes).
+    """
+    manifest = {}
+    to_hash = []
+    for relpath, info in files.items():
+        size, mtime, mode = info["size"], _mtime(info), info.get("mode")
+        entry = prev.get(relpath)
+        if mtime is not None and entry and entry[:2] == [size, mtime]:
+            manifest[relpath] = [size, mtime, mode, entry[3]]
+        else:
+            manifest[relpath] = [size, mtime, mode, None]
+            to_hash.append(relpath)
+
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=DIGEST_PARALLELISM) as executor:
+            digests = executor.map(
+                lambda relpath: _digest_file(fs, files[relpath]["name"]), to_hash
+            )
+            for relpath, digest in zip(to_hash, digests):
+                manifest[relpath][3] = digest
+    return manifest
+
 
+def _build_hash(base: str, workspace: str, manifest: Mapping[str, List[object]]) -> str:
+    """
+    Returns the hash identifying the image built from the ``manifest`` files
+    on top of the ``base`` image. Only the paths, modes and contents of the
+    files are hashed so that touching a file does not change the hash.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([base, workspace, DEFAULT_DOCKERFILE.decode()]).encode())
+    for relpath in sorted(manifest):
+        _, _, mode, file_digest = manifest[relpath]
+        digest.update(json.dumps([relpath, mode, file_digest]).encode())
+    return digest.hexdigest()
+
+
+def _read_ahead(
+    fs: "AbstractFileSystem", files: Mapping[str, Mapping[str, object]]
+) -> Iterator[Tuple[str, Mapping[str, object], Optional[bytes]]]:
+    """
+    Yields the ``files`` in order along with their contents. The contents are
+    read concurrently ahead of the consumer, up to ``CONTEXT_READ_AHEAD_BYTES``
+    at a time. Files larger than ``CONTEXT_READ_AHEAD_MAX_FILE_SIZE`` are
+    yielded with ``None`` contents and have to be streamed by the consumer.
+    """
+    pending: Deque[Tuple[str, Mapping[str, object], Optional["Future[bytes]"]]]
+    pending = deque()
+    buffered = 0
+    with ThreadPoolExecutor(max_workers=CONTEXT_READ_PARALLELISM) as executor:
+
+        def ready() -> bool:
+            future = pending[0][2]
+            return future is None or future.done()
+
+        for relpath, info in files.items():
+            size = info["size"]
+            assert isinstance(size, int), "size must be an int"
+            if size <= CONTEXT_READ_AHEAD_MAX_FILE_SIZE:
+                pending.append(
+                    (relpath, info, executor.submit(fs.cat_file, info["name"]))
+                )
+                buffered += size
+            else:
+                pending.append((relpath, info, None))
+
+            while pending and (buffered >= CONTEXT_READ_AHEAD_BYTES or ready()):
+                relpath, info, future = pending.popleft()
+                if future is None:
+                    yield relpath, info, None
+                else:
+                    data = future.result()
+                    buffered -= len(data)
+                    yield relpath, info, data
+
+        for relpath, info, future in pending:
+            yield relpath, info, future.result() if future else None
+
+
+class _GzipWriter:
+    """
+    Gzips the data written to it into ``out``. The data is split into
+    ``CONTEXT_GZIP_BLOCK_SIZE`` blocks that are compressed concurrently into
+    separate gzip members, the output is a multi-member gzip stream (same as
+    ``pigz``) which docker decompresses as a single stream.
+    """
+
+    def __init__(self, out: IO[bytes]) -> None:
+        self._out = out
+        self._buf = bytearray()
+        self._pending: Deque["Future[bytes]"] = deque()
+        self._executor = ThreadPoolExecutor(max_workers=CONTEXT_GZIP_PARALLELISM)
+
+    def write(self, data: bytes) -> int:
+        self._buf += data
+        while len(self._buf) >= CONTEXT_GZIP_BLOCK_SIZE:
+            self._compress(bytes(self._buf[:CONTEXT_GZIP_BLOCK_SIZE]))
+            del self._buf[:CONTEXT_GZIP_BLOCK_SIZE]
+        return len(data)
+
+    def close(self) -> None:
+        try:
+            if self._buf:
+                self._compress(bytes(self._buf))
+                self._buf.clear()
+            self._flush(0)
+        finally:
+            self._executor.shutdown()
+
+    def _compress(self, block: bytes) -> None:
+        self._pending.append(self._executor.submit(_gzip, block))
+        # bounds the memory used by the blocks that are not written yet
+        self._flush(CONTEXT_GZIP_PARALLELISM)
+
+    def _flush(self, max_pending: int) -> None:
+        while len(self._pending) > max_pending:
+            self._out.write(self._pending.popleft().result())
+
+
+def _gzip(block: bytes) -> bytes:
+    # zlib releases the GIL so blocks are compressed in parallel
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress(block) + compressor.flush()
+
+
+class _ContextStream:
+    """
+    Read end of a pipe that the build context is written to by a background
+    thread, so that docker receives the context while it is being written.
+    Errors from writing the context are raised by ``close()``.
+    """
+
+    def __init__(self, write_context: Callable[[IO[bytes]], None]) -> None:
+        r, w = os.pipe()
+        self._reader: IO[bytes] = os.fdopen(r, "rb")
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(
+            target=self._write,
+            args=(os.fdopen(w, "wb"), write_context),
+            name="torchx-docker-context",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _write(
+        self, out: IO[bytes], write_context: Callable[[IO[bytes]], None]
+    ) -> None:
+        try:
+            with out:
+                write_context(out)
+        except BrokenPipeError:
+            # the reader stopped reading, the reader reports its own error
+            pass
+        except Exception as e:
+            self._error = e
+
+    def read(self, size: int = -1) -> bytes:
+        return self._reader.read(size)
+
+    def __iter__(self) -> Iterator[bytes]:
+        # iterable bodies are sent by requests with chunked transfer encoding
+        return iter(lambda: self._reader.read(CONTEXT_CHUNK_SIZE), b"")
+
+    def close(self) -> None:
+        self._reader.close()
+        self._thread.join()
+        if self._error:
+            raise RuntimeError(
+                f"failed to write the docker build context: {self._error}"
+            ) from self._error
+
+    def __enter__(self) -> "_ContextStream":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def _build_context(
+    img: str,
+    workspace: str,
+    fs: Optional["AbstractFileSystem"] = None,
+    files: Optional[Mapping[str, Mapping[str, object]]] = None,
+    gzip: bool = False,
+) -> _ContextStream:
+    """
+    Returns a stream of the tar of the docker build context of the
+    ``workspace``, gzipped if ``gzip`` is set. If ``files`` (workspace
+    relative path -> fsspec info) is specified only those files are added.
+    """
+    if fs is None or files is None:
+        fs, path = fsspec.core.url_to_fs(workspace)
+        assert isinstance(path, str), "path must be str"
+        files = dict(_walk_files(fs, path))
+
+    def write_context(out: IO[bytes]) -> None:
+        assert fs is not None and files is not None
+        gzip_writer = _GzipWriter(out) if gzip else None
+        try:
+            # stream mode (``w|``) since the output is not seekable
+            with tarfile.open(fileobj=gzip_writer or out, mode="w|") as tf:
+                _copy_to_tarfile(fs, files, tf)
+                if TORCHX_DOCKERFILE not in files:
+                    info = tarfile.TarInfo(TORCHX_DOCKERFILE)
+                    info.size = len(DEFAULT_DOCKERFILE)
+                    tf.addfile(info, io.BytesIO(DEFAULT_DOCKERFILE))
+        finally:
+            if gzip_writer:
+                gzip_writer.close()
+
+    return _ContextStream(write_context)
+
+
+def _copy_to_tarfile(
+    fs: "AbstractFileSystem",
+    files: Mapping[str, Mapping[str, object]],
+    tf: tarfile.TarFile,
+) -> None:
+    for filepath, info, data in _read_ahead(fs, files):
+        tinfo = tarfile.TarInfo(filepath)
+
+        # preserve unix mode for supported filesystems; fsspec.filesystem("memory") for example does not support
+        # unix file mode, hence conditional check here
+        if "mode" in info:
+            mode = info["mode"]
+            assert isinstance(mode, int), "mode must be an int"
+            tinfo.mode = stat.S_IMODE(mode)
+
+        if data is not None:
+            tinfo.size = len(data)
+            tf.addfile(tinfo, io.BytesIO(data))
+        else:
+            size = info["size"]
+            assert isinstance(size, int), "size must be an int"
+            tinfo.size = size
+            with fs.open(info["name"], "rb") as f:
                 tf.addfile(tinfo, f)
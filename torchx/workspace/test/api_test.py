@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+
+from torchx.workspace.api import _IgnorePatterns
+
+
+class IgnorePatternsTest(unittest.TestCase):
+    def test_matcher(self) -> None:
+        patterns = _IgnorePatterns(["*.py", "!keep.py", "dir?", "!dir1"])
+        ignore = patterns.matcher(".")
+        self.assertEqual(ignore("foo.py"), (0, True))
+        self.assertEqual(ignore("keep.py"), (1, False))
+        self.assertEqual(ignore("./dir2"), (2, True))
+        self.assertEqual(ignore("dir1"), (3, False))
+        self.assertEqual(ignore("foo.txt"), (-1, False))
+        # never ignored
+        self.assertEqual(ignore("."), (-1, False))
+        self.assertEqual(
+            _IgnorePatterns(["*"]).matcher(".")("Dockerfile.torchx"), (-1, False)
+        )
+
+        # patterns before ``start`` are not applied
+        self.assertEqual(patterns.matcher(".", start=1)("foo.py"), (-1, False))
+
+    def test_matcher_prunes_patterns(self) -> None:
+        patterns = _IgnorePatterns(["a/b/c", "a/b*", "!a/x", "b/c", "**/d", "[ab]/e"])
+        # ``*`` also matches ``/``
+        self.assertEqual(patterns.matcher("a/b")("a/b/c"), (1, True))
+        self.assertEqual(patterns.matcher("a/b")("a/b/d"), (4, True))
+        self.assertEqual(patterns.matcher("b")("b/c"), (3, True))
+        self.assertEqual(patterns.matcher("c")("c/e"), (-1, False))
+        # only the patterns whose literal prefix is compatible with the dir are
+        # compiled into its matcher
+        self.assertIs(patterns.matcher("c"), patterns.matcher("d/e"))
+        # no pattern can match under the dir
+        self.assertEqual(_IgnorePatterns(["a/b"]).matcher("c")("c/a/b"), (-1, False))
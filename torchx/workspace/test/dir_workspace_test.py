@@ -9,16 +9,25 @@ import os.path
 import shutil
 import tempfile
 import unittest
+from unittest.mock import patch
 
 import fsspec
 from torchx.specs import Role
 from torchx.workspace.dir_workspace import (
     _copy_to_dir,
+    _sync_to_dir,
     DirWorkspaceMixin,
     TmpDirWorkspaceMixin,
+    WORKSPACE_MANIFEST,
 )
 
 
+def _write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
 class DirWorkspaceTest(unittest.TestCase):
     def test_build_workspace_no_job_dir(self) -> None:
         w = DirWorkspaceMixin()
@@ -109,6 +118,82 @@ class DirWorkspaceTest(unittest.TestCase):
             },
         )
 
+    def test_sync_to_dir(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            workspace = os.path.join(tmpdir, "workspace")
+            _write(os.path.join(workspace, "foo.sh"), "exit 0")
+            _write(os.path.join(workspace, "bar", "bar.py"), "print('bar')")
+            _write(os.path.join(workspace, ".torchxignore"), "ignored")
+            _write(os.path.join(workspace, "ignored"), "")
+
+            with patch(
+                "torchx.workspace.dir_workspace.LAST_JOB_DIRS",
+                os.path.join(tmpdir, "last_job_dirs.json"),
+            ):
+                job1 = os.path.join(tmpdir, "job1")
+                stats = _sync_to_dir(workspace, job1)
+                self.assertEqual((stats.copied_files, stats.skipped_files), (3, 0))
+                self.assertTrue(os.path.isfile(os.path.join(job1, WORKSPACE_MANIFEST)))
+                self.assertFalse(os.path.exists(os.path.join(job1, "ignored")))
+
+                # unchanged files are linked from the previous job dir
+                _write(os.path.join(workspace, "foo.sh"), "exit 1")
+                job2 = os.path.join(tmpdir, "job2")
+                stats = _sync_to_dir(workspace, job2)
+                self.assertEqual((stats.copied_files, stats.skipped_files), (1, 2))
+                self.assertEqual(stats.skipped_bytes, len("print('bar')") + 7)
+                with open(os.path.join(job2, "foo.sh")) as f:
+                    self.assertEqual(f.read(), "exit 1")
+                with open(os.path.join(job1, "foo.sh")) as f:
+                    self.assertEqual(f.read(), "exit 0")
+                with open(os.path.join(job2, "bar", "bar.py")) as f:
+                    self.assertEqual(f.read(), "print('bar')")
+
+                # in place sync removes the deleted files but not the job outputs
+                os.remove(os.path.join(workspace, "bar", "bar.py"))
+                _write(os.path.join(job2, "output.log"), "")
+                stats = _sync_to_dir(workspace, job2)
+                self.assertEqual(
+                    (stats.copied_files, stats.skipped_files, stats.removed_files),
+                    (0, 2, 1),
+                )
+                self.assertFalse(os.path.exists(os.path.join(job2, "bar", "bar.py")))
+                self.assertTrue(os.path.exists(os.path.join(job2, "output.log")))
+                self.assertTrue(os.path.exists(os.path.join(job1, "bar", "bar.py")))
+
+                # with checksums a touched file is unchanged
+                os.utime(os.path.join(workspace, "foo.sh"), (0, 0))
+                stats = _sync_to_dir(workspace, job2, checksum=True)
+                self.assertEqual((stats.copied_files, stats.skipped_files), (0, 2))
+                _write(os.path.join(workspace, "foo.sh"), "exit 2")
+                stats = _sync_to_dir(workspace, job2, checksum=True)
+                self.assertEqual((stats.copied_files, stats.skipped_files), (1, 1))
+
+    def test_build_workspace_sync(self) -> None:
+        w = DirWorkspaceMixin()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            workspace = os.path.join(tmpdir, "workspace")
+            _write(os.path.join(workspace, "foo.sh"), "exit 0")
+            job_dir = os.path.join(tmpdir, "job")
+            cfg = {"job_dir": job_dir, "workspace_sync": True}
+            with patch(
+                "torchx.workspace.dir_workspace.LAST_JOB_DIRS",
+                os.path.join(tmpdir, "last_job_dirs.json"),
+            ):
+                for _ in range(2):
+                    role = Role(name="role", image="blah")
+                    w.build_workspace_and_update_role(role, workspace, cfg)
+                    self.assertEqual(role.image, job_dir)
+
+                # existing dirs that were not synced are not overwritten
+                os.remove(os.path.join(job_dir, WORKSPACE_MANIFEST))
+                with self.assertRaisesRegex(FileExistsError, "job_dir"):
+                    w.build_workspace_and_update_role(role, workspace, cfg)
+                with self.assertRaises(FileExistsError):
+                    w.build_workspace_and_update_role(
+                        role, workspace, {"job_dir": job_dir}
+                    )
+
 
 class TmpDirWorkspaceTest(unittest.TestCase):
     def test_build_workspace(self) -> None:
@@ -4,6 +4,8 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import gzip
+import io
 import json
 import os
 import stat
@@ -12,14 +14,16 @@ import tempfile
 import unittest
 from io import StringIO
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import fsspec
 
 from torchx.specs import AppDef, Role
 from torchx.workspace.docker_workspace import (
     _build_context,
+    _read_ahead,
     DockerWorkspaceMixin,
+    MAX_INCREMENTAL_BUILDS,
     print_push_events,
 )
 
@@ -62,7 +66,7 @@ class DockerWorkspaceMockTest(unittest.TestCase):
     def test_runopts(self) -> None:
         self.assertCountEqual(
             DockerWorkspaceMixin().workspace_opts()._opts.keys(),
-            {"image_repo"},
+            {"image_repo", "gzip_context"},
         )
 
     def test_update_app_images(self) -> None:
@@ -173,7 +177,7 @@ class DockerWorkspaceMockTest(unittest.TestCase):
             )
 
         with _build_context("img", "memory://dockerignore") as f:
-            with tarfile.open(fileobj=f, mode="r") as tf:
+            with tarfile.open(fileobj=f, mode="r|") as tf:
                 self.assertCountEqual(
                     tf.getnames(),
                     {
@@ -218,7 +222,7 @@ class DockerWorkspaceMockTest(unittest.TestCase):
             )
 
         with _build_context("img", "memory://dockerignore") as f:
-            with tarfile.open(fileobj=f, mode="r") as tf:
+            with tarfile.open(fileobj=f, mode="r|") as tf:
                 self.assertCountEqual(
                     tf.getnames(),
                     {
@@ -238,10 +242,164 @@ class DockerWorkspaceMockTest(unittest.TestCase):
             Path(os.path.join(tmpDirName, "foo_755")).touch(mode=0o755, exist_ok=True)
 
             with _build_context("img", tmpDirName) as f:
-                with tarfile.open(fileobj=f, mode="r") as tf:
+                with tarfile.open(fileobj=f, mode="r|") as tf:
                     self.assertEqual(stat.S_IMODE(tf.getmember("foo_644").mode), 0o644)
                     self.assertEqual(stat.S_IMODE(tf.getmember("foo_755").mode), 0o755)
 
+    def test_build_workspace_cached(self) -> None:
+        fs = fsspec.filesystem("memory")
+        fs.pipe("/buildcache/foo.sh", b"exit 0")
+        fs.pipe("/buildcache/bar/bar.py", b"print('bar')")
+
+        client = MagicMock()
+        client.images.get.return_value.id = "sha256:base"
+        built = {}
+        contexts = []
+
+        def build(fileobj: object, labels: dict, buildargs: dict, **kwargs: object):
+            with tarfile.open(fileobj=fileobj, mode="r|") as tf:
+                contexts.append((buildargs["IMAGE"], set(tf.getnames())))
+            image = MagicMock()
+            image.id = f"sha256:{len(contexts)}"
+            built[labels[DockerWorkspaceMixin.LABEL_WORKSPACE_HASH]] = image
+            return image, []
+
+        client.images.build.side_effect = build
+        client.images.list.side_effect = lambda filters: [
+            built[h]
+            for h in built
+            if filters["label"] == f"{DockerWorkspaceMixin.LABEL_WORKSPACE_HASH}={h}"
+        ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            workspace = DockerWorkspaceMixin(
+                docker_client=client,
+                workspace_cache_path=os.path.join(tmpdir, "cache.json"),
+            )
+
+            def build_workspace() -> str:
+                role = Role(name="ping", image="busybox")
+                workspace.build_workspace_and_update_role(
+                    role, "memory://buildcache", {}
+                )
+                return role.image
+
+            # cold build
+            self.assertEqual(build_workspace(), "sha256:1")
+            self.assertEqual(
+                contexts[-1],
+                ("busybox", {"foo.sh", "bar/bar.py", "Dockerfile.torchx"}),
+            )
+
+            # unchanged workspace reuses the image
+            self.assertEqual(build_workspace(), "sha256:1")
+            self.assertEqual(len(contexts), 1)
+
+            # changed file is copied on top of the previous image
+            fs.pipe("/buildcache/foo.sh", b"exit 1")
+            self.assertEqual(build_workspace(), "sha256:2")
+            self.assertEqual(
+                contexts[-1], ("sha256:1", {"foo.sh", "Dockerfile.torchx"})
+            )
+
+            # reverting the change reuses the first image
+            fs.pipe("/buildcache/foo.sh", b"exit 0")
+            self.assertEqual(build_workspace(), "sha256:1")
+            self.assertEqual(len(contexts), 2)
+
+            # removed file requires a full build
+            fs.rm("/buildcache/bar/bar.py")
+            self.assertEqual(build_workspace(), "sha256:3")
+            self.assertEqual(contexts[-1], ("busybox", {"foo.sh", "Dockerfile.torchx"}))
+
+            # new base image requires a full build
+            client.images.get.return_value.id = "sha256:newbase"
+            fs.pipe("/buildcache/baz.py", b"")
+            self.assertEqual(build_workspace(), "sha256:4")
+            self.assertEqual(
+                contexts[-1], ("busybox", {"foo.sh", "baz.py", "Dockerfile.torchx"})
+            )
+
+            # incremental builds are capped
+            for i in range(MAX_INCREMENTAL_BUILDS + 1):
+                fs.pipe("/buildcache/baz.py", str(i).encode())
+                build_workspace()
+            self.assertEqual(contexts[-2][0], f"sha256:{len(contexts) - 2}")
+            self.assertEqual(contexts[-1][0], "busybox")
+
+    def test_build_workspace_invalid_cache(self) -> None:
+        fs = fsspec.filesystem("memory")
+        fs.pipe("/invalidcache/foo.sh", b"exit 0")
+
+        client = MagicMock()
+        client.images.get.return_value.id = "sha256:base"
+        client.images.list.return_value = []
+        client.images.build.return_value = (MagicMock(id="sha256:1"), [])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = os.path.join(tmpdir, "cache.json")
+            with open(cache_path, "w") as f:
+                f.write("{invalid")
+            workspace = DockerWorkspaceMixin(
+                docker_client=client, workspace_cache_path=cache_path
+            )
+            role = Role(name="ping", image="busybox")
+            with self.assertLogs("torchx.util.io", "WARNING"):
+                workspace.build_workspace_and_update_role(
+                    role, "memory://invalidcache", {}
+                )
+            self.assertEqual(role.image, "sha256:1")
+            with open(cache_path, "r") as f:
+                self.assertEqual(len(json.load(f)), 1)
+
+    def test_build_context_gzip(self) -> None:
+        fs = fsspec.filesystem("memory")
+        fs.pipe("/gzipcontext/foo.sh", b"exit 0")
+        fs.pipe("/gzipcontext/bar/big.bin", os.urandom(3 * 1024 * 1024 + 1))
+
+        with patch(
+            "torchx.workspace.docker_workspace.CONTEXT_GZIP_BLOCK_SIZE", 1024 * 1024
+        ):
+            with _build_context("img", "memory://gzipcontext", gzip=True) as f:
+                data = f.read()
+
+        # multi-member gzip stream
+        with tarfile.open(fileobj=io.BytesIO(gzip.decompress(data))) as tf:
+            self.assertCountEqual(
+                tf.getnames(), {"foo.sh", "bar/big.bin", "Dockerfile.torchx"}
+            )
+            big = tf.extractfile("bar/big.bin")
+            assert big is not None
+            self.assertEqual(big.read(), fs.cat("/gzipcontext/bar/big.bin"))
+
+    def test_build_context_error(self) -> None:
+        fs = fsspec.filesystem("memory")
+        files = {"missing": {"name": "/buildcontext/missing", "size": 1}}
+        with self.assertRaisesRegex(RuntimeError, "build context"):
+            with _build_context("img", "memory://", fs=fs, files=files) as f:
+                f.read()
+
+    def test_read_ahead(self) -> None:
+        fs = fsspec.filesystem("memory")
+        files = {}
+        for i in range(20):
+            name = f"/readahead/{i}"
+            fs.pipe(name, str(i).encode() * (i + 1))
+            files[str(i)] = fs.info(name)
+
+        with patch(
+            "torchx.workspace.docker_workspace.CONTEXT_READ_AHEAD_BYTES", 10
+        ), patch(
+            "torchx.workspace.docker_workspace.CONTEXT_READ_AHEAD_MAX_FILE_SIZE", 12
+        ):
+            read = list(_read_ahead(fs, files))
+
+        # in order, files larger than the max size are not read
+        self.assertEqual([relpath for relpath, _, _ in read], list(files))
+        for relpath, _, data in read:
+            i = int(relpath)
+            self.assertEqual(data, str(i).encode() * (i + 1) if i < 10 else None)
+
     def test_print_push_events(self) -> None:
         test_dir = Path(__file__).parent
 